@@ -1,82 +1,123 @@
+import bz2
 from collections import deque
+import gzip
 import networkx as nx
+import numpy as np
 import random
-from typing import Dict, Generator, List, Optional, Tuple
+from typing import BinaryIO, Dict, Generator, Iterable, List, Optional, Sequence, Set, Tuple
 import pickle
 
 import bgpsecsim.error as error
+import bgpsecsim.reachability as reachability
 from bgpsecsim.asys import AS, AS_ID, Relation, Route, RoutingPolicy
+from bgpsecsim.csr_graph import CSRGraph
 from bgpsecsim.routing_policy import DefaultPolicy, RouteLeakPolicy
 
 
+# as-rel files are read in blocks of this many bytes
+AS_REL_BLOCK_SIZE = 16 * 2 ** 20
+
+
+def open_as_rel_file(filename: str) -> BinaryIO:
+    # CAIDA ships the as-rel files compressed with bzip2
+    if filename.endswith('.bz2'):
+        return bz2.open(filename, 'rb')
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rb')
+    return open(filename, 'rb')
+
+
+def read_as_rel_file(filename: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Reads the links of an as-rel file as three int64 arrays (as1, as2, rel), in the order of the lines.
+
+    The 'serial-1' as-rel files contain p2p and p2c relationships. The format is:
+    <provider-as>|<customer-as>|-1
+    <peer-as>|<peer-as>|0
+    """
+    blocks = []
+    rest = b''
+    with open_as_rel_file(filename) as f:
+        while True:
+            data = f.read(AS_REL_BLOCK_SIZE)
+            if not data:
+                break
+            # Only complete lines are parsed, the remainder is kept for the next block
+            data = rest + data
+            end = data.rfind(b'\n') + 1
+            rest = data[end:]
+            blocks.append(_parse_as_rel_block(filename, data[:end]))
+    blocks.append(_parse_as_rel_block(filename, rest))
+
+    links = np.concatenate(blocks).reshape(-1, 3)
+    return links[:, 0].copy(), links[:, 1].copy(), links[:, 2].copy()
+
+
+def _parse_as_rel_block(filename: str, data: bytes) -> np.ndarray:
+    lines = data.split(b'\n')
+    if lines[-1] == b'':
+        lines.pop()
+    if b'#' in data:
+        lines = [line for line in lines if not line.startswith(b'#')]
+    if not lines:
+        return np.empty(0, dtype=np.int64)
+
+    text = b' '.join(lines)
+    values = np.fromstring(text.replace(b'|', b' ').decode(), dtype=np.int64, sep=' ')
+    if len(values) != 3 * len(lines) or text.count(b'|') != 2 * len(lines):
+        # Find the line without the required information, so the error names it
+        for line in lines:
+            items = line.split(b'|')
+            if len(items) != 3 or not all(item.strip().lstrip(b'-').isdigit() for item in items):
+                raise error.InvalidASRelFile(filename, f"bad line: {line.decode()}")
+    return values
+
+
 def parse_as_rel_file_CAIDA(filename: str) -> nx.Graph:
-    with open(filename, 'r') as f:
-        graph = nx.Graph()
-
-        for line in f:
-            if line.startswith('#'):
-                continue
-
-            # The 'serial-1' as-rel files contain p2p and p2c relationships. The format is:
-            # <provider-as>|<customer-as>|-1
-            # <peer-as>|<peer-as>|0
-            items = line.split('|')
-            # item does not have all the required information, so error is thrown for this line
-            if len(items) != 3:
-                raise error.InvalidASRelFile(filename, f"bad line: {line}")
-
-            [as1, as2, rel] = map(int, items)
-            as1 = str(as1)
-            as2 = str(as2)
-            if as1 not in graph:
-                graph.add_node(as1)
-            if as2 not in graph:
-                graph.add_node(as2)
-
-            customer = as2 if rel == -1 else None
-            graph.add_edge(as1, as2, customer=customer)
+    as1s, as2s, rels = read_as_rel_file(filename)
+    graph = nx.Graph()
+    for as1, as2, rel in zip(as1s.tolist(), as2s.tolist(), rels.tolist()):
+        customer = as2 if rel == -1 else None
+        graph.add_edge(as1, as2, customer=customer)
     return graph
 
 
+def pickle_relationships(pickle_graph: nx.DiGraph) -> Tuple[list, np.ndarray, np.ndarray, np.ndarray]:
+    """Classifies the links of a pickled topology, in which edges point from customers to providers and peers are
+    connected by edges in both directions.
+
+    Returns the nodes and three arrays (node, neighbour, is_peer) of node indices and flags. For every node in order
+    they hold first the links to its customers and then the links to its peers, each in the order of its in-edges.
+    """
+    nodes = list(pickle_graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    # in_edges() is grouped by target node in node order
+    edges = np.array([(index[u], index[v]) for u, v in pickle_graph.in_edges()], dtype=np.int64).reshape(-1, 2)
+    customers, owners = edges[:, 0], edges[:, 1]
+
+    # An edge belongs to a peering if the reverse edge exists as well
+    n_nodes = max(len(nodes), 1)
+    is_peer = np.isin(owners * n_nodes + customers, customers * n_nodes + owners)
+    order = np.lexsort((np.arange(len(edges)), is_peer, owners))
+    return nodes, owners[order], customers[order], is_peer[order]
+
+
 def parse_as_rel_file_pickle(filename: str) -> nx.Graph:
-    pickleGraph = pickle.load(open(filename, "rb"))
+    with open(filename, "rb") as f:
+        pickle_graph = pickle.load(f)
 
-    node_relationships = {}
+    nodes, owners, neighbors, is_peer = pickle_relationships(pickle_graph)
+    starts = np.searchsorted(owners, np.arange(len(nodes) + 1)).tolist()
+    neighbors = neighbors.tolist()
+    is_peer = is_peer.tolist()
 
     graph = nx.Graph()
-
-    for node in pickleGraph.nodes:
-        customers = []
-        providers = []
-        peers = []
-
-        for in_edges in pickleGraph.in_edges(node):  # Add all peers
-            for out_edges in pickleGraph.out_edges(node):
-                if in_edges[0] == out_edges[1] and in_edges[1] == out_edges[0]:
-                    peers.append(in_edges[0])
-        for edge in pickleGraph.in_edges(node):
-            if edge[0] not in peers:
-                customers.append(edge[0])  # Add all customers (who are not peers already)
-        for edge in pickleGraph.out_edges(node):
-            if edge[1] not in peers:
-                providers.append(edge[1])  # Add all providers (who are not peers already)
-
-        node_relationships[node] = (customers, providers, peers)  # Store in dict
-
-    for node in node_relationships:
-        # node:     1234: ([customers], [providers], [peers])
-        if node not in graph:
-            graph.add_node(node)
-
-        for customer in node_relationships[node][0]:
-            if customer not in graph:
-                graph.add_node(customer)
-            graph.add_edge(node, customer, customer=customer)
-
-        for peer in node_relationships[node][2]:
-            if peer not in graph:
-                graph.add_node(peer)
-            graph.add_edge(node, peer, customer=None)
+    # Like in as-rel files, ASNs are integers
+    nodes = [int(node) for node in nodes]
+    for i, node in enumerate(nodes):
+        graph.add_node(node)
+        for j in range(starts[i], starts[i + 1]):
+            neighbor = nodes[neighbors[j]]
+            graph.add_edge(node, neighbor, customer=None if is_peer[j] else neighbor)
 
     return graph
 
@@ -88,21 +129,29 @@ def parse_as_rel_file(filename: str) -> nx.Graph:
         return parse_as_rel_file_CAIDA(filename)
 
 class ASGraph(object):
-    __slots__ = ['asyss', 'graph']
+    __slots__ = ['asyss', 'graph', 'csr_graph', 'rankings', 'tiers', 'tierOne', 'tierTwo', 'tierThree', 'fingerprint']
 
     asyss: Dict[AS_ID, AS]
-    tierOne = []
-    tierTwo = []
-    tierThree = []
+    csr_graph: Optional[CSRGraph]
+    # ASes sorted by customer degree, per group of tiers (see customer_degree_ranking)
+    rankings: Dict[str, List[AS]]
+    # Tier (1, 2 or 3) of every AS, and the ASes of every tier in graph order. Fixed after construction.
+    tiers: Dict[AS_ID, int]
+    tierOne: Tuple[AS_ID, ...]
+    tierTwo: Tuple[AS_ID, ...]
+    tierThree: Tuple[AS_ID, ...]
+    # AS.state_version and the route_cache.state_fingerprint computed at that version
+    fingerprint: Optional[Tuple[int, bytes]]
 
     def __init__(self, graph: nx.Graph, policy: RoutingPolicy = DefaultPolicy()):
         self.asyss = {}
-        self.tierOne.clear()
-        self.tierTwo.clear()
-        self.tierThree.clear()
+        self.csr_graph = None
+        self.rankings = {}
+        self.fingerprint = None
 
-        for as_id in graph.nodes:
+        for i, as_id in enumerate(graph.nodes):
             self.asyss[as_id] = AS(as_id, policy)
+            self.asyss[as_id].index = i
         # Looks for all edges in the before created graph;
         # evaluates them which type of relation is there and adds the information to each AS
         for (as_id1, as_id2) in graph.edges:
@@ -123,20 +172,58 @@ class ASGraph(object):
         # Tier1: do not have providers
         # Tier2: do have both providers and customers
         # Tier3: do not have customers
+        tiers = {}
         for as_id in graph.nodes:
-            providers = len(self.asyss[as_id].get_providers())
-            customers = len(self.asyss[as_id].get_customers())
-            if customers == 0:
-                self.tierThree.append(as_id)
-            elif providers == 0:
-                self.tierOne.append(as_id)
+            asys = self.asyss[as_id]
+            if len(asys.customers) == 0:
+                tiers[as_id] = 3
+            elif len(asys.providers) == 0:
+                tiers[as_id] = 1
             else:
-                self.tierTwo.append(as_id)
+                tiers[as_id] = 2
+        self._set_tiers(tiers)
 
+    def _set_tiers(self, tiers: Dict[AS_ID, int]) -> None:
+        self.tiers = tiers
+        self.tierOne = tuple(as_id for as_id, tier in tiers.items() if tier == 1)
+        self.tierTwo = tuple(as_id for as_id, tier in tiers.items() if tier == 2)
+        self.tierThree = tuple(as_id for as_id, tier in tiers.items() if tier == 3)
 
     def get_asys(self, as_id: AS_ID) -> Optional[AS]:
         return self.asyss.get(as_id, None)
 
+    @classmethod
+    def from_csr(cls, csr: CSRGraph, tiers: Sequence[int], policy: RoutingPolicy = DefaultPolicy()) -> 'ASGraph':
+        # Rebuilds the AS objects from CSR arrays, e.g. in a worker attached to a shared graph.
+        # tiers holds 1, 2 or 3 for every AS in CSR order.
+        graph = cls.__new__(cls)
+        graph.asyss = {as_id: AS(as_id, policy) for as_id in csr.as_ids}
+        graph.csr_graph = csr
+        graph.rankings = {}
+        graph.fingerprint = None
+
+        asyss = list(graph.asyss.values())
+        by_value = {relation.value: relation for relation in Relation}
+        relations = [by_value[value] for value in csr.neighbor_relations.tolist()]
+        indices = csr.neighbor_indices.tolist()
+        offsets = csr.neighbor_offsets.tolist()
+        for i, asys in enumerate(asyss):
+            asys.index = i
+            for j in range(offsets[i], offsets[i + 1]):
+                asys.add_neighbor(asyss[indices[j]], relations[j])
+
+        graph._set_tiers(dict(zip(csr.as_ids, (int(tier) for tier in tiers))))
+        return graph
+
+    def csr(self) -> CSRGraph:
+        # The topology does not change after construction, so the arrays are built once on first use
+        if self.csr_graph is None:
+            self.csr_graph = CSRGraph.from_as_graph(self)
+        return self.csr_graph
+
+    def get_tier(self, as_id: AS_ID) -> Optional[int]:
+        return self.tiers.get(as_id, None)
+
     def get_tierOne(self):
         return self.tierOne
 
@@ -156,103 +243,77 @@ class ASGraph(object):
                 counter += 1
         return counter
 
+    def customer_degree_ranking(self, tiers: str = 'all') -> List[AS]:
+        """ASes of the given tiers ('all', 'one', 'two' or 'one_and_two') by customer degree, largest first.
+
+        The topology does not change after construction, so every ranking is sorted once on first use. ASes with the
+        same degree keep the order of asyss, or of the tier lists.
+        """
+        ranking = self.rankings.get(tiers)
+        if ranking is None:
+            if tiers == 'all':
+                candidates = list(self.asyss.values())
+            else:
+                as_ids = {
+                    'one': self.get_tierOne(),
+                    'two': self.get_tierTwo(),
+                    'one_and_two': self.get_tierOne() + self.get_tierTwo(),
+                }[tiers]
+                candidates = [self.get_asys(as_id) for as_id in as_ids]
+            ranking = sorted(candidates, key=lambda asys: -len(asys.customers))
+            self.rankings[tiers] = ranking
+        return ranking
+
     # ISP is no customer of any other AS
     def identify_top_isps(self, n: int) -> List[AS]:
         """Top ISPs by customer degree."""
-        isps = [(asys, asys.neighbor_counts_by_relation())
-                for asys in self.asyss.values()]
-        isps.sort(key=lambda pair: -pair[1][Relation.CUSTOMER])
-        return [asys for asys, _ in isps[:n]]
+        return self.customer_degree_ranking('all')[:n]
 
     # ISP is no customer of any other AS
     def identify_top_isps_from_tierone_and_tiertwo(self, n: int) -> List[AS]:
         """Top ISPs by customer degree."""
-        tierone_and_tiertwo = [self.get_asys(as_id) for as_id in self.get_tierOne() + self.get_tierTwo()]
-        isps = [(asys, asys.neighbor_counts_by_relation())
-                for asys in tierone_and_tiertwo]
-        isps.sort(key=lambda pair: -pair[1][Relation.CUSTOMER])
-        return [asys for asys, _ in isps[:n]]
+        return self.customer_degree_ranking('one_and_two')[:n]
 
     def identify_top_isp_from_tier_one(self, n: int) -> List[AS]:
         """Top ISPs by customer degree."""
-        tier_one = [self.get_asys(as_id) for as_id in self.get_tierOne()]
-        isp = [(asys, asys.neighbor_counts_by_relation())
-                for asys in tier_one]
-        isp.sort(key=lambda pair: -pair[1][Relation.CUSTOMER])
-        return [asys for asys, _ in isp[:n]]
+        return self.customer_degree_ranking('one')[:n]
 
     def identify_top_isp_from_tier_two(self, n: int) -> List[AS]:
         """Top ISPs by customer degree."""
-        tier_two = [self.get_asys(as_id) for as_id in self.get_tierTwo()]
-        isp = [(asys, asys.neighbor_counts_by_relation())
-                for asys in tier_two]
-        isp.sort(key=lambda pair: -pair[1][Relation.CUSTOMER])
-        return [asys for asys, _ in isp[:n]]
+        return self.customer_degree_ranking('two')[:n]
+
+    def create_aspa_objects(self, asyss: Iterable[AS]) -> None:
+        """Creates the ASPA objects of all given ASes, as AS.create_new_aspa does for one AS."""
+        tiers = self.tiers
+        for asys in asyss:
+            if tiers.get(asys.as_id) == 1:  # ASPA contains AS0 for all ASes that do not have providers
+                asys.aspa = asys.as_id, ['AS0']
+            else:
+                asys.aspa = asys.as_id, [provider.as_id for provider in asys.providers]
 
     def get_providers(self, ids: List[AS_ID]) -> List[AS]:
         """Return providers of a list of ASes, as a set"""
         providers = set([])
         for as_id in ids:
-            for p_id in self.asyss[as_id].get_providers():
-                providers.add(p_id)
+            for provider in self.asyss[as_id].providers:
+                providers.add(provider.as_id)
         return list(providers)
 
     def determine_reachability_one(self, as_id: AS_ID) -> int:
-        """Returns how many ASs can the given AS, itself included."""
-        graph = self._build_reachability_graph()
-        n_ancestors = len([as_id
-                           for side, as_id in nx.ancestors(graph, ('r', as_id))
-                           if side == 'l'])
-        return n_ancestors
-
-    def determine_reachability_all(self) -> Dict[AS_ID, int]:
-        """Returns how many ASs can reach each AS, themselves included."""
-        graph = self._build_reachability_graph()
-
-        # Process nodes in topological order, keeping track of which ones they are reachable from
-        # with a bitfield.
-
-        # Queue are like stack but with the FIFO Principle; whereas deque works with LIFO
-        queue: deque = deque()
-        remaining_edges = {}
-        for node in graph:
-            # in_degree is the number of edges pointing to the node
-            remaining_edges[node] = graph.in_degree(node)
-            print(remaining_edges[node])
-            if remaining_edges[node] == 0:
-                del remaining_edges[node]
-                queue.append(node)
-        while queue:
-            node = queue.popleft()
-            # A successor of n is a node m such that there exists a directed edge from n to m.
-            for next_node in graph.successors(node):
-                graph.nodes[next_node]['reachable_from'] |= graph.nodes[node]['reachable_from']
-                remaining_edges[next_node] -= 1
-                if remaining_edges[next_node] == 0:
-                    del remaining_edges[next_node]
-                    queue.append(next_node)
-        print({as_id: bit_count(graph.nodes[('r', as_id)]['reachable_from'])
-                for as_id in self.asyss})
-        return {as_id: bit_count(graph.nodes[('r', as_id)]['reachable_from'])
-                for as_id in self.asyss}
-
-    def _build_reachability_graph(self) -> nx.DiGraph:
-        graph = nx.DiGraph()
-        for asys in self.asyss.values():
-            asysInteger = int(asys.as_id)
-            graph.add_node(('l', asysInteger), reachable_from=(1 << asysInteger))
-            graph.add_node(('r', asysInteger), reachable_from=0)
-            graph.add_edge(('l', asysInteger), ('r', asys))
-            print (('l', asysInteger), ('r', asysInteger))
-        for asys in self.asyss.values():
-            for neighbor, relation in asys.neighbors.items():
-                if relation == Relation.CUSTOMER:
-                    graph.add_edge(('r', asysInteger), ('r', int(neighbor.as_id)))
-                elif relation == Relation.PEER:
-                    graph.add_edge(('l', asysInteger), ('r', int(neighbor.as_id)))
-                elif relation == Relation.PROVIDER:
-                    graph.add_edge(('l', asysInteger), ('l', int(neighbor.as_id)))
-        return graph
+        """Returns how many ASs can reach the given AS, itself included."""
+        csr = self.csr()
+        return reachability.reach_count_to(csr, csr.index[as_id])
+
+    def determine_reachability_all(self, block_size: int = reachability.BLOCK_SIZE,
+                                   spill_file: Optional[str] = None) -> Dict[AS_ID, int]:
+        """Returns how many ASs can reach each AS, themselves included.
+
+        Source ASes are processed block_size at a time, and the whole reachability matrix is written to spill_file
+        if it is given, see reachability.reach_counts.
+        """
+        csr = self.csr()
+        counts = reachability.reach_counts(csr, block_size, spill_file)
+        return dict(zip(csr.as_ids, counts.tolist()))
 
     def any_customer_provider_cycles(self) -> bool:
         graph = nx.DiGraph()
@@ -303,7 +364,7 @@ class ASGraph(object):
                 #for elem in routes:
                     #print("Route: ", elem, "; DO: ", elem.local_data_part_do)
 
-    def hijack_n_hops(self, victim: AS, attacker: AS, n: int) -> None:
+    def hijack_n_hops(self, victim: AS, attacker: AS, n: int) -> 'RouteDelta':
         if n < 0:
             raise ValueError("number of hops must be non-negative")
         # If 0 hops then path is only the attacker itself
@@ -332,6 +393,9 @@ class ASGraph(object):
             authenticated=False
         )
 
+        # The bogus route only spreads as far as ASes prefer it, and every route it replaces is recorded so that
+        # the legitimate routing state can be restored with RouteDelta.undo
+        delta = RouteDelta(victim.as_id)
         routes: deque = deque()
         for neighbor in attacker.neighbors:
             routes.append(attacker.forward_route(bad_route, neighbor))
@@ -339,14 +403,45 @@ class ASGraph(object):
         while routes:
             route = routes.popleft()
             asys = route.final
-            for neighbor in asys.learn_route(route):
+            previous = asys.routing_table.get(victim.as_id)
+            neighbors = asys.learn_route(route)
+            delta.visit(asys, previous)
+            for neighbor in neighbors:
                 routes.append(asys.forward_route(route, neighbor))
+        return delta
+
+
+class RouteDelta(object):
+    """Routing table entries for one destination that were replaced on top of a baseline routing state."""
+    __slots__ = ['dest', 'previous', 'visited']
+
+    dest: AS_ID
+    # Route each changed AS had before, None if it had no route
+    previous: Dict[AS, Optional[Route]]
+    # ASes that evaluated at least one route
+    visited: Set[AS]
 
+    def __init__(self, dest: AS_ID):
+        self.dest = dest
+        self.previous = {}
+        self.visited = set()
 
-def bit_count(bitfield: int) -> int:
-    # .count returns the number of times the value "1" appears
-    # bin returns the binary version of a number
-    return bin(bitfield).count('1')
+    def visit(self, asys: AS, previous: Optional[Route]) -> None:
+        self.visited.add(asys)
+        if asys not in self.previous and asys.routing_table.get(self.dest) is not previous:
+            self.previous[asys] = previous
+
+    @property
+    def changed(self) -> List[AS]:
+        return list(self.previous.keys())
+
+    def undo(self) -> None:
+        for asys, route in self.previous.items():
+            if route is None:
+                asys.routing_table.pop(self.dest, None)
+            else:
+                asys.routing_table[self.dest] = route
+        self.previous.clear()
 
 
 def asyss_by_customer_count(
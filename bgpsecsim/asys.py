@@ -1,7 +1,7 @@
 import abc
 import string
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Callable, Dict, FrozenSet, List, Optional
 
 AS_ID = int
 
@@ -25,13 +25,20 @@ class ASConesList:
 class AS(object):
     # __slots__ states which instance attributes you expect your object instances to have -> results in faster access
     __slots__ = [
-        'as_id', 'neighbors', 'policy', 'publishes_rpki', 'publishes_path_end', 'bgp_sec_enabled',
-        'routing_table', 'aspa', 'aspa_enabled', 'ascones', 'ascones_enabled', 'rlm_enabled',
+        'as_id', 'index', 'neighbors', 'customers', 'peers', 'providers', '_policy', 'publishes_rpki',
+        'publishes_path_end', '_bgp_sec_enabled', 'routing_table', '_aspa', 'aspa_providers', 'aspa_enabled',
+        '_ascones', 'ascones_customers', 'ascones_enabled', 'rlm_enabled',
     ]
 
     as_id: AS_ID
-    # Dict stores key:value pairs -> RELATION is connected with the given AS (e.g. Dict['123', 1] states that AS 123 is a CUSTOMER of the current AS
+    # Dense index of the AS in ASGraph.asyss (and in its CSR arrays), -1 for an AS that is not part of a graph
+    index: int
+    # Dict stores key:value pairs -> RELATION is connected with the given AS (e.g. Dict[123, 1] states that AS 123 is a CUSTOMER of the current AS
     neighbors: Dict['AS', Relation]
+    # The same neighbours split by relation, each in the order of neighbors
+    customers: List['AS']
+    peers: List['AS']
+    providers: List['AS']
     policy: 'RoutingPolicy'
     publishes_rpki: bool
     publishes_path_end: bool
@@ -39,10 +46,20 @@ class AS(object):
     routing_table: Dict[AS_ID, 'Route']
     # ASPA object is a list for the current AS with its ID and all its providers, which will be candidates for connections in ASPA algorithm
     aspa: ['AS_ID', AspaList]
+    # The providers of the ASPA object as a set, for constant time lookups by the ASPA verification. Kept in sync by
+    # the aspa setter, None if the AS has no ASPA object.
+    aspa_providers: Optional[FrozenSet[AS_ID]]
     aspa_enabled: bool
     ascones: ['AS_ID', ASConesList]
+    # Same for the customers of the ASCONES object
+    ascones_customers: Optional[FrozenSet[AS_ID]]
     ascones_enabled: bool
     rlm_enabled: bool
+    # Counts changes of ASPA and ASCONES objects of any AS, so that results derived from them can be invalidated
+    attestation_version = 0
+    # Counts changes of anything of any AS that route propagation depends on: the policy, the BGPsec flag and the
+    # ASPA and ASCONES objects, see route_cache.state_fingerprint
+    state_version = 0
 
     def __init__(
             # self represents the instance of the class
@@ -57,15 +74,17 @@ class AS(object):
             rlm_enabled: bool = False,
     ):
         self.as_id = as_id
+        self.index = -1
         self.policy = policy
         self.neighbors = {}
+        self.customers = []
+        self.peers = []
+        self.providers = []
         self.publishes_rpki = publishes_rpki
         self.publishes_path_end = publishes_path_end
         self.bgp_sec_enabled = bgp_sec_enabled
         self.routing_table = {}
-        self.aspa = []
         self.aspa_enabled = aspa_enabled
-        self.ascones = []
         self.ascones_enabled = ascones_enabled
         self.rlm_enabled = rlm_enabled
         self.reset_routing_table()
@@ -76,36 +95,57 @@ class AS(object):
     def neighbor_counts_by_relation(self) -> Dict[Relation, int]:
         # counts number of neighbours of the current AS
         counts = {relation: 0 for relation in Relation}
-        for relation in self.neighbors.values():
-            counts[relation] += 1
+        counts[Relation.CUSTOMER] = len(self.customers)
+        counts[Relation.PEER] = len(self.peers)
+        counts[Relation.PROVIDER] = len(self.providers)
         return counts
 
     def get_providers(self) -> List[AS_ID]:
         # returns a list of all providers of the current AS
-        providers = filter(lambda id: self.neighbors[id] == Relation.PROVIDER, self.neighbors.keys())
-        return [p.as_id for p in providers]
+        return [p.as_id for p in self.providers]
 
     def get_customers(self) -> List[AS_ID]:
         # returns a list of all customers of the current AS
-        customers = filter(lambda id: self.neighbors[id] == Relation.CUSTOMER, self.neighbors.keys())
-        return [p.as_id for p in customers]
+        return [p.as_id for p in self.customers]
 
     def get_peers(self) -> List[AS_ID]:
         # returns a list of all lateral peers of the current AS
-        peer = filter(lambda id: self.neighbors[id] == Relation.PEER, self.neighbors.keys())
-        return [p.as_id for p in peer]
+        return [p.as_id for p in self.peers]
 
     def get_policy(self) -> Optional['RoutingPolicy']:
         return self.policy.name()
 
     def add_peer(self, asys: 'AS') -> None:
-        self.neighbors[asys] = Relation.PEER
+        self.add_neighbor(asys, Relation.PEER)
 
     def add_customer(self, asys: 'AS') -> None:
-        self.neighbors[asys] = Relation.CUSTOMER
+        self.add_neighbor(asys, Relation.CUSTOMER)
 
     def add_provider(self, asys: 'AS') -> None:
-        self.neighbors[asys] = Relation.PROVIDER
+        self.add_neighbor(asys, Relation.PROVIDER)
+
+    def add_neighbor(self, asys: 'AS', relation: Relation) -> None:
+        previous = self.neighbors.get(asys)
+        if previous is not None:
+            # A link keeps its position in neighbors when its relation changes
+            self._neighbors_by_relation(previous).remove(asys)
+            self.neighbors[asys] = relation
+            by_relation = self._neighbors_by_relation(relation)
+            by_relation.clear()
+            by_relation.extend(neighbor for neighbor, rel in self.neighbors.items() if rel == relation)
+            return
+        self.neighbors[asys] = relation
+        self._neighbors_by_relation(relation).append(asys)
+
+    def _neighbors_by_relation(self, relation: Relation) -> List['AS']:
+        if relation == Relation.CUSTOMER:
+            return self.customers
+        if relation == Relation.PEER:
+            return self.peers
+        if relation == Relation.PROVIDER:
+            return self.providers
+        # Route server relations are only kept in neighbors
+        return []
 
     def get_relation(self, asys: 'AS') -> Optional[Relation]:
         return self.neighbors.get(asys, None)
@@ -150,6 +190,14 @@ class AS(object):
 
         #for neighbor, relation in self.neighbors.items():
         #    print("neighbors: ", neighbor.as_id, "Relationship: ", relation, relation in forward_to_relations)
+        if len(self.neighbors) == len(self.customers) + len(self.peers) + len(self.providers):
+            # No route server neighbours: the common cases need no filtering
+            forward_to_customers = Relation.CUSTOMER in forward_to_relations
+            forward_to_others = (Relation.PEER in forward_to_relations, Relation.PROVIDER in forward_to_relations)
+            if forward_to_others == (False, False):
+                return list(self.customers) if forward_to_customers else []
+            if forward_to_customers and forward_to_others == (True, True):
+                return list(self.neighbors)
         return [neighbor
                 for neighbor, relation in self.neighbors.items()
                 if relation in forward_to_relations]
@@ -163,21 +211,18 @@ class AS(object):
             authenticated=self.bgp_sec_enabled,
             local_data_part_do="",
         )
-        if str(self.policy) == "OnlyToCustomerPolicy" or str(self.policy) == "OTCASPAPolicy":
+        if self.policy.otc_egress:
             relation_to_sender = self.get_relation(next_hop)
             self.policy.forward_to(route_to_return, relation_to_sender, True)
         return route_to_return
 
     def forward_route(self, route: 'Route', next_hop: 'AS') -> 'Route':
-        if str(self.policy) == "OnlyToCustomerPolicy" or str(self.policy) == "OTCASPAPolicy":
+        if self.policy.otc_egress:
             relation_to_sender = route.final.get_relation(next_hop)
             current_as = route.final
             current_as.policy.forward_to(route, relation_to_sender)
-        return Route(
-            dest=route.dest,
-            path=route.path + [next_hop],
-            origin_invalid=route.origin_invalid,
-            path_end_invalid=route.path_end_invalid,
+        return route.extend(
+            next_hop,
             authenticated=route.authenticated and next_hop.bgp_sec_enabled,
             local_data_part_do=route.local_data_part_do,
         )
@@ -193,23 +238,63 @@ class AS(object):
             local_data_part_do="",
         )
 
+    @property
+    def policy(self) -> 'RoutingPolicy':
+        return self._policy
+
+    @policy.setter
+    def policy(self, policy: 'RoutingPolicy') -> None:
+        self._policy = policy
+        AS.state_version += 1
+
+    @property
+    def bgp_sec_enabled(self) -> bool:
+        return self._bgp_sec_enabled
+
+    @bgp_sec_enabled.setter
+    def bgp_sec_enabled(self, bgp_sec_enabled: bool) -> None:
+        self._bgp_sec_enabled = bgp_sec_enabled
+        AS.state_version += 1
+
+    @property
+    def aspa(self):
+        return self._aspa
+
+    @aspa.setter
+    def aspa(self, aspa) -> None:
+        self._aspa = aspa
+        self.aspa_providers = None if aspa is None else frozenset(aspa[1])
+        AS.attestation_version += 1
+        AS.state_version += 1
+
+    @property
+    def ascones(self):
+        return self._ascones
+
+    @ascones.setter
+    def ascones(self, ascones) -> None:
+        self._ascones = ascones
+        self.ascones_customers = None if ascones is None else frozenset(ascones[1])
+        AS.attestation_version += 1
+        AS.state_version += 1
+
     def reset_rpki_objects(self) -> None:
         self.aspa = None
         self.ascones = None
 
     def create_new_aspa(self, graph) -> None:
         self.aspa = self.as_id, self.get_providers()
-        if self.as_id in graph.get_tierOne():  # ASPA contains AS0 for all ASes that do not have providers
+        if graph.get_tier(self.as_id) == 1:  # ASPA contains AS0 for all ASes that do not have providers
             self.aspa = self.as_id, ['AS0']
 
     def create_new_ascones(self) -> None:
         self.ascones = self.as_id, self.get_customers()
 
     def create_dummy_aspa(self) -> None:
-        self.aspa = self.as_id, ['1234']
+        self.aspa = self.as_id, [1234]
 
     def create_dummy_ascones(self) -> None:
-        self.ascones = self.as_id, ['1234']
+        self.ascones = self.as_id, [1234]
 
     def get_aspa(self):
         if hasattr(self, 'aspa'):
@@ -229,12 +314,22 @@ class AS(object):
 
 
 class Route(object):
-    __slots__ = ['dest', 'path', 'origin_invalid', 'path_end_invalid', 'authenticated', 'local_data_part_do', ]
+    __slots__ = [
+        'dest', 'parent', 'final', 'length', 'origin', 'has_cycle', 'origin_invalid', 'path_end_invalid',
+        'authenticated', 'local_data_part_do', 'preference', 'preference_rule', 'aspa_summary', 'ascones_summary',
+        'leaker',
+    ]
 
     # Destination is an IP block that is owned by this AS. The AS_ID is the same as the origin's ID
     # for valid routes, but may differ in a hijacking attack.
     dest: AS_ID
-    path: List[AS]
+    # Routes form a tree: every route only stores the route it was forwarded from and the AS it was forwarded to.
+    # The full path is built on demand by the path property.
+    parent: Optional['Route']
+    final: 'AS'
+    length: int
+    origin: 'AS'
+    has_cycle: bool
     # Whether the origin has no valid RPKI record and one is expected.
     origin_invalid: bool
     # Whether the first hop has no valid path-end record and one is expected.
@@ -243,6 +338,15 @@ class Route(object):
     authenticated: bool
     # LocalDataPart1 also called DO, contains an ASN value
     local_data_part_do: string
+    # Preference key of the route and the policy rule that computed it, see RoutingPolicy.preference_key
+    preference: Optional[tuple]
+    preference_rule: Optional[Callable[['Route'], tuple]]
+    # ASPA and ASCONES hop summaries of the path, see routing_policy.verification_summary
+    aspa_summary: Optional[object]
+    ascones_summary: Optional[object]
+    # AS closest to the origin that forwarded the route against the valley-free rules, i.e. sent a route learned
+    # from a peer or provider on to a peer or provider. The origin never counts as leaker.
+    leaker: Optional['AS']
 
     def __init__(
             self,
@@ -254,31 +358,81 @@ class Route(object):
             local_data_part_do="",
     ):
         self.dest = dest
-        self.path = path
         self.origin_invalid = origin_invalid
         self.path_end_invalid = path_end_invalid
         self.authenticated = authenticated
         self.local_data_part_do = local_data_part_do if local_data_part_do is not None else ""
-
-    # @property is python way to create getter and setter method
-    @property
-    def length(self) -> int:
-        return len(self.path)
-
-    @property
-    def origin(self) -> AS:
-        return self.path[0]
+        self.path = path
 
     @property
-    def first_hop(self) -> AS:
-        return self.path[-2]
+    def path(self) -> List[AS]:
+        path = []
+        route = self
+        while route is not None:
+            path.append(route.final)
+            route = route.parent
+        path.reverse()
+        return path
+
+    @path.setter
+    def path(self, path: List[AS]) -> None:
+        self.parent = None
+        if len(path) > 1:
+            self.parent = Route(self.dest, path[:-1], self.origin_invalid, self.path_end_invalid, self.authenticated)
+        self.final = path[-1]
+        self.length = len(path)
+        self.preference = None
+        self.preference_rule = None
+        self.aspa_summary = None
+        self.ascones_summary = None
+        self.origin = path[0]
+        self.has_cycle = len(set(path)) != len(path)
+        self.leaker = None if self.parent is None else self.parent.forwarded_leaker(self.final)
 
     @property
-    def final(self) -> AS:
-        return self.path[-1]
+    def first_hop(self) -> Optional[AS]:
+        return self.parent.final if self.parent is not None else None
+
+    def extend(self, next_hop: AS, authenticated: bool, local_data_part_do: str) -> 'Route':
+        """Returns the route forwarded to next_hop, sharing this route as its parent."""
+        route = Route.__new__(Route)
+        route.dest = self.dest
+        route.parent = self
+        route.final = next_hop
+        route.length = self.length + 1
+        route.origin = self.origin
+        route.has_cycle = self.has_cycle or self.contains(next_hop)
+        route.origin_invalid = self.origin_invalid
+        route.path_end_invalid = self.path_end_invalid
+        route.authenticated = authenticated
+        route.local_data_part_do = local_data_part_do
+        route.preference = None
+        route.preference_rule = None
+        route.aspa_summary = None
+        route.ascones_summary = None
+        route.leaker = self.forwarded_leaker(next_hop)
+        return route
+
+    def forwarded_leaker(self, next_hop: AS) -> Optional[AS]:
+        """The leaker of this route once it is forwarded to next_hop."""
+        if self.leaker is not None or self.parent is None or self.final is self.origin:
+            return self.leaker
+        # Routes mostly go down to customers, which never leaks, so the relation to next_hop is checked first
+        if (self.final.get_relation(next_hop) in (Relation.PEER, Relation.PROVIDER) and
+                self.final.get_relation(self.parent.final) in (Relation.PEER, Relation.PROVIDER)):
+            return self.final
+        return None
+
+    def contains(self, asys: AS) -> bool:
+        route = self
+        while route is not None:
+            if route.final is asys:
+                return True
+            route = route.parent
+        return False
 
     def contains_cycle(self) -> bool:
-        return len(self.path) != len(set(self.path))
+        return self.has_cycle
 
     # __str__ returns the string representation of the object
     def __str__(self) -> str:
@@ -301,6 +455,10 @@ class Route(object):
 
 
 class RoutingPolicy(abc.ABC):
+    # Whether forward_to also has to run when a route is originated or forwarded, to add the OTC attribute of
+    # RFC 9234 on egress
+    otc_egress = False
+
     @abc.abstractmethod
     def accept_route(self, route: Route) -> bool:
         pass
@@ -309,6 +467,14 @@ class RoutingPolicy(abc.ABC):
     def prefer_route(self, current: Route, new: Route) -> bool:
         pass
 
+    @staticmethod
+    def preference_key(route: Route, rule: Callable[[Route], tuple]) -> tuple:
+        """Returns rule(route). The key is cached on the route, as nothing it depends on changes after creation."""
+        if route.preference_rule is not rule:
+            route.preference = rule(route)
+            route.preference_rule = rule
+        return route.preference
+
     @abc.abstractmethod
     def forward_to(self, route: Route, relation: Relation) -> bool:
         pass
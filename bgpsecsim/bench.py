@@ -0,0 +1,247 @@
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import networkx as nx
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is not reported there
+    resource = None
+
+import bgpsecsim.as_graph as as_graph
+import bgpsecsim.propagation as propagation
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.asys import AS, Route
+from bgpsecsim.routing_policy import perform_ASCONES_algorithm, perform_ASPA_algorithm, perform_only_to_customer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+
+# Phases in the order they run for every victim. The OTC check runs last, since it sets the DO attribute of the
+# routes it checks.
+PHASES = [
+    'find_routes_to',
+    'find_routes_to_array',
+    'hijack_n_hops',
+    'perform_ASPA_algorithm',
+    'perform_ASCONES_algorithm',
+    'perform_only_to_customer',
+]
+
+
+def fixture_files() -> List[str]:
+    return sorted(os.path.join(FIXTURES_DIR, name) for name in os.listdir(FIXTURES_DIR) if name.endswith('.txt'))
+
+
+def synthetic_as_graph(n_ases: int, seed: int = 0) -> nx.Graph:
+    """Generates an AS topology with roughly the shape of the CAIDA graph.
+
+    A full mesh of tier one ASes, transit ASes with one to three providers and a few peers, and stub ASes with one
+    or two providers. Providers are picked with preferential attachment on their number of customers, which gives
+    the heavy-tailed degree distribution of the real graph. Providers are always created before their customers, so
+    there are no customer-provider cycles.
+    """
+    rand = random.Random(seed)
+    n_tier_one = min(20, max(3, n_ases // 4000))
+    n_transit = max(1, n_ases // 8)
+
+    graph = nx.Graph()
+    as_ids = list(range(1, n_ases + 1))
+    graph.add_nodes_from(as_ids)
+    # Every AS appears once, plus once per customer, so that random.choice prefers large providers
+    providers: List[int] = []
+
+    for i, as_id in enumerate(as_ids[:n_tier_one]):
+        for peer in as_ids[:i]:
+            graph.add_edge(as_id, peer, customer=None)
+        providers.append(as_id)
+
+    transit = as_ids[n_tier_one:n_tier_one + n_transit]
+    for i, as_id in enumerate(transit):
+        for provider in set(rand.choice(providers) for _ in range(rand.randint(1, 3))):
+            graph.add_edge(provider, as_id, customer=as_id)
+            providers.append(provider)
+        for peer in set(rand.choice(transit[:i]) for _ in range(rand.randint(0, 3)) if i > 0):
+            if not graph.has_edge(as_id, peer):
+                graph.add_edge(as_id, peer, customer=None)
+        providers.append(as_id)
+
+    for as_id in as_ids[n_tier_one + n_transit:]:
+        for provider in set(rand.choice(providers) for _ in range(rand.randint(1, 2))):
+            graph.add_edge(provider, as_id, customer=as_id)
+            providers.append(provider)
+
+    return graph
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return maxrss if platform.system() == 'Darwin' else maxrss * 1024
+
+
+class PhaseResult(object):
+    __slots__ = ['seconds', 'trials', 'routes', 'allocated_peak', 'peak_rss']
+
+    seconds: float
+    trials: int
+    # Routes created or checked by the phase
+    routes: int
+    # Peak of memory traced by tracemalloc during one trial, in bytes
+    allocated_peak: Optional[int]
+    # Peak RSS of the process after the phase, in bytes
+    peak_rss: Optional[int]
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.trials = 0
+        self.routes = 0
+        self.allocated_peak = None
+        self.peak_rss = None
+
+    def to_json(self) -> dict:
+        return {
+            'seconds': self.seconds,
+            'trials': self.trials,
+            'routes': self.routes,
+            'trials_per_sec': self.trials / self.seconds if self.seconds > 0 else None,
+            'routes_per_sec': self.routes / self.seconds if self.seconds > 0 else None,
+            'allocated_peak_bytes': self.allocated_peak,
+            'peak_rss_bytes': self.peak_rss,
+        }
+
+
+def _routes_to(graph: ASGraph, victim: AS) -> List[Route]:
+    return [route for asys in graph.asyss.values() if asys is not victim
+            for route in [asys.get_route(victim.as_id)] if route is not None]
+
+
+def _trial(graph: ASGraph, victim: AS, attacker: AS) -> List[Tuple[str, Callable[[], int]]]:
+    """The steps of one trial, as (phase, function returning the number of routes) pairs."""
+    def find_routes_to() -> int:
+        graph.clear_routing_tables()
+        graph.find_routes_to(victim)
+        return len(_routes_to(graph, victim))
+
+    def find_routes_to_array() -> int:
+        state = propagation.find_routes_to(graph, victim, graph.csr())
+        return int((state.route_of >= 0).sum()) - 1
+
+    def hijack_n_hops() -> int:
+        delta = graph.hijack_n_hops(victim, attacker, 1)
+        delta.undo()
+        return len(delta.visited)
+
+    def validate(algorithm: Callable[[Route], object]) -> Callable[[], int]:
+        def run() -> int:
+            routes = _routes_to(graph, victim)
+            for route in routes:
+                algorithm(route)
+            return len(routes)
+        return run
+
+    return [
+        ('find_routes_to', find_routes_to),
+        ('find_routes_to_array', find_routes_to_array),
+        ('hijack_n_hops', hijack_n_hops),
+        ('perform_ASPA_algorithm', validate(perform_ASPA_algorithm)),
+        ('perform_ASCONES_algorithm', validate(perform_ASCONES_algorithm)),
+        ('perform_only_to_customer', validate(perform_only_to_customer)),
+    ]
+
+
+def bench_graph(nx_graph: nx.Graph, trials: int, seed: int = 0) -> Dict[str, PhaseResult]:
+    """Runs every phase for trials random victim/attacker pairs and once more under tracemalloc."""
+    graph = ASGraph(nx_graph)
+    graph.create_aspa_objects(graph.asyss.values())
+    for asys in graph.asyss.values():
+        asys.create_new_ascones()
+    # The CSR arrays are built once per graph, not as part of the first array engine trial
+    graph.csr()
+
+    rand = random.Random(seed)
+    as_ids = sorted(graph.asyss.keys())
+    pairs = [tuple(graph.get_asys(as_id) for as_id in rand.sample(as_ids, 2)) for _ in range(trials)]
+    results = {phase: PhaseResult() for phase in PHASES}
+
+    for victim, attacker in pairs:
+        for phase, step in _trial(graph, victim, attacker):
+            started = time.perf_counter()
+            routes = step()
+            results[phase].seconds += time.perf_counter() - started
+            results[phase].trials += 1
+            results[phase].routes += routes
+            results[phase].peak_rss = peak_rss()
+
+    # Allocations are measured in a separate pass, tracing slows down the timed code several times over
+    if pairs:
+        victim, attacker = pairs[0]
+        tracemalloc.start()
+        try:
+            for phase, step in _trial(graph, victim, attacker):
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                step()
+                _, peak = tracemalloc.get_traced_memory()
+                results[phase].allocated_peak = peak - baseline
+        finally:
+            tracemalloc.stop()
+
+    return results
+
+
+def run_benchmarks(as_rel_files: Sequence[str], synthetic_sizes: Sequence[int], trials: int,
+                   seed: int = 0) -> dict:
+    """Benchmarks every graph and returns the results in the format written by the bench command."""
+    graphs = [(os.path.basename(filename), lambda filename=filename: as_graph.parse_as_rel_file(filename))
+              for filename in as_rel_files]
+    graphs += [(f'synthetic-{n_ases}', lambda n_ases=n_ases: synthetic_as_graph(n_ases, seed))
+               for n_ases in synthetic_sizes]
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'trials': trials,
+        'graphs': [],
+    }
+    for name, load in graphs:
+        nx_graph = load()
+        results = bench_graph(nx_graph, trials, seed)
+        report['graphs'].append({
+            'name': name,
+            'ases': nx_graph.number_of_nodes(),
+            'links': nx_graph.number_of_edges(),
+            'phases': {phase: result.to_json() for phase, result in results.items()},
+        })
+    return report
+
+
+def format_report(report: dict) -> str:
+    lines = []
+    for graph in report['graphs']:
+        lines.append(f"{graph['name']}: {graph['ases']} ASes, {graph['links']} links")
+        for phase, result in graph['phases'].items():
+            trials_per_sec = result['trials_per_sec'] or 0
+            routes_per_sec = result['routes_per_sec'] or 0
+            allocated = (result['allocated_peak_bytes'] or 0) / 2 ** 20
+            lines.append(f"  {phase:<26} {trials_per_sec:>10.1f} trials/s {routes_per_sec:>12.0f} routes/s "
+                         f"{allocated:>8.2f} MiB allocated")
+    rss = [result['peak_rss_bytes'] for graph in report['graphs'] for result in graph['phases'].values()
+           if result['peak_rss_bytes'] is not None]
+    if rss:
+        lines.append(f"Peak RSS: {max(rss) / 2 ** 20:.1f} MiB")
+    return '\n'.join(lines)
+
+
+def write_report(report: dict, output_file: str) -> None:
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -1,29 +1,46 @@
 import click
-import networkx as nx
 import random
 
-import bgpsecsim.as_graph as as_graph
+import bgpsecsim.bench as bench
 import bgpsecsim.experiments as experiments
+import bgpsecsim.graph_cache as graph_cache
 import bgpsecsim.graphs as graphs
+import bgpsecsim.reachability as reachability
 import bgpsecsim.routing_policy as routing_policy
-from bgpsecsim.as_graph import ASGraph
 import other.evaluation as eval
 
+# Suffixes accepted by --memory-budget
+MEMORY_UNITS = {'K': 2 ** 10, 'M': 2 ** 20, 'G': 2 ** 30}
+
 @click.group()
 def cli():
     pass
 
+
+def parse_memory_size(ctx, param, value):
+    """Number of bytes from a size like 512M or 2G."""
+    if value is None:
+        return None
+    text = value.strip().upper().rstrip('B')
+    unit = MEMORY_UNITS.get(text[-1:], 1)
+    if unit > 1:
+        text = text[:-1]
+    try:
+        return int(float(text) * unit)
+    except ValueError:
+        raise click.BadParameter(f"{value!r} is not a size like 512M or 2G")
+
+
 @cli.command()
 @click.argument('as-rel-file')
 def check_graph(as_rel_file):
-    nx_graph = as_graph.parse_as_rel_file(as_rel_file)
+    graph = graph_cache.load_as_rel_file(as_rel_file).to_as_graph()
 
-    if not nx.is_connected(nx_graph):
+    if not graph.csr().is_connected():
         print("Graph is not fully connected!")
     else:
         print("Graph is fully connected")
 
-    graph = ASGraph(nx_graph)
     print("Checking for customer-provider cycles")
     if graph.any_customer_provider_cycles():
         print("Graph has a customer-provider cycle!")
@@ -36,9 +53,7 @@ def check_graph(as_rel_file):
 @click.argument('origin-asn', type=int)
 @click.argument('final-asn', type=int)
 def find_route(as_rel_file, origin_asn, final_asn):
-    nx_graph = as_graph.parse_as_rel_file(as_rel_file)
-
-    graph = ASGraph(nx_graph)
+    graph = graph_cache.load_as_rel_file(as_rel_file).to_as_graph()
     print("Loaded graph")
 
     origin = graph.get_asys(origin_asn)
@@ -53,9 +68,7 @@ def find_route(as_rel_file, origin_asn, final_asn):
 @click.argument('as-rel-file')
 @click.argument('target-asn', type=int)
 def get_path_lengths(as_rel_file, target_asn):
-    nx_graph = as_graph.parse_as_rel_file(as_rel_file)
-
-    graph = ASGraph(nx_graph, policy=routing_policy.RPKIPolicy())
+    graph = graph_cache.load_as_rel_file(as_rel_file).to_as_graph(policy=routing_policy.RPKIPolicy())
     print("Loaded graph")
 
     origin_id = int(target_asn)
@@ -83,24 +96,75 @@ def get_path_lengths(as_rel_file, target_asn):
     for path_len, count in sorted(path_lengths.items()):
         print(f"path_length: {path_len}, count: {count}")
 
+@cli.command('reachability')
+@click.option('--memory-budget', callback=parse_memory_size,
+              help="Memory for the reachability bitsets, e.g. 512M or 2G (default: blocks of 4096 source ASes)")
+@click.option('--spill-file', help="Also write the whole reachability matrix to this .npy file")
+@click.option('-o', '--output-file', help="Write the number of ASes reaching every AS to this file")
+@click.argument('as-rel-file')
+def run_reachability(memory_budget, spill_file, output_file, as_rel_file):
+    graph = graph_cache.load_as_rel_file(as_rel_file).to_as_graph()
+    print("Loaded graph")
+
+    block_size = reachability.BLOCK_SIZE
+    if memory_budget is not None:
+        try:
+            block_size = reachability.block_size_for_budget(len(graph.asyss), memory_budget)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--memory-budget')
+    print(f"Determining reachability in blocks of {block_size} ASs")
+    reach = graph.determine_reachability_all(block_size, spill_file)
+
+    total_asyss = len(reach)
+    counts = sorted(reach.values())
+    print(f"{sum(1 for count in counts if count == total_asyss)} / {total_asyss} ASs are reachable from all ASs")
+    print(f"min: {counts[0]}, median: {counts[len(counts) // 2]}, max: {counts[-1]}")
+    if output_file is not None:
+        with open(output_file, 'w') as f:
+            for as_id, count in reach.items():
+                f.write(f"{as_id} {count}\n")
+
+
 @cli.command()
 @click.option('-s', '--seed', type=int)
 @click.option('--trials', type=int, default=1)
+@click.option('--chunk-size', type=int, help="Trials per worker job (default: adapted to the time per trial)")
 @click.argument('figure')
 @click.argument('as-rel-file')
 @click.argument('output-file')
-def generate(seed, trials, figure, as_rel_file, output_file):
+def generate(seed, trials, chunk_size, figure, as_rel_file, output_file):
     import sys
     sys.setrecursionlimit(100000)
 
     if seed is not None:
         random.seed(seed)
 
-    nx_graph = as_graph.parse_as_rel_file(as_rel_file)
+    # The figures still take a networkx graph, but it is rebuilt from the binary cache instead of parsing the file
+    edge_list = graph_cache.load_as_rel_file(as_rel_file)
+    nx_graph = edge_list.to_nx_graph()
     print("Loaded graph")
 
     func = getattr(graphs, figure)
-    func(output_file, nx_graph, trials)
+    # Experiment workers are started once and reused for every deployment point of the figure
+    csr, tiers = edge_list.to_csr()
+    # Exported straight from the edge list, the pool serves the same topology as ASGraph(nx_graph)
+    with experiments.WorkerPool.from_csr(csr, tiers, chunk_size=chunk_size):
+        func(output_file, nx_graph, trials)
+
+
+@cli.command('bench')
+@click.option('-s', '--seed', type=int, default=0)
+@click.option('--trials', type=int, default=10, help="Victim/attacker pairs per graph")
+@click.option('--synthetic', type=int, multiple=True, help="Also benchmark a synthetic graph with this many ASes")
+@click.option('-o', '--output-file', help="Write the results as JSON to this file")
+@click.argument('as-rel-files', nargs=-1)
+def run_bench(seed, trials, synthetic, output_file, as_rel_files):
+    # Without graph files, the topologies in tests/fixtures are used
+    as_rel_files = as_rel_files or bench.fixture_files()
+    report = bench.run_benchmarks(as_rel_files, synthetic, trials, seed)
+    print(bench.format_report(report))
+    if output_file is not None:
+        bench.write_report(report, output_file)
 
 
 @cli.command()
@@ -0,0 +1,106 @@
+import hashlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from bgpsecsim.asys import AS_ID, Relation
+
+
+class CSRGraph(object):
+    """AS topology stored as compressed sparse row (CSR) integer arrays.
+
+    Every AS is given a dense index in the order of ASGraph.asyss. The neighbours of the AS with index i are
+    neighbor_indices[neighbor_offsets[i]:neighbor_offsets[i + 1]], in the same order as AS.neighbors, and
+    neighbor_relations holds the matching Relation values as seen from AS i (e.g. Relation.CUSTOMER.value means
+    that the neighbour is a customer of AS i).
+    """
+    __slots__ = [
+        'as_ids', 'index', 'neighbor_offsets', 'neighbor_indices', 'neighbor_relations', 'tie_rank',
+        'topology_digest',
+    ]
+
+    as_ids: List[AS_ID]
+    index: Dict[AS_ID, int]
+    neighbor_offsets: np.ndarray
+    neighbor_indices: np.ndarray
+    neighbor_relations: np.ndarray
+    # Position of each AS ID in the sorted list of all AS IDs. Route preference breaks ties on the next hop's
+    # AS ID, so comparing ranks gives the same order as comparing the IDs themselves.
+    tie_rank: np.ndarray
+    # Built on first use by digest()
+    topology_digest: Optional[bytes]
+
+    def __init__(
+            self,
+            as_ids: Sequence[AS_ID],
+            neighbor_offsets: np.ndarray,
+            neighbor_indices: np.ndarray,
+            neighbor_relations: np.ndarray,
+    ):
+        self.as_ids = list(as_ids)
+        self.index = {as_id: i for i, as_id in enumerate(self.as_ids)}
+        self.neighbor_offsets = neighbor_offsets
+        self.neighbor_indices = neighbor_indices
+        self.neighbor_relations = neighbor_relations
+
+        order = sorted(range(len(self.as_ids)), key=lambda i: self.as_ids[i])
+        self.tie_rank = np.empty(len(self.as_ids), dtype=np.int64)
+        self.tie_rank[order] = np.arange(len(self.as_ids), dtype=np.int64)
+        self.topology_digest = None
+
+    @classmethod
+    def from_as_graph(cls, graph) -> 'CSRGraph':
+        as_ids = list(graph.asyss.keys())
+
+        offsets = np.zeros(len(as_ids) + 1, dtype=np.int64)
+        indices = []
+        relations = []
+        for i, asys in enumerate(graph.asyss.values()):
+            for neighbor, relation in asys.neighbors.items():
+                indices.append(neighbor.index)
+                relations.append(relation.value)
+            offsets[i + 1] = len(indices)
+
+        return cls(
+            as_ids,
+            offsets,
+            np.array(indices, dtype=np.int64),
+            np.array(relations, dtype=np.int8),
+        )
+
+    def __len__(self) -> int:
+        return len(self.as_ids)
+
+    def digest(self) -> bytes:
+        """Hash of the AS IDs, neighbours and relations, equal for two graphs exactly if their topology is."""
+        if self.topology_digest is None:
+            h = hashlib.sha256()
+            for array in (np.asarray(self.as_ids, dtype=np.int64), self.neighbor_offsets.astype(np.int64),
+                          self.neighbor_indices.astype(np.int64), self.neighbor_relations.astype(np.int8)):
+                h.update(np.ascontiguousarray(array).tobytes())
+            self.topology_digest = h.digest()
+        return self.topology_digest
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.neighbor_offsets)
+
+    def is_connected(self) -> bool:
+        # Breadth-first search from AS 0, expanding the whole frontier at once
+        visited = np.zeros(len(self.as_ids), dtype=bool)
+        if len(visited) == 0:
+            return True
+        visited[0] = True
+        frontier = np.array([0], dtype=np.int64)
+        while len(frontier) > 0:
+            starts = self.neighbor_offsets[frontier]
+            lengths = self.neighbor_offsets[frontier + 1] - starts
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            neighbors = np.unique(self.neighbor_indices[positions])
+            frontier = neighbors[~visited[neighbors]]
+            visited[frontier] = True
+        return bool(visited.all())
+
+    def neighbors_of(self, i: int, relation: Relation) -> np.ndarray:
+        start, end = self.neighbor_offsets[i], self.neighbor_offsets[i + 1]
+        mask = self.neighbor_relations[start:end] == relation.value
+        return self.neighbor_indices[start:end][mask]
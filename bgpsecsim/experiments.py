@@ -3,14 +3,19 @@ from fractions import Fraction
 import multiprocessing as mp
 import multiprocessing.synchronize as mpsync
 import networkx as nx
+import pickle
 import random
 import signal
+import time
 import warnings
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import numpy as np
 from bgpsecsim.asys import Relation, AS, AS_ID
-from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.as_graph import ASGraph, RouteDelta
+from bgpsecsim.csr_graph import CSRGraph
+from bgpsecsim.route_cache import RouteCache, state_fingerprint
+from bgpsecsim.shared_graph import GraphState, SharedGraph
 from bgpsecsim.routing_policy import (
     DefaultPolicy, RPKIPolicy, PathEndValidationPolicy,
     BGPsecHighSecPolicy, BGPsecMedSecPolicy, BGPsecLowSecPolicy,
@@ -18,6 +23,10 @@ from bgpsecsim.routing_policy import (
 )
 
 PARALLELISM = 250
+# Target duration of a chunk of trials sent to a worker, when the chunk size is adapted automatically
+CHUNK_SECONDS = 2.0
+# Memory for cached route propagations, of the current process or shared by all worker processes of a pool
+ROUTE_CACHE_BYTES = 1024 * 2 ** 20
 
 
 def figure2a_line_1_next_as(
@@ -198,35 +207,32 @@ def run_trial(graph, victim_id, attacker_id, n_hops):
     return result
 
 
+def run_experiment(
+        graph: ASGraph,
+        trials: List[Tuple[AS_ID, AS_ID]],
+        experiment_type: type,
+        *args
+) -> List[Fraction]:
+    # Use the pool of the running generate command if it serves this topology, otherwise start one for this call
+    if _worker_pool is not None and _worker_pool.serves(graph):
+        return _worker_pool.run(graph, trials, experiment_type, *args)
+    with WorkerPool(graph, min(PARALLELISM, max(len(trials), 1))) as pool:
+        return pool.run(graph, trials, experiment_type, *args)
+
+
 def figure2a_experiment(
         graph: ASGraph,
         trials: List[Tuple[AS_ID, AS_ID]],
         n_hops: int
 ) -> List[Fraction]:
-    trial_queue: mp.Queue = mp.Queue()
-    result_queue: mp.Queue = mp.Queue()
-    workers = [Figure2aExperiment(trial_queue, result_queue, graph, n_hops)
-               for _ in range(PARALLELISM)]
-    for worker in workers:
-        worker.start()
-
-    for trial in trials:
-        trial_queue.put(trial)
+    results = run_experiment(graph, trials, Figure2aExperiment, n_hops)
+    if results:
+        print("Results: ", results[-1])
+    return results
 
-    results = []
-    for _ in range(len(trials)):
-        result = result_queue.get()
-        results.append(result)
-
-    for worker in workers:
-        worker.stop()
-    for worker in workers:
-        trial_queue.put(None)
-    for worker in workers:
-        worker.join()
-    print("Results: ", result)
 
-    return results
+def as_ids(asyss: List[AS]) -> List[AS_ID]:
+    return [asys.as_id for asys in asyss]
 
 
 def figureRouteLeak_experiment_selective(
@@ -236,32 +242,9 @@ def figureRouteLeak_experiment_selective(
         deployment_ASPA_policy_list: List,
         algorithm: str
 ) -> List[Fraction]:
-    trial_queue: mp.Queue = mp.Queue()
-    result_queue: mp.Queue = mp.Queue()
-    # Workers are being reused! Meaning that any change in the graph will affect later evaluations within the same worker!
-    # Make sure to reset policies and routing tables when reusing a worker!
-    workers = [FigureRouteLeakExperiment(trial_queue, result_queue, graph, deployment_ASPA_objects_list,
-                                         deployment_ASPA_policy_list, algorithm)
-               for _ in range(PARALLELISM)]
-    for worker in workers:
-        worker.start()
-
-    for trial in trials:
-        trial_queue.put(trial)
-
-    results = []
-    for _ in range(len(trials)):
-        result = result_queue.get()
-        results.append(result)
-
-    for worker in workers:
-        worker.stop()
-    for worker in workers:
-        trial_queue.put(None)
-    for worker in workers:
-        worker.join()
-
-    return results
+    # Workers have their own copy of the graph, so the deployment is sent as AS IDs
+    return run_experiment(graph, trials, FigureRouteLeakExperiment, as_ids(deployment_ASPA_objects_list),
+                          as_ids(deployment_ASPA_policy_list), algorithm)
 
 
 def figureRouteLeak_experiment_random(
@@ -271,32 +254,8 @@ def figureRouteLeak_experiment_random(
         aspa_deployment: [int, int, int, int, int, int],
         algorithm: str
 ) -> List[Fraction]:
-    trial_queue: mp.Queue = mp.Queue()
-    result_queue: mp.Queue = mp.Queue()
-    # Workers are being reused! Meaning that any change in the graph will affect later evaluations within the same worker!
-    # Make sure to reset policies and routing tables when reusing a worker!
-    workers = [FigureRouteLeakExperimentRandom(trial_queue, result_queue, graph, [],
-                                               [], algorithm, deployment, aspa_deployment)
-               for _ in range(PARALLELISM)]
-    for worker in workers:
-        worker.start()
-
-    for trial in trials:
-        trial_queue.put(trial)
-
-    results = []
-    for _ in range(len(trials)):
-        result = result_queue.get()
-        results.append(result)
-
-    for worker in workers:
-        worker.stop()
-    for worker in workers:
-        trial_queue.put(None)
-    for worker in workers:
-        worker.join()
-
-    return results
+    return run_experiment(graph, trials, FigureRouteLeakExperimentRandom, [], [], algorithm, deployment,
+                          aspa_deployment)
 
 
 def figureRouteLeak_experiment_top_isps(
@@ -305,31 +264,7 @@ def figureRouteLeak_experiment_top_isps(
         deployment: List[int],
         algorithm: str
 ) -> List[Fraction]:
-    trial_queue: mp.Queue = mp.Queue()
-    result_queue: mp.Queue = mp.Queue()
-    # Workers are being reused! Meaning that any change in the graph will affect later evaluations within the same worker!
-    # Make sure to reset policies and routing tables when reusing a worker!
-    workers = [FigureRouteLeakExperimentRandom(trial_queue, result_queue, graph, deployment, algorithm)
-               for _ in range(PARALLELISM)]
-    for worker in workers:
-        worker.start()
-
-    for trial in trials:
-        trial_queue.put(trial)
-
-    results = []
-    for _ in range(len(trials)):
-        result = result_queue.get()
-        results.append(result)
-
-    for worker in workers:
-        worker.stop()
-    for worker in workers:
-        trial_queue.put(None)
-    for worker in workers:
-        worker.join()
-
-    return results
+    return run_experiment(graph, trials, FigureRouteLeakExperimentRandom, deployment, algorithm)
 
 
 def figureRouteLeak_experiment_nils(
@@ -338,31 +273,7 @@ def figureRouteLeak_experiment_nils(
         deployment: List[int],
         algorithm: str
 ) -> List[Fraction]:
-    trial_queue: mp.Queue = mp.Queue()
-    result_queue: mp.Queue = mp.Queue()
-    # Workers are being reused! Meaning that any change in the graph will affect later evaluations within the same worker!
-    # Make sure to reset policies and routing tables when reusing a worker!
-    workers = [FigureRouteLeakExperimentNils(trial_queue, result_queue, graph, deployment, algorithm)
-               for _ in range(PARALLELISM)]
-    for worker in workers:
-        worker.start()
-
-    for trial in trials:
-        trial_queue.put(trial)
-
-    results = []
-    for _ in range(len(trials)):
-        result = result_queue.get()
-        results.append(result)
-
-    for worker in workers:
-        worker.stop()
-    for worker in workers:
-        trial_queue.put(None)
-    for worker in workers:
-        worker.join()
-
-    return results
+    return run_experiment(graph, trials, FigureRouteLeakExperimentNils, deployment, algorithm)
 
 
 def figureForgedOrigin_experiment_random(
@@ -372,32 +283,8 @@ def figureForgedOrigin_experiment_random(
         deployment_policy: int,
         algorithm: str
 ) -> List[Fraction]:
-    trial_queue: mp.Queue = mp.Queue()
-    result_queue: mp.Queue = mp.Queue()
-    # Workers are being reused! Meaning that any change in the graph will affect later evaluations within the same worker!
-    # Make sure to reset policies and routing tables when reusing a worker!
-    workers = [FigureForgedOriginPrefixHijackExperimentRandom(trial_queue, result_queue, graph, deployment_objects,
-                                                              deployment_policy, algorithm)
-               for _ in range(PARALLELISM)]
-    for worker in workers:
-        worker.start()
-
-    for trial in trials:
-        trial_queue.put(trial)
-
-    results = []
-    for _ in range(len(trials)):
-        result = result_queue.get()
-        results.append(result)
-
-    for worker in workers:
-        worker.stop()
-    for worker in workers:
-        trial_queue.put(None)
-    for worker in workers:
-        worker.join()
-
-    return results
+    return run_experiment(graph, trials, FigureForgedOriginPrefixHijackExperimentRandom, deployment_objects,
+                          deployment_policy, algorithm)
 
 
 def figureForgedOrigin_experiment_selective(
@@ -407,32 +294,8 @@ def figureForgedOrigin_experiment_selective(
         deployment_policy_list: List,
         algorithm: str
 ) -> List[Fraction]:
-    trial_queue: mp.Queue = mp.Queue()
-    result_queue: mp.Queue = mp.Queue()
-    # Workers are being reused! Meaning that any change in the graph will affect later evaluations within the same worker!
-    # Make sure to reset policies and routing tables when reusing a worker!
-    workers = [FigureForgedOriginPrefixHijackExperiment(trial_queue, result_queue, graph, deployment_objects_list,
-                                                        deployment_policy_list, algorithm)
-               for _ in range(PARALLELISM)]
-    for worker in workers:
-        worker.start()
-
-    for trial in trials:
-        trial_queue.put(trial)
-
-    results = []
-    for _ in range(len(trials)):
-        result = result_queue.get()
-        results.append(result)
-
-    for worker in workers:
-        worker.stop()
-    for worker in workers:
-        trial_queue.put(None)
-    for worker in workers:
-        worker.join()
-
-    return results
+    return run_experiment(graph, trials, FigureForgedOriginPrefixHijackExperiment, as_ids(deployment_objects_list),
+                          as_ids(deployment_policy_list), algorithm)
 
 
 def figure4_k_hop(nx_graph: nx.Graph, trials: List[Tuple[AS_ID, AS_ID]], n_hops: int) -> List[Fraction]:
@@ -864,30 +727,35 @@ def figure45_selective_aspa_deployment(nx_graph: nx.Graph, deployment_objects: i
 
 # Result is a fraction, shows the ratio of successful attacks to not attacked routes
 def attacker_success_rate(graph: ASGraph, attacker: AS, victim: AS) -> Fraction:
+    n_bad_routes, n_total_routes = attacker_success_counts(graph, attacker, victim)
+    # Fraction gives the first value as numerator and the second as denominator
+    return Fraction(n_bad_routes, n_total_routes) * 100
+
+
+# Number of routes to the victim that were hijacked by the attacker, and number of routes to the victim
+def attacker_success_counts(graph: ASGraph, attacker: AS, victim: AS) -> Tuple[int, int]:
     n_bad_routes = 0
     n_total_routes = 0
     for asys in graph.asyss.values():
         route = asys.get_route(victim.as_id)
         if route:
             n_total_routes += 1
-            if attacker in route.path and route.path[route.path.index(
-                    attacker) - 1] == victim:  # check that victim is one before avoid counting regular routes received by attacker
+            path = route.path
+            # check that victim is one before to avoid counting regular routes received by attacker
+            if attacker in path and path[path.index(attacker) - 1] == victim:
                 n_bad_routes += 1
-                # print('Attacker: ', str(attacker.as_id) + ' Victim: ' + str(victim.as_id) + ' Bad route: ', [asys.as_id for asys in route.path])
-            # else:
-            # print('Attacker: ', str(attacker.as_id) + ' Victim: ' + str(victim.as_id) + ' Regular route: ', [asys.as_id for asys in route.path])
-    # Fraction gives the first value as numerator and the second as denominator
-    # print('Bad routes: ' + str(n_bad_routes) + ' ; Total routes: ' + str(n_total_routes))
-    return Fraction(n_bad_routes, n_total_routes) * 100
+    return n_bad_routes, n_total_routes
 
 
-# Check if route contains a relationship that goes against the Gao-Rexford model
+# Check if route contains a relationship that goes against the Gao-Rexford model, by walking the whole path. During
+# propagation the same AS is marked on the route as Route.leaker, see route_leaker.
 def leaked_route(route: ['Route']) -> AS:
     # Check for each AS except origin and destination in the path if Gao-Rexford was respected
-    for idasys, asys in enumerate(route.path):
+    path = route.path
+    for idasys, asys in enumerate(path):
         if asys is not route.final and asys is not route.origin:
-            previous_asys = route.path[idasys - 1]
-            next_asys = route.path[idasys + 1]
+            previous_asys = path[idasys - 1]
+            next_asys = path[idasys + 1]
             # Peer sends route to other peer or upstream
             if asys.get_relation(previous_asys) == Relation.PEER and (
                     asys.get_relation(next_asys) == Relation.PEER or asys.get_relation(next_asys) == Relation.PROVIDER):
@@ -899,68 +767,186 @@ def leaked_route(route: ['Route']) -> AS:
     return False
 
 
+# AS that leaked the route, or False. The marker set during propagation only differs from the path check when the
+# AS holding the route also appears earlier on the path, since an AS does not count as leaker of its own route.
+def route_leaker(route: 'Route') -> AS:
+    if route.leaker is not None and route.leaker is route.final:
+        return leaked_route(route)
+    return route.leaker or False
+
+
 # This function returns a fraction of total vs. bad routes.
 def route_leak_success_rate(graph: ASGraph, attacker: AS, victim: AS) -> Fraction:
-    #print("#-----------------------------------------#")
-    #print("Enum: Attacker: ", attacker.as_id, "Victim: ", victim.as_id)
-    n_bad_routes = 0
-    n_total_routes = 0
-    for asys in graph.asyss.values():
-        #print("+---------------------+")
-        #print("Current AS: ", asys.as_id, "; Policy: ", asys.policy)
-        route = asys.get_route(victim.as_id)
-        if route:
-            #print("Routes: ", route, "; DO: ", route.local_data_part_do)
-            n_total_routes += 1
-            offending_asys = leaked_route(route)
-            if offending_asys:
-                # print("AS: ", asys.as_id, "Route: ", route)
-                n_bad_routes += 1
-                # print(offending_asys.as_id, ", ", attacker.as_id)
-                # TODO: remove comment infront of if-statement
-                if offending_asys.as_id != attacker.as_id:
-                    raise Exception("Attacker mismatches offending AS")
-                # print("Attacker mismatches offending AS")
-    # print('Bad routes: ', n_bad_routes)
-    # print('Total routes: ', n_total_routes)
-    # print('----')
+    n_bad_routes, n_total_routes = route_leak_counts(graph, attacker, victim)
     # Fraction gives the first value as numerator and the second as denominator
-    #print('Bad routes: ' + str(n_bad_routes) + ' ; Total routes: ' + str(n_total_routes))
-    return_val = Fraction(n_bad_routes, n_total_routes) * 100
-    #print("Returning:  ", return_val)
-    return return_val
+    return Fraction(n_bad_routes, n_total_routes) * 100
 
 
-def new_success_rate(graph: ASGraph, attacker: AS, victim: AS) -> int:
+# Number of routes to the victim that contain a route leak, and number of routes to the victim
+def route_leak_counts(graph: ASGraph, attacker: AS, victim: AS) -> Tuple[int, int]:
     n_bad_routes = 0
+    n_total_routes = 0
     for asys in graph.asyss.values():
         route = asys.get_route(victim.as_id)
         if route:
-            offending_asys = leaked_route(route)
-            print_string = str("Routes: " + str(route) + "; DO: " + str(route.local_data_part_do) + "; Bad Route: ")
+            n_total_routes += 1
+            offending_asys = route_leaker(route)
             if offending_asys:
-                print_string += offending_asys.as_id
                 n_bad_routes += 1
-                if offending_asys.as_id != attacker.as_id:
+                if offending_asys is not attacker:
                     raise Exception("Attacker mismatches offending AS")
-            else:
-                print_string += "FALSE"
+    return n_bad_routes, n_total_routes
 
-            # For debugging purpose: prints route + down only + bad route [False | Offending AS]
-            # print(print_string)
 
+def new_success_rate(graph: ASGraph, attacker: AS, victim: AS) -> int:
+    n_bad_routes, _ = route_leak_counts(graph, attacker, victim)
     return n_bad_routes
 
 
-class Experiment(mp.Process, abc.ABC):
-    input_queue: mp.Queue
-    output_queue: mp.Queue
+# Legitimate route propagations of the current process, see Experiment.find_routes_to
+route_cache = RouteCache(ROUTE_CACHE_BYTES)
+
+# Pool that run_experiment submits to, set while a WorkerPool is used as a context manager
+_worker_pool: Optional['WorkerPool'] = None
+
+
+def average_seconds_per_trial(average: Optional[float], seconds: float, n_trials: int) -> float:
+    """Moving average of the time per trial, updated with a chunk of n_trials that took seconds."""
+    if average is None:
+        return seconds / n_trials
+    return 0.8 * average + 0.2 * seconds / n_trials
+
+
+class WorkerPool(object):
+    """Long-lived experiment worker processes for one AS topology.
+
+    The topology is exported into shared memory once, and every worker builds its private ASGraph from it once. A
+    job is an experiment type with its arguments and the policy state of the graph it was submitted with. Its trials
+    are sent in chunks, and workers reset their graph to the job's state when they receive the first chunk of a new
+    job, so the pool can be reused across deployment points.
+    """
+    shared_graph: SharedGraph
+    # CSRGraph.digest of the exported topology
+    topology: bytes
+    # Fixed number of trials per chunk, None to adapt it to the measured time per trial
+    chunk_size: Optional[int]
+    job_queue: mp.Queue
+    result_queue: mp.Queue
+    workers: List['PoolWorker']
+    n_jobs: int
+    previous_pool: Optional['WorkerPool']
+
+    def __init__(self, graph: ASGraph, processes: Optional[int] = None, chunk_size: Optional[int] = None):
+        self._start(SharedGraph.export(graph), graph.csr().digest(), processes, chunk_size)
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph, tiers: np.ndarray, processes: Optional[int] = None,
+                 chunk_size: Optional[int] = None) -> 'WorkerPool':
+        """Starts a pool for a topology without building an ASGraph for it in this process, see EdgeList.to_csr."""
+        pool = cls.__new__(cls)
+        pool._start(SharedGraph.from_csr(csr, tiers), csr.digest(), processes, chunk_size)
+        return pool
+
+    def _start(self, shared_graph: SharedGraph, topology: bytes, processes: Optional[int],
+               chunk_size: Optional[int]) -> None:
+        self.shared_graph = shared_graph
+        self.topology = topology
+        self.chunk_size = chunk_size
+        self.job_queue = mp.Queue()
+        self.result_queue = mp.Queue()
+        processes = processes or PARALLELISM
+        self.workers = [PoolWorker(self.job_queue, self.result_queue, self.shared_graph, ROUTE_CACHE_BYTES // processes)
+                        for _ in range(processes)]
+        self.n_jobs = 0
+        self.previous_pool = None
+        for worker in self.workers:
+            worker.start()
+
+    def __enter__(self) -> 'WorkerPool':
+        global _worker_pool
+        self.previous_pool = _worker_pool
+        _worker_pool = self
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        global _worker_pool
+        _worker_pool = self.previous_pool
+        self.close()
+
+    def serves(self, graph: ASGraph) -> bool:
+        # The figure functions build a fresh ASGraph from the same parsed file for every deployment point
+        return graph.csr().digest() == self.topology
+
+    def run(self, graph: ASGraph, trials: List[Tuple[AS_ID, AS_ID]], experiment_type: type, *args) -> List:
+        # Workers have their own graph, AS objects in the arguments would be pickled with all their neighbours
+        for arg in args:
+            if isinstance(arg, AS) or (isinstance(arg, (list, tuple)) and any(isinstance(a, AS) for a in arg)):
+                raise TypeError("Experiment arguments must refer to ASes by AS ID")
+        self.n_jobs += 1
+        job_id = self.n_jobs
+        # Pickled once, every chunk of the job carries the same bytes
+        job = pickle.dumps((experiment_type, args))
+        state = pickle.dumps(GraphState.capture(graph))
+
+        counts = np.zeros((len(trials), 2), dtype=np.int64)
+        seconds_per_trial = None
+        position = 0
+        in_flight = 0
+        errors = []
+        while in_flight or (position < len(trials) and not errors):
+            # Keep two chunks per worker queued, so no worker waits for the next chunk
+            while position < len(trials) and not errors and in_flight < 2 * len(self.workers):
+                size = self.next_chunk_size(seconds_per_trial, len(trials) - position)
+                self.job_queue.put((job_id, job, state, position, trials[position:position + size]))
+                position += size
+                in_flight += 1
+
+            start, chunk_counts, seconds = self.result_queue.get()
+            in_flight -= 1
+            if isinstance(chunk_counts, Exception):
+                errors.append(chunk_counts)
+                continue
+            counts[start:start + len(chunk_counts)] = chunk_counts
+            seconds_per_trial = average_seconds_per_trial(seconds_per_trial, seconds, len(chunk_counts))
+
+        if errors:
+            raise errors[0]
+        return [experiment_type.to_result(n_bad, n_total) for n_bad, n_total in counts.tolist()]
+
+    def next_chunk_size(self, seconds_per_trial: Optional[float], remaining: int) -> int:
+        if self.chunk_size is not None:
+            return min(self.chunk_size, remaining)
+        if seconds_per_trial is None:
+            return 1
+        size = max(1, int(CHUNK_SECONDS / max(seconds_per_trial, 1e-9)))
+        # Towards the end, split the remaining trials evenly so that all workers finish at about the same time
+        return min(size, max(1, remaining // len(self.workers)))
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.stop()
+        for worker in self.workers:
+            self.job_queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.shared_graph.unlink()
+
+
+class PoolWorker(mp.Process):
+    job_queue: mp.Queue
+    result_queue: mp.Queue
+    shared_graph: SharedGraph
+    # This worker's share of ROUTE_CACHE_BYTES
+    route_cache_bytes: int
     _stopped: mpsync.Event
 
-    def __init__(self, input_queue: mp.Queue, output_queue: mp.Queue):
+    def __init__(self, job_queue: mp.Queue, result_queue: mp.Queue, shared_graph: SharedGraph,
+                 route_cache_bytes: int):
         super().__init__(daemon=True)
-        self.input_queue = input_queue
-        self.output_queue = output_queue
+        self.job_queue = job_queue
+        self.result_queue = result_queue
+        self.shared_graph = shared_graph
+        self.route_cache_bytes = route_cache_bytes
         self._stopped = mp.Event()
 
     def stop(self):
@@ -968,32 +954,100 @@ class Experiment(mp.Process, abc.ABC):
 
     def run(self):
         signal.signal(signal.SIGINT, lambda _signo, _frame: self.stop())
+        route_cache.resize(self.route_cache_bytes)
+        graph = None
+        current_job = None
+        experiment = None
 
         while not self._stopped.is_set():
-            trial = self.input_queue.get()
+            chunk = self.job_queue.get()
 
             # A None input is just used to stop blocking on the queue, so we can check stopped.
-            if trial is None:
+            if chunk is None:
                 continue
 
-            self.output_queue.put(self.run_trial(trial))
+            job_id, job, state, start, trials = chunk
+            started = time.perf_counter()
+            try:
+                # The graph is built once per worker, and only reset when a chunk of another job arrives
+                if graph is None:
+                    graph = self.shared_graph.to_as_graph()
+                if job_id != current_job:
+                    current_job = None
+                    experiment_type, args = pickle.loads(job)
+                    pickle.loads(state).apply(graph)
+                    experiment = experiment_type(graph, *args)
+                    current_job = job_id
+                experiment.prefetch(trials)
+                counts = np.array([experiment.run_trial(trial) for trial in trials], dtype=np.int64)
+                self.result_queue.put((start, counts, time.perf_counter() - started))
+            except Exception as e:
+                # Report the failure instead of leaving the parent waiting for this chunk forever
+                current_job = None
+                self.result_queue.put((start, e, time.perf_counter() - started))
+
+
+class Experiment(abc.ABC):
+    graph: ASGraph
+    # Victim and state fingerprint of the legitimate routes in the routing tables, apart from the last hijack
+    baseline: Optional[Tuple[AS_ID, bytes]]
+    hijack: Optional[RouteDelta]
+
+    def __init__(self, graph: ASGraph):
+        self.graph = graph
+        self.baseline = None
+        self.hijack = None
 
     # Creates an abstract class which has to be definded later on
     @abc.abstractmethod
     # raise is used to give own errors, in this case if anythin happens where now error was created for
-    def run_trial(self, trial):
+    def run_trial(self, trial) -> Tuple[int, int]:
+        """Runs one (victim, attacker) trial and returns the number of bad routes and of all routes."""
         raise NotImplementedError()
 
+    def prefetch(self, trials) -> None:
+        """Called with every chunk of trials before they are run, e.g. to propagate their victims together."""
+        pass
+
+    def find_routes_to(self, victim: AS) -> None:
+        # The legitimate propagation only depends on the victim and the graph state (including the attacker's policy),
+        # so it is cached in the worker across trials and jobs
+        fingerprint = state_fingerprint(self.graph)
+        if self.hijack is not None:
+            self.hijack.undo()
+            self.hijack = None
+        # Consecutive trials with the same victim keep the routing tables once the last hijack is rolled back
+        if self.baseline == (victim.as_id, fingerprint):
+            return
+        self.graph.clear_routing_tables()
+        route_cache.find_routes_to(self.graph, victim, fingerprint)
+        self.baseline = (victim.as_id, fingerprint)
+
+    def hijack_n_hops(self, victim: AS, attacker: AS, n_hops: int) -> None:
+        self.hijack = self.graph.hijack_n_hops(victim, attacker, n_hops)
+
+    # Turns the counts of a trial into the value reported by the experiment, only done once all trials are finished
+    @staticmethod
+    def to_result(n_bad: int, n_total: int) -> Fraction:
+        if n_total == 0:
+            return Fraction(0, 1)
+        return Fraction(n_bad, n_total) * 100
+
 
 class Figure2aExperiment(Experiment):
-    graph: ASGraph
     n_hops: int
 
-    def __init__(self, input_queue: mp.Queue, output_queue: mp.Queue, graph: ASGraph, n_hops: int):
-        super().__init__(input_queue, output_queue)
-        self.graph = graph
+    def __init__(self, graph: ASGraph, n_hops: int):
+        super().__init__(graph)
         self.n_hops = n_hops
 
+    def prefetch(self, trials: List[Tuple[AS_ID, AS_ID]]) -> None:
+        # The graph state is the same in all trials, so the legitimate routes of all victims in the chunk are
+        # propagated in batches by the array engine, and the trials restore them from the route cache
+        victims = [self.graph.get_asys(victim_id) for victim_id, _ in trials]
+        route_cache.prefetch(self.graph, [victim for victim in victims if victim is not None],
+                             state_fingerprint(self.graph))
+
     def run_trial(self, trial: Tuple[(AS_ID, AS_ID)]):
         graph = self.graph
         n_hops = self.n_hops
@@ -1006,23 +1060,20 @@ class Figure2aExperiment(Experiment):
         victim = graph.get_asys(victim_id)
         if victim is None:
             warnings.warn(f"No AS with ID {victim_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         # Takes AS of attacker out of graph, like did for the victim
         attacker = graph.get_asys(attacker_id)
         if attacker is None:
             warnings.warn(f"No AS with ID {attacker_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         # starts to find a new routing table and executes the attack onto it by n hops
-        graph.clear_routing_tables()
-        graph.find_routes_to(victim)
-        graph.hijack_n_hops(victim, attacker, n_hops)
+        self.find_routes_to(victim)
+        self.hijack_n_hops(victim, attacker, n_hops)
         # graph.ro
 
-        result = attacker_success_rate(graph, attacker, victim)
-
-        return result
+        return attacker_success_counts(graph, attacker, victim)
 
 
 def show_policies(graph):
@@ -1142,7 +1193,7 @@ def deploy_customer_cones(graph, deployment, algorithm):
         lines = file.readlines()        
         for i in range(deployment[0]):
             current_as = int(lines[i].strip())
-            graph.get_asys(str(current_as)).policy = policy
+            graph.get_asys(current_as).policy = policy
     # show_policies(graph)            
 
 
@@ -1242,16 +1293,16 @@ def single_random_deployment(graph, deployment: [int, int, int], algorithm: str,
     elif algorithm == "ASPA_OTC":
         policy = OTCASPAPolicy()
 
-    all_systems = graph.get_tierOne() + graph.get_tierTwo() + graph.get_tierThree()
+    all_systems = list(graph.get_tierOne() + graph.get_tierTwo() + graph.get_tierThree())
     np.random.seed(42)
     np.random.shuffle(all_systems)
 
     limit = int(len(all_systems) / 100 * deployment[0])
-    for i in range(0, limit):
-        as_id = all_systems[i]
-        graph.get_asys(as_id).policy = policy
-        if algorithm == "ASPA_OTC" or algorithm == "ASPA":
-            graph.get_asys(as_id).create_new_aspa(graph)
+    selected = [graph.get_asys(as_id) for as_id in all_systems[:limit]]
+    for asys in selected:
+        asys.policy = policy
+    if algorithm == "ASPA_OTC" or algorithm == "ASPA":
+        graph.create_aspa_objects(selected)
 
 
 def aspa_deployment_top_isp(graph: ASGraph, deployment: [int, int, int, int, int, int]):
@@ -1283,18 +1334,12 @@ def aspa_deployment_top_isp(graph: ASGraph, deployment: [int, int, int, int, int
             as_id = graph.get_tierThree()[i]
             graph.get_asys(as_id).policy = policy
     if tier_one_object != 0:
-        for as_id in tier_one_top_isp_object:
-            as_number = as_id.as_id
-            graph.get_asys(as_number).create_new_aspa(graph)
+        graph.create_aspa_objects(tier_one_top_isp_object)
     if tier_two_object != 0:
-        for as_id in tier_two_top_isp_object:
-            as_number = as_id.as_id
-            graph.get_asys(as_number).create_new_aspa(graph)
+        graph.create_aspa_objects(tier_two_top_isp_object)
     if tier_three_object != 0:
         limit = int(len(graph.get_tierThree()) / 100 * tier_three_object)
-        for i in range(0, limit):
-            as_id = graph.get_tierThree()[i]
-            graph.get_asys(as_id).create_new_aspa(graph)
+        graph.create_aspa_objects(graph.get_asys(as_id) for as_id in graph.get_tierThree()[:limit])
 
 
 def aspa_deployment_random(graph: ASGraph, deployment: [int, int, int, int, int, int]):
@@ -1318,22 +1363,23 @@ def aspa_deployment_random(graph: ASGraph, deployment: [int, int, int, int, int,
         for as_id in random.sample(graph.get_tierThree(), int(len(graph.get_tierThree()) / 100 * tier_three_policy)):
             graph.get_asys(as_id).policy = policy
     if tier_one_object != 0:
-        for as_id in random.sample(graph.get_tierOne(), int(len(graph.get_tierOne()) / 100 * tier_one_object)):
-            graph.get_asys(as_id).create_new_aspa(graph)
+        graph.create_aspa_objects(graph.get_asys(as_id) for as_id in random.sample(
+            graph.get_tierOne(), int(len(graph.get_tierOne()) / 100 * tier_one_object)))
     if tier_two_object != 0:
-        for as_id in random.sample(graph.get_tierTwo(), int(len(graph.get_tierTwo()) / 100 * tier_two_object)):
-            graph.get_asys(as_id).create_new_aspa(graph)
+        graph.create_aspa_objects(graph.get_asys(as_id) for as_id in random.sample(
+            graph.get_tierTwo(), int(len(graph.get_tierTwo()) / 100 * tier_two_object)))
     if tier_three_object != 0:
-        for as_id in random.sample(graph.get_tierThree(), int(len(graph.get_tierThree()) / 100 * tier_three_object)):
-            graph.get_asys(as_id).create_new_aspa(graph)
+        graph.create_aspa_objects(graph.get_asys(as_id) for as_id in random.sample(
+            graph.get_tierThree(), int(len(graph.get_tierThree()) / 100 * tier_three_object)))
 
 
 # create ASPA objects for all ASes according to deployment fraction
 def create_ASPA_objects_randomly(graph, deployment_ASPA_objects):
     random.seed(None)
-    for as_id in random.sample(graph.asyss.keys(), round(len(graph.asyss.keys()) / 100 * deployment_ASPA_objects)):
-        graph.get_asys(as_id).create_new_aspa(graph)
-        # graph.get_asys(as_id).create_dummy_aspa()
+    # random.sample needs a sequence, dict views are not accepted since Python 3.11
+    as_ids = list(graph.asyss.keys())
+    graph.create_aspa_objects(graph.get_asys(as_id)
+                              for as_id in random.sample(as_ids, round(len(as_ids) / 100 * deployment_ASPA_objects)))
 
 
 # create ASCONES objects for all ASes according to list parameter
@@ -1345,22 +1391,22 @@ def create_ASCONES_objects(graph, deployment_ASCONES_objects):
 
 # create ASPA objects for all ASes according to list parameter
 def create_ASPA_objects(graph, deployment_ASPA_objects):
-    for asys in deployment_ASPA_objects:
-        asys.create_new_aspa(graph)
-        # graph.get_asys(as_id).create_dummy_aspa()
+    graph.create_aspa_objects(deployment_ASPA_objects)
 
 
 # create ASCONES policies for all ASes according to deployment fraction
 def create_ASCONES_policies_randomly(graph, deployment_ASCONES_policy):
     random.seed(None)
-    for as_id in random.sample(graph.asyss.keys(), round(len(graph.asyss.keys()) / 100 * deployment_ASCONES_policy)):
+    as_ids = list(graph.asyss.keys())
+    for as_id in random.sample(as_ids, round(len(as_ids) / 100 * deployment_ASCONES_policy)):
         graph.get_asys(as_id).policy = ASCONESPolicy()
 
 
 # create ASPA policies for all ASes according to deployment fraction
 def create_ASPA_policies_randomly(graph, deployment_ASPA_policy):
     random.seed(None)
-    for as_id in random.sample(graph.asyss.keys(), round(len(graph.asyss.keys()) / 100 * deployment_ASPA_policy)):
+    as_ids = list(graph.asyss.keys())
+    for as_id in random.sample(as_ids, round(len(as_ids) / 100 * deployment_ASPA_policy)):
         graph.get_asys(as_id).policy = ASPAPolicy()
 
 
@@ -1377,21 +1423,23 @@ def create_ASPA_policies(graph, deployment_ASPA_policy):
 
 
 class FigureRouteLeakExperimentRandom(Experiment):
-    graph: ASGraph
     deployment: List[int]
 
     # def __init__(self, input_queue: mp.Queue, output_queue: mp.Queue, graph: ASGraph, deployment: List[int],
     #             algorithm: str, ):
-    def __init__(self, input_queue: mp.Queue, output_queue: mp.Queue, graph: ASGraph, deployment_objects_list: List,
-                 deployment_policy_list: List, algorithm: str, deployment=None, aspa_deployment=None):
-        super().__init__(input_queue, output_queue)
-        self.graph = graph
+    def __init__(self, graph: ASGraph, deployment_objects_list: List, deployment_policy_list: List, algorithm: str,
+                 deployment=None, aspa_deployment=None):
+        super().__init__(graph)
         self.deployment_objects_list = deployment_objects_list
         self.deployment_policy_list = deployment_policy_list
         self.deployment = deployment
         self.aspa_deployment = aspa_deployment
         self.algorithm = algorithm
 
+    @staticmethod
+    def to_result(n_bad: int, n_total: int) -> int:
+        return n_bad
+
     def run_trial(self, trial: Tuple[(AS_ID, AS_ID)]):
         graph = self.graph
         algorithm = self.algorithm
@@ -1405,17 +1453,17 @@ class FigureRouteLeakExperimentRandom(Experiment):
         victim = graph.get_asys(victim_id)
         if victim is None:
             warnings.warn(f"No AS with ID {victim_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         # Takes AS of attacker out of graph, like did for the victim
         attacker = graph.get_asys(attacker_id)
         if attacker is None:
             warnings.warn(f"No AS with ID {attacker_id}")
-            return Fraction(0, 1)
+            return 0, 0
         
         if self.deployment is None:
             warnings.warn(f"No deployment parsed!")
-            return Fraction(0, 1)
+            return 0, 0
         
         method_to_use = algorithm.split('_')[1]
         algorithm = algorithm.split('_')[0]
@@ -1427,24 +1475,21 @@ class FigureRouteLeakExperimentRandom(Experiment):
             deploy_top_isp(graph, self.deployment, algorithm, self.aspa_deployment)
 
         attacker.policy = RouteLeakPolicy()  
-        graph.clear_routing_tables()
-        graph.find_routes_to(victim)
-        result = new_success_rate(graph, attacker, victim)
-        return result
+        self.find_routes_to(victim)
+        # new_success_rate is an absolute number of leaked routes, see to_result
+        return new_success_rate(graph, attacker, victim), 0
 
 
 
 
 class FigureRouteLeakExperiment(Experiment):
-    graph: ASGraph
     deployment: int
 
-    def __init__(self, input_queue: mp.Queue, output_queue: mp.Queue, graph: ASGraph, deployment_objects_list: List,
-                 deployment_policy_list: List, algorithm: str):
-        super().__init__(input_queue, output_queue)
-        self.graph = graph
-        self.deployment_objects_list = deployment_objects_list
-        self.deployment_policy_list = deployment_policy_list
+    def __init__(self, graph: ASGraph, deployment_objects_list: List[AS_ID], deployment_policy_list: List[AS_ID],
+                 algorithm: str):
+        super().__init__(graph)
+        self.deployment_objects_list = [graph.get_asys(as_id) for as_id in deployment_objects_list]
+        self.deployment_policy_list = [graph.get_asys(as_id) for as_id in deployment_policy_list]
         self.algorithm = algorithm
 
     def run_trial(self, trial: Tuple[(AS_ID, AS_ID)]):
@@ -1462,13 +1507,13 @@ class FigureRouteLeakExperiment(Experiment):
         victim = graph.get_asys(victim_id)
         if victim is None:
             warnings.warn(f"No AS with ID {victim_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         # Takes AS of attacker out of graph, like did for the victim
         attacker = graph.get_asys(attacker_id)
         if attacker is None:
             warnings.warn(f"No AS with ID {attacker_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         if algorithm == 'ASPA':
             # Set ASPA policies for ASes in the current graph
@@ -1490,23 +1535,17 @@ class FigureRouteLeakExperiment(Experiment):
         # show_aspa_objects_count(graph) # Show count of all ASPA objects of graph
 
         # starts to find a new routing table and executes the attack onto it by n hops
-        graph.clear_routing_tables()
-        graph.find_routes_to(victim)
+        self.find_routes_to(victim)
         #        graph.hijack_n_hops(victim, attacker, n_hops)
 
-        result = route_leak_success_rate(graph, attacker, victim)
-
-        return result
+        return route_leak_counts(graph, attacker, victim)
 
 
 class FigureForgedOriginPrefixHijackExperimentRandom(Experiment):
-    graph: ASGraph
     deployment: int
 
-    def __init__(self, input_queue: mp.Queue, output_queue: mp.Queue, graph: ASGraph, deployment_objects: int,
-                 deployment_policy: int, algorithm: str):
-        super().__init__(input_queue, output_queue)
-        self.graph = graph
+    def __init__(self, graph: ASGraph, deployment_objects: int, deployment_policy: int, algorithm: str):
+        super().__init__(graph)
         self.deployment_objects = deployment_objects
         self.deployment_policy = deployment_policy
         self.algorithm = algorithm
@@ -1526,13 +1565,13 @@ class FigureForgedOriginPrefixHijackExperimentRandom(Experiment):
         victim = graph.get_asys(victim_id)
         if victim is None:
             warnings.warn(f"No AS with ID {victim_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         # Takes AS of attacker out of graph, like did for the victim
         attacker = graph.get_asys(attacker_id)
         if attacker is None:
             warnings.warn(f"No AS with ID {attacker_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         if algorithm == 'ASPA':
             # Set ASPA policies for ASes in the current graph
@@ -1545,25 +1584,20 @@ class FigureForgedOriginPrefixHijackExperimentRandom(Experiment):
         attacker.policy = DefaultPolicy()  # This will change the attackers policy to default policy in order not to drop her own hijacked route
 
         # starts to find a new routing table and executes the attack onto it by n hops
-        graph.clear_routing_tables()
-        graph.find_routes_to(victim)
-        graph.hijack_n_hops(victim, attacker, 1)
-
-        result = attacker_success_rate(graph, attacker, victim)
+        self.find_routes_to(victim)
+        self.hijack_n_hops(victim, attacker, 1)
 
-        return result
+        return attacker_success_counts(graph, attacker, victim)
 
 
 class FigureForgedOriginPrefixHijackExperiment(Experiment):
-    graph: ASGraph
     deployment: int
 
-    def __init__(self, input_queue: mp.Queue, output_queue: mp.Queue, graph: ASGraph, deployment_objects_list: List,
-                 deployment_policy_list: List, algorithm: str):
-        super().__init__(input_queue, output_queue)
-        self.graph = graph
-        self.deployment_objects_list = deployment_objects_list
-        self.deployment_policy_list = deployment_policy_list
+    def __init__(self, graph: ASGraph, deployment_objects_list: List[AS_ID], deployment_policy_list: List[AS_ID],
+                 algorithm: str):
+        super().__init__(graph)
+        self.deployment_objects_list = [graph.get_asys(as_id) for as_id in deployment_objects_list]
+        self.deployment_policy_list = [graph.get_asys(as_id) for as_id in deployment_policy_list]
         self.algorithm = algorithm
 
     def run_trial(self, trial: Tuple[(AS_ID, AS_ID)]):
@@ -1581,13 +1615,13 @@ class FigureForgedOriginPrefixHijackExperiment(Experiment):
         victim = graph.get_asys(victim_id)
         if victim is None:
             warnings.warn(f"No AS with ID {victim_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         # Takes AS of attacker out of graph, like did for the victim
         attacker = graph.get_asys(attacker_id)
         if attacker is None:
             warnings.warn(f"No AS with ID {attacker_id}")
-            return Fraction(0, 1)
+            return 0, 0
 
         if algorithm == 'ASPA':
             # Set ASPA policies for ASes in the current graph
@@ -1609,10 +1643,7 @@ class FigureForgedOriginPrefixHijackExperiment(Experiment):
         # show_aspa_objects_count(graph) # Show count of all ASPA objects of graph
 
         # starts to find a new routing table and executes the attack onto it by n hops
-        graph.clear_routing_tables()
-        graph.find_routes_to(victim)
-        graph.hijack_n_hops(victim, attacker, 1)
-
-        result = attacker_success_rate(graph, attacker, victim)
+        self.find_routes_to(victim)
+        self.hijack_n_hops(victim, attacker, 1)
 
-        return result
+        return attacker_success_counts(graph, attacker, victim)
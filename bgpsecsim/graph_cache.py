@@ -0,0 +1,216 @@
+import glob
+import hashlib
+import os
+import pickle
+from typing import Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+import bgpsecsim.as_graph as as_graph
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.asys import Relation, RoutingPolicy
+from bgpsecsim.csr_graph import CSRGraph
+from bgpsecsim.routing_policy import DefaultPolicy
+
+# Relation codes of an edge, as the 'customer' attribute of the networkx edge (source, target)
+PEERS = 0
+SOURCE_IS_CUSTOMER = 1
+TARGET_IS_CUSTOMER = 2
+
+# Files of a cached graph, appended to the path of the source file and the hash of its contents
+CACHE_SUFFIXES = ('asns', 'edges')
+
+
+class EdgeList(object):
+    """AS relationships as numpy arrays: the ASNs, and every link as a pair of indices into them plus a relation code.
+
+    ASNs and links are stored in the order of nodes and edges of the networkx graph parsed from the same file, so
+    that a graph built from an EdgeList has its ASes and neighbours in exactly the same order as ASGraph(nx_graph).
+    """
+    __slots__ = ['asns', 'edges']
+
+    asns: np.ndarray
+    # Structured array with the fields source, target and relation
+    edges: np.ndarray
+
+    EDGE_DTYPE = np.dtype([('source', np.int32), ('target', np.int32), ('relation', np.int8)])
+
+    def __init__(self, asns: np.ndarray, edges: np.ndarray):
+        self.asns = asns
+        self.edges = edges
+
+    @classmethod
+    def from_nx_graph(cls, graph: nx.Graph) -> 'EdgeList':
+        index = {as_id: i for i, as_id in enumerate(graph.nodes)}
+        edges = np.empty(graph.number_of_edges(), dtype=cls.EDGE_DTYPE)
+        for i, (as_id1, as_id2, customer) in enumerate(graph.edges(data='customer')):
+            if customer is None:
+                relation = PEERS
+            elif customer == as_id1:
+                relation = SOURCE_IS_CUSTOMER
+            else:
+                relation = TARGET_IS_CUSTOMER
+            edges[i] = (index[as_id1], index[as_id2], relation)
+        return cls(np.array([int(as_id) for as_id in graph.nodes], dtype=np.int64), edges)
+
+    @classmethod
+    def from_links(cls, appearance: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+                   relations: np.ndarray) -> 'EdgeList':
+        """Builds the arrays that from_nx_graph returns for a networkx graph built by adding links one by one.
+
+        appearance holds the ASNs in the order they are added to the graph (with repetitions), sources, targets and
+        relations the add_edge calls in order, with relations given as relation codes of (source, target).
+        """
+        # Nodes keep the position where they first appear
+        asns, first_seen = np.unique(appearance, return_index=True)
+        node_order = np.argsort(first_seen, kind='stable')
+        position = np.empty(len(asns), dtype=np.int64)
+        position[node_order] = np.arange(len(asns))
+        sources = position[np.searchsorted(asns, sources)]
+        targets = position[np.searchsorted(asns, targets)]
+
+        # A link added twice keeps the place of the first add_edge and the attribute of the last one
+        n_nodes = max(len(asns), 1)
+        keys = np.minimum(sources, targets) * n_nodes + np.maximum(sources, targets)
+        _, first = np.unique(keys, return_index=True)
+        _, last_reversed = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last_reversed
+
+        # Graph.edges lists every link at the endpoint that comes first, in the order the links were added
+        source = np.minimum(sources[first], targets[first])
+        target = np.maximum(sources[first], targets[first])
+        customer = np.where(relations[last] == SOURCE_IS_CUSTOMER, sources[last], targets[last])
+        relation = np.where(relations[last] == PEERS, PEERS,
+                            np.where(customer == source, SOURCE_IS_CUSTOMER, TARGET_IS_CUSTOMER))
+        order = np.lexsort((first, source))
+
+        edges = np.empty(len(order), dtype=cls.EDGE_DTYPE)
+        edges['source'] = source[order]
+        edges['target'] = target[order]
+        edges['relation'] = relation[order]
+        return cls(asns[node_order].astype(np.int64), edges)
+
+    @classmethod
+    def from_as_rel_file(cls, filename: str) -> 'EdgeList':
+        """Same as from_nx_graph(parse_as_rel_file_CAIDA(filename)), without building the networkx graph."""
+        as1s, as2s, rels = as_graph.read_as_rel_file(filename)
+        appearance = np.empty(2 * len(as1s), dtype=np.int64)
+        appearance[0::2] = as1s
+        appearance[1::2] = as2s
+        return cls.from_links(appearance, as1s, as2s, np.where(rels == -1, TARGET_IS_CUSTOMER, PEERS))
+
+    @classmethod
+    def from_pickle_graph(cls, pickle_graph: nx.DiGraph) -> 'EdgeList':
+        """Same as from_nx_graph(parse_as_rel_file_pickle(...)), without building the networkx graph."""
+        nodes, owners, neighbors, is_peer = as_graph.pickle_relationships(pickle_graph)
+        asns = np.array([int(node) for node in nodes], dtype=np.int64)
+
+        # parse_as_rel_file_pickle adds every node followed by its customers and peers
+        appearance = np.empty(len(nodes) + len(owners), dtype=np.int64)
+        appearance[np.arange(len(nodes)) + np.searchsorted(owners, np.arange(len(nodes)))] = asns
+        appearance[np.arange(len(owners)) + owners + 1] = asns[neighbors]
+        return cls.from_links(appearance, asns[owners], asns[neighbors],
+                              np.where(is_peer, PEERS, TARGET_IS_CUSTOMER))
+
+    def as_ids(self):
+        return self.asns.tolist()
+
+    def to_nx_graph(self) -> nx.Graph:
+        as_ids = self.as_ids()
+        graph = nx.Graph()
+        graph.add_nodes_from(as_ids)
+        for source, target, relation in self.edges.tolist():
+            customer = None
+            if relation == SOURCE_IS_CUSTOMER:
+                customer = as_ids[source]
+            elif relation == TARGET_IS_CUSTOMER:
+                customer = as_ids[target]
+            graph.add_edge(as_ids[source], as_ids[target], customer=customer)
+        return graph
+
+    def to_csr(self) -> Tuple[CSRGraph, np.ndarray]:
+        """Returns the CSR topology and the tier (1, 2 or 3) of every AS, as ASGraph(self.to_nx_graph()) has them."""
+        n_ases = len(self.asns)
+        sources = self.edges['source'].astype(np.int64)
+        targets = self.edges['target'].astype(np.int64)
+        relations = self.edges['relation']
+
+        # Every edge is a neighbour entry of both ASes. Interleaving the two entries and sorting stably by owner
+        # gives every AS its neighbours in edge order, which is the order ASGraph adds them in.
+        owners = np.empty(2 * len(sources), dtype=np.int64)
+        owners[0::2] = sources
+        owners[1::2] = targets
+        neighbors = np.empty_like(owners)
+        neighbors[0::2] = targets
+        neighbors[1::2] = sources
+        seen_as = np.full(owners.shape, Relation.PEER.value, dtype=np.int8)
+        seen_as[0::2][relations == TARGET_IS_CUSTOMER] = Relation.CUSTOMER.value
+        seen_as[1::2][relations == TARGET_IS_CUSTOMER] = Relation.PROVIDER.value
+        seen_as[0::2][relations == SOURCE_IS_CUSTOMER] = Relation.PROVIDER.value
+        seen_as[1::2][relations == SOURCE_IS_CUSTOMER] = Relation.CUSTOMER.value
+
+        order = np.argsort(owners, kind='stable')
+        offsets = np.zeros(n_ases + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=n_ases), out=offsets[1:])
+        csr = CSRGraph(self.as_ids(), offsets, neighbors[order], seen_as[order])
+
+        customers = np.bincount(owners[seen_as == Relation.CUSTOMER.value], minlength=n_ases)
+        providers = np.bincount(owners[seen_as == Relation.PROVIDER.value], minlength=n_ases)
+        tiers = np.where(customers == 0, 3, np.where(providers == 0, 1, 2)).astype(np.int8)
+        return csr, tiers
+
+    def to_as_graph(self, policy: RoutingPolicy = DefaultPolicy()) -> ASGraph:
+        csr, tiers = self.to_csr()
+        return ASGraph.from_csr(csr, tiers, policy)
+
+    def save(self, prefix: str) -> None:
+        # Each array is written to a temporary file first, so a reader never sees a partially written cache
+        for suffix, array in zip(CACHE_SUFFIXES, (self.asns, self.edges)):
+            path = f'{prefix}.{suffix}.npy'
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, array)
+            os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, prefix: str, mmap_mode: Optional[str] = 'r') -> 'EdgeList':
+        asns, edges = (np.load(f'{prefix}.{suffix}.npy', mmap_mode=mmap_mode) for suffix in CACHE_SUFFIXES)
+        return cls(asns, edges)
+
+
+def file_hash(filename: str) -> str:
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(2 ** 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def cache_prefix(filename: str) -> str:
+    return f'{filename}.{file_hash(filename)}'
+
+
+def load_as_rel_file(filename: str) -> EdgeList:
+    """Loads an as-rel file, from the binary cache next to it if there is one for the current file contents.
+
+    On a cache miss the file is parsed and the cache is written, replacing the caches of older versions of the
+    file. Neither as-rel files nor pickled topologies are turned into a networkx graph first.
+    Nothing is cached in read-only directories.
+    """
+    prefix = cache_prefix(filename)
+    if all(os.path.exists(f'{prefix}.{suffix}.npy') for suffix in CACHE_SUFFIXES):
+        return EdgeList.load(prefix)
+
+    if "pickle" in filename:
+        with open(filename, 'rb') as f:
+            edge_list = EdgeList.from_pickle_graph(pickle.load(f))
+    else:
+        edge_list = EdgeList.from_as_rel_file(filename)
+    try:
+        for suffix in CACHE_SUFFIXES:
+            for stale in glob.glob(f'{glob.escape(filename)}.*.{suffix}.npy'):
+                os.remove(stale)
+        edge_list.save(prefix)
+    except OSError:
+        pass
+    return edge_list
@@ -0,0 +1,353 @@
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bgpsecsim.asys import AS, AS_ID, Relation, Route
+from bgpsecsim.csr_graph import CSRGraph
+from bgpsecsim.routing_policy import (
+    DefaultPolicy, RPKIPolicy, PathEndValidationPolicy, RouteLeakPolicy,
+    ASPAPolicy, ASCONESPolicy, OnlyToCustomerPolicy, OTCASPAPolicy,
+    perform_ASPA_algorithm, perform_ASCONES_algorithm,
+)
+
+# Array-backed alternative to ASGraph.find_routes_to.
+#
+# Routes are kept as a tree of integer records (AS index, parent record, length, relation to the sender and the
+# OTC attribute) instead of Route objects holding lists of AS objects. Propagation runs in rounds: every round
+# relaxes the up (to providers), across (to peers) and down (to customers) edges of all ASes that adopted a new
+# route in the previous round, as whole arrays. Rounds are processed in path-length order, which is the order in
+# which ASGraph.find_routes_to drains its FIFO queue, so the resulting routing state matches the object engine.
+#
+# Several destinations can be propagated together (find_routes_to_many): every record then also holds the column of
+# the destination it belongs to, the per-AS state has one row per destination, and every round expands the
+# adopted routes of all destinations at once. Destinations never interact, so each one ends up with the same routes
+# as when it is propagated alone.
+
+# Policy kinds understood by the array engine
+DEFAULT = 0
+RPKI = 1
+PATH_END = 2
+ROUTE_LEAK = 3
+ASPA = 4
+ASCONES = 5
+OTC = 6
+OTC_ASPA = 7
+
+POLICY_KINDS = {
+    DefaultPolicy: DEFAULT,
+    RPKIPolicy: RPKI,
+    PathEndValidationPolicy: PATH_END,
+    RouteLeakPolicy: ROUTE_LEAK,
+    ASPAPolicy: ASPA,
+    ASCONESPolicy: ASCONES,
+    OnlyToCustomerPolicy: OTC,
+    OTCASPAPolicy: OTC_ASPA,
+}
+
+CUSTOMER = Relation.CUSTOMER.value
+PEER = Relation.PEER.value
+PROVIDER = Relation.PROVIDER.value
+RS_CLIENT = Relation.RS_CLIENT.value
+ROUTE_SERVER = Relation.ROUTE_SERVER.value
+
+# Relation of the neighbour towards us, indexed by our relation towards the neighbour
+_INVERSE_RELATION = np.array([0, PROVIDER, PEER, CUSTOMER, ROUTE_SERVER, RS_CLIENT], dtype=np.int8)
+
+_NO_KEY = np.iinfo(np.int64).max
+
+
+class RouteTree(object):
+    """Growable arrays holding one record per route adopted during a propagation."""
+    __slots__ = ['asys', 'parent', 'length', 'relation', 'otc', 'column', 'size']
+
+    # Index of the AS holding the route
+    asys: np.ndarray
+    # Record of the route this one was forwarded from, -1 for the origin's own route
+    parent: np.ndarray
+    length: np.ndarray
+    # Relation of the AS holding the route towards the AS it was received from, 0 for the origin's own route
+    relation: np.ndarray
+    # Index of the AS in the OTC attribute, -1 if the attribute is not present
+    otc: np.ndarray
+    # Position of the destination of the route in the list given to find_routes_to_many
+    column: np.ndarray
+    size: int
+
+    def __init__(self, capacity: int = 1024):
+        self.asys = np.empty(capacity, dtype=np.int64)
+        self.parent = np.empty(capacity, dtype=np.int64)
+        self.length = np.empty(capacity, dtype=np.int64)
+        self.relation = np.empty(capacity, dtype=np.int8)
+        self.otc = np.empty(capacity, dtype=np.int64)
+        self.column = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+
+    def add(
+            self,
+            asys: np.ndarray,
+            parent: np.ndarray,
+            length: np.ndarray,
+            relation: np.ndarray,
+            otc: np.ndarray,
+            column: np.ndarray,
+    ) -> np.ndarray:
+        n = len(asys)
+        if self.size + n > len(self.asys):
+            capacity = max(2 * len(self.asys), self.size + n)
+            for name in ('asys', 'parent', 'length', 'relation', 'otc', 'column'):
+                old = getattr(self, name)
+                new = np.empty(capacity, dtype=old.dtype)
+                new[:self.size] = old[:self.size]
+                setattr(self, name, new)
+        ids = np.arange(self.size, self.size + n, dtype=np.int64)
+        self.asys[ids] = asys
+        self.parent[ids] = parent
+        self.length[ids] = length
+        self.relation[ids] = relation
+        self.otc[ids] = otc
+        self.column[ids] = column
+        self.size += n
+        return ids
+
+    def path(self, record: int) -> List[int]:
+        path = []
+        while record >= 0:
+            path.append(int(self.asys[record]))
+            record = int(self.parent[record])
+        path.reverse()
+        return path
+
+
+class RoutingState(object):
+    """Routes of all ASes towards one origin, as computed by find_routes_to."""
+    __slots__ = ['csr', 'origin', 'tree', 'route_of', 'next_hop', 'length']
+
+    csr: CSRGraph
+    # Index of the origin AS
+    origin: int
+    tree: RouteTree
+    # Record of the route each AS ended up with, -1 if it has none
+    route_of: np.ndarray
+    # Index of the AS each AS forwards traffic to, -1 if it has no route. The origin is its own next hop.
+    next_hop: np.ndarray
+    # Number of ASes on the route (as in Route.length), -1 if there is no route
+    length: np.ndarray
+
+    def __init__(self, csr: CSRGraph, origin: int, tree: RouteTree, route_of: np.ndarray):
+        self.csr = csr
+        self.origin = origin
+        self.tree = tree
+        self.route_of = route_of
+
+        has_route = route_of >= 0
+        self.next_hop = np.full(len(csr), -1, dtype=np.int64)
+        self.length = np.full(len(csr), -1, dtype=np.int64)
+        parents = tree.parent[route_of[has_route]]
+        self.next_hop[has_route] = np.where(parents >= 0, tree.asys[np.maximum(parents, 0)], origin)
+        self.length[has_route] = tree.length[route_of[has_route]]
+
+    def path(self, as_id: AS_ID) -> Optional[List[AS_ID]]:
+        record = self.route_of[self.csr.index[as_id]]
+        if record < 0:
+            return None
+        return [self.csr.as_ids[i] for i in self.tree.path(int(record))]
+
+
+def policy_kinds(asyss: List[AS]) -> np.ndarray:
+    kinds = np.empty(len(asyss), dtype=np.int8)
+    for i, asys in enumerate(asyss):
+        kind = POLICY_KINDS.get(type(asys.policy))
+        if kind is None:
+            raise ValueError(f"Policy {asys.policy} of AS {asys.as_id} is not supported by the array engine")
+        kinds[i] = kind
+    return kinds
+
+
+def find_routes_to(graph, target: AS, csr: Optional[CSRGraph] = None) -> RoutingState:
+    """Array-backed equivalent of ASGraph.find_routes_to.
+
+    The routing tables of the ASes in the graph are left untouched.
+    """
+    [state] = find_routes_to_many(graph, [target], csr)
+    return state
+
+
+def find_routes_to_many(graph, targets: Sequence[AS], csr: Optional[CSRGraph] = None) -> List[RoutingState]:
+    """find_routes_to for several targets in one propagation, returning the states in the order of targets.
+
+    The states share one route tree. Memory grows with the number of targets times the number of ASes, so long
+    lists of targets are better propagated in batches, see iter_routes_to.
+    """
+    if csr is None:
+        csr = graph.csr()
+    asyss = [graph.asyss[as_id] for as_id in csr.as_ids]
+    kinds = policy_kinds(asyss)
+    origins = np.array([csr.index[target.as_id] for target in targets], dtype=np.int64)
+    columns = np.arange(len(origins), dtype=np.int32)
+
+    tree = RouteTree(max(1024, 2 * len(csr) * len(origins)))
+    route_of = np.full((len(origins), len(csr)), -1, dtype=np.int64)
+    best_key = np.full((len(origins), len(csr)), _NO_KEY, dtype=np.int64)
+
+    none = np.full(len(origins), -1, dtype=np.int64)
+    origin_records = tree.add(origins, none, np.ones(len(origins), dtype=np.int64),
+                              np.zeros(len(origins), dtype=np.int8), none, columns)
+    route_of[columns, origins] = origin_records
+
+    offers = _originate(csr, kinds, origins, origin_records)
+    while len(offers[0]):
+        adopted = _learn(csr, kinds, asyss, tree, route_of.reshape(-1), best_key.reshape(-1), origins, offers)
+        offers = _forward(csr, kinds, tree, adopted)
+
+    return [RoutingState(csr, int(origin), tree, route_of[column]) for column, origin in enumerate(origins)]
+
+
+def iter_routes_to(graph, targets: Sequence[AS], batch_size: int = 64,
+                   csr: Optional[CSRGraph] = None) -> Iterator[RoutingState]:
+    """Yields the RoutingState of every target in order, propagating batch_size targets at a time."""
+    for start in range(0, len(targets), batch_size):
+        yield from find_routes_to_many(graph, targets[start:start + batch_size], csr)
+
+
+def _expand(csr: CSRGraph, asys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns, for every neighbour of every given AS, the position in asys it belongs to and its CSR edge index."""
+    starts = csr.neighbor_offsets[asys]
+    counts = csr.neighbor_offsets[asys + 1] - starts
+    src = np.repeat(np.arange(len(asys)), counts)
+    edge = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(starts, counts)
+    return src, edge
+
+
+_Offers = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _originate(csr: CSRGraph, kinds: np.ndarray, origins: np.ndarray, origin_records: np.ndarray) -> _Offers:
+    src, edge = _expand(csr, origins)
+    dst = csr.neighbor_indices[edge]
+    relation_out = csr.neighbor_relations[edge]
+    otc = np.full(len(dst), -1, dtype=np.int64)
+    # An originating OTC AS only attaches the attribute towards its customers
+    tagged = np.isin(kinds[origins][src], (OTC, OTC_ASPA)) & (relation_out == CUSTOMER)
+    otc[tagged] = origins[src][tagged]
+    return origin_records[src], dst, _INVERSE_RELATION[relation_out], otc
+
+
+def _forward(csr: CSRGraph, kinds: np.ndarray, tree: RouteTree, records: np.ndarray) -> _Offers:
+    asys = tree.asys[records]
+    src, edge = _expand(csr, asys)
+    dst = csr.neighbor_indices[edge]
+    relation_out = csr.neighbor_relations[edge]
+    sender_kind = kinds[asys][src]
+
+    # Gao-Rexford: routes learned from customers go to everybody, all other routes only go down to customers
+    from_customer = tree.relation[records][src] == CUSTOMER
+    forward = from_customer | (relation_out == CUSTOMER) | (sender_kind == ROUTE_LEAK)
+
+    otc = tree.otc[records][src]
+    is_otc = np.isin(sender_kind, (OTC, OTC_ASPA))
+    # Egress policy of RFC 9234: routes carrying the OTC attribute are not sent to providers, peers or route servers
+    forward &= ~(is_otc & (otc >= 0) & np.isin(relation_out, (PROVIDER, PEER, ROUTE_SERVER)))
+    # Otherwise the OTC attribute is attached on the route object that is being forwarded as soon as it is sent to
+    # the first customer or peer. Neighbours are served in order, so neighbours served before that one still receive
+    # the route without the attribute.
+    untagged = is_otc & (otc < 0)
+    if untagged.any():
+        trigger = forward & untagged & np.isin(relation_out, (CUSTOMER, PEER, RS_CLIENT))
+        first_tagged = np.full(len(records), len(csr.neighbor_indices), dtype=np.int64)
+        np.minimum.at(first_tagged, src[trigger], edge[trigger])
+        otc = np.where(untagged & (edge >= first_tagged[src]), asys[src], otc)
+
+    return records[src][forward], dst[forward], _INVERSE_RELATION[relation_out][forward], otc[forward]
+
+
+def _on_path(tree: RouteTree, records: np.ndarray, asys: np.ndarray) -> np.ndarray:
+    """Whether asys[i] appears on the route of records[i], for all i at once."""
+    found = np.zeros(len(records), dtype=bool)
+    current = records.copy()
+    pending = np.nonzero(current >= 0)[0]
+    while len(pending):
+        found[pending] = tree.asys[current[pending]] == asys[pending]
+        current[pending] = tree.parent[current[pending]]
+        pending = pending[(current[pending] >= 0) & ~found[pending]]
+    return found
+
+
+def _learn(
+        csr: CSRGraph,
+        kinds: np.ndarray,
+        asyss: List[AS],
+        tree: RouteTree,
+        route_of: np.ndarray,
+        best_key: np.ndarray,
+        origins: np.ndarray,
+        offers: _Offers,
+) -> np.ndarray:
+    # route_of and best_key are the flattened per-destination rows, indexed by column * len(csr) + AS index
+    parent, dst, relation, otc = offers
+    sender = tree.asys[parent]
+    length = tree.length[parent] + 1
+    kind = kinds[dst]
+    column = tree.column[parent]
+    origin = origins[column]
+    slot = column.astype(np.int64) * len(csr) + dst
+
+    # Local preference, then path length, then the lowest next hop AS ID, packed into one comparable integer
+    n = len(csr)
+    key = (relation.astype(np.int64) * (n + 2) + length) * n + csr.tie_rank[sender]
+
+    # An offer that is not preferred over the current route can never be adopted, and dropping it does not change
+    # which of the other offers are, so the more expensive checks below only run for the remaining ones
+    accept = (key < best_key[slot]) & (dst != origin)
+    # OTCASPAPolicy does not reject cycles, every other policy does
+    check = np.nonzero(accept & (kind != OTC_ASPA))[0]
+    accept[check] = ~_on_path(tree, parent[check], dst[check])
+
+    # Ingress policy of RFC 9234
+    is_otc = np.isin(kind, (OTC, OTC_ASPA))
+    if is_otc.any():
+        otc_set = otc >= 0
+        accept &= ~(is_otc & otc_set & np.isin(relation, (CUSTOMER, RS_CLIENT)))
+        accept &= ~(is_otc & otc_set & (relation == PEER) & (otc != sender))
+        otc = np.where(is_otc & ~otc_set & np.isin(relation, (PROVIDER, PEER, ROUTE_SERVER)), sender, otc)
+
+    # Path validation needs the whole path and is done on Route objects by the routing_policy implementation
+    for i in np.nonzero(accept & np.isin(kind, (ASPA, ASCONES, OTC_ASPA)))[0]:
+        path = [asyss[j] for j in tree.path(int(parent[i]))] + [asyss[dst[i]]]
+        route = Route(csr.as_ids[origin[i]], path, False, False, False)
+        if kind[i] == ASCONES:
+            result = perform_ASCONES_algorithm(route)
+        else:
+            result = perform_ASPA_algorithm(route)
+        if result == 'Invalid':
+            accept[i] = False
+
+    candidates = np.nonzero(accept)[0]
+    key = key[candidates]
+
+    # Offers are ordered like the FIFO queue of the object engine. An AS adopts every offer that is preferred over
+    # its current route and all offers before it in the round, and forwards each of them in turn, so neighbours may
+    # keep an earlier one of them when it ties with the later ones.
+    order = np.argsort(slot[candidates], kind='stable')
+    by_dst = candidates[order]
+    key = key[order]
+    group_dst = slot[by_dst]
+    group_start = np.ones(len(by_dst), dtype=bool)
+    group_start[1:] = group_dst[1:] != group_dst[:-1]
+    group = np.cumsum(group_start) - 1
+    # Running minimum of the key within each group, made monotonic across groups by shifting dense key ranks
+    _, rank = np.unique(key, return_inverse=True)
+    shifted = rank.astype(np.int64) - group * (len(key) + 1)
+    running = np.minimum.accumulate(shifted)
+    previous = np.empty(len(by_dst), dtype=np.int64)
+    previous[1:] = running[:-1]
+    improves = group_start | (shifted < previous)
+    adopt_sorted = improves & (key < best_key[group_dst])
+
+    adopt = np.zeros(len(dst), dtype=bool)
+    adopt[by_dst[adopt_sorted]] = True
+    records = tree.add(dst[adopt], parent[adopt], length[adopt], relation[adopt], otc[adopt], column[adopt])
+
+    # Keys only ever decrease within a round, so the last adopted route of every AS is its best one
+    np.maximum.at(route_of, slot[adopt], records)
+    np.minimum.at(best_key, group_dst[adopt_sorted], key[adopt_sorted])
+    return records
@@ -0,0 +1,204 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from bgpsecsim.asys import Relation
+from bgpsecsim.csr_graph import CSRGraph
+
+# Valley-free reachability on the CSR arrays.
+#
+# An AS A can reach an AS X if there is a path from A to X that goes up to providers, across at most one peer link
+# and then down to customers. Every AS has an up node, reached by what its customers can reach plus itself, and a
+# down node, reached by its up node, the up nodes of its peers and the down nodes of its providers. The up nodes
+# form a DAG along customer to provider links and the down nodes along provider to customer links, so both can be
+# processed level by level. The sets of source ASes are packed bitset rows of uint64 words, one bit per source AS,
+# and sources are processed in blocks of block_size bits to bound the memory used. Completed blocks can be written
+# to a memory-mapped file holding the whole matrix, with one row per target AS and one bit per source AS.
+
+CUSTOMER = Relation.CUSTOMER.value
+PEER = Relation.PEER.value
+PROVIDER = Relation.PROVIDER.value
+
+# Default number of source ASes per block, 64 uint64 words per row
+BLOCK_SIZE = 4096
+# Arrays of one row per AS alive at the same time during a block: the up and down rows, the rows gathered for a
+# union and the result of the union
+ROWS_PER_AS = 4
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        counts = _BYTE_COUNTS[words.view(np.uint8)].reshape(words.shape + (8,))
+        return counts.sum(axis=-1, dtype=np.uint8)
+
+
+# Edges of one level: for every AS of the level, the rows it takes the union of, as for np.bitwise_or.reduceat
+_Level = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class ReachabilityPlan(object):
+    """The levels of the valley-free DAG of a topology, shared by all source blocks."""
+    __slots__ = ['n', 'up_levels', 'peer_edges', 'down_levels']
+
+    n: int
+    # Customer to provider edges, grouped by the level of the provider, lowest first
+    up_levels: List[_Level]
+    # Peer edges, grouped by AS
+    peer_edges: _Level
+    # Provider to customer edges, grouped by the level of the customer, lowest first
+    down_levels: List[_Level]
+
+    def __init__(self, csr: CSRGraph):
+        self.n = len(csr)
+        asys = np.repeat(np.arange(self.n, dtype=np.int64), csr.degrees())
+        neighbor = csr.neighbor_indices
+        relation = csr.neighbor_relations
+
+        # Edges from customer to provider, seen from the customer
+        is_provider = relation == PROVIDER
+        customers, providers = asys[is_provider], neighbor[is_provider]
+        self.up_levels = _levels(self.n, customers, providers)
+        self.down_levels = _levels(self.n, providers, customers)
+        is_peer = relation == PEER
+        self.peer_edges = _group(asys[is_peer], neighbor[is_peer])
+
+
+def _levels(n: int, src: np.ndarray, dst: np.ndarray) -> List[_Level]:
+    """Groups the edges src -> dst of a DAG by the level of dst, the length of the longest path leading to it."""
+    level = np.zeros(n, dtype=np.int64)
+    for _ in range(n + 1):
+        new_level = level.copy()
+        np.maximum.at(new_level, dst, level[src] + 1)
+        if np.array_equal(new_level, level):
+            break
+        level = new_level
+    else:
+        raise ValueError("Graph has a customer-provider cycle")
+
+    levels = []
+    edge_level = level[dst]
+    for k in range(1, int(level.max(initial=0)) + 1):
+        at_level = edge_level == k
+        levels.append(_group(dst[at_level], src[at_level]))
+    return levels
+
+
+def _group(dst: np.ndarray, src: np.ndarray) -> _Level:
+    order = np.argsort(dst, kind='stable')
+    dst, src = dst[order], src[order]
+    starts = np.flatnonzero(np.r_[True, dst[1:] != dst[:-1]]) if len(dst) else np.zeros(0, dtype=np.int64)
+    return dst[starts], src, starts
+
+
+def _union_into(rows: np.ndarray, source_rows: np.ndarray, level: _Level) -> None:
+    dst, src, starts = level
+    ends = np.append(starts[1:], len(src))
+    # The source rows are gathered in chunks of at most one row per AS, there can be many more peer edges than ASes
+    i = 0
+    while i < len(dst):
+        j = max(i + 1, int(np.searchsorted(ends, starts[i] + len(rows), side='right')))
+        first, last = starts[i], ends[j - 1]
+        rows[dst[i:j]] |= np.bitwise_or.reduceat(source_rows[src[first:last]], starts[i:j] - first, axis=0)
+        i = j
+
+
+def block_size_for_budget(n: int, memory_budget: int) -> int:
+    """Largest block size, a multiple of 64 source ASes, whose bitset rows fit into memory_budget bytes."""
+    words = memory_budget // (ROWS_PER_AS * 8 * max(n, 1))
+    if words < 1:
+        raise ValueError(f"A memory budget of {memory_budget} bytes does not fit a block of 64 ASes, at least "
+                         f"{ROWS_PER_AS * 8 * n} bytes are needed")
+    return int(min(words, (n + 63) // 64)) * 64
+
+
+def sweep_block(plan: ReachabilityPlan, start: int, stop: int) -> np.ndarray:
+    """Rows of the down nodes of all ASes, with the bits of the source ASes start to stop - 1."""
+    words = (stop - start + 63) // 64
+    up = np.zeros((plan.n, words), dtype=np.uint64)
+    offsets = np.arange(stop - start)
+    up[start + offsets, offsets // 64] = np.left_shift(np.uint64(1), (offsets % 64).astype(np.uint64))
+
+    for level in plan.up_levels:
+        _union_into(up, up, level)
+    down = up.copy()
+    _union_into(down, up, plan.peer_edges)
+    del up
+    for level in plan.down_levels:
+        _union_into(down, down, level)
+    return down
+
+
+def reach_counts(csr: CSRGraph, block_size: int = BLOCK_SIZE, spill_file: Optional[str] = None) -> np.ndarray:
+    """Number of ASes that can reach every AS over a valley-free path, the AS itself included.
+
+    With spill_file, the reachability matrix is also written to that file, see open_spill_file. The block size
+    must then be a multiple of 64, so that blocks start at a word boundary.
+    """
+    plan = ReachabilityPlan(csr)
+    counts = np.zeros(plan.n, dtype=np.int64)
+    matrix = None
+    if spill_file is not None:
+        if block_size % 64 != 0:
+            raise ValueError("The block size must be a multiple of 64 to spill blocks to a file")
+        matrix = np.lib.format.open_memmap(spill_file, mode='w+', dtype='<u8',
+                                           shape=(plan.n, (plan.n + 63) // 64))
+    for start in range(0, plan.n, block_size):
+        down = sweep_block(plan, start, min(start + block_size, plan.n))
+        counts += _popcount(down).sum(axis=1, dtype=np.int64)
+        if matrix is not None:
+            matrix[:, start // 64:start // 64 + down.shape[1]] = down
+            matrix.flush()
+    return counts
+
+
+def open_spill_file(spill_file: str) -> np.ndarray:
+    """The reachability matrix written by reach_counts, memory-mapped read-only.
+
+    Bit j % 64 of word j // 64 of row i is set if the AS with index j can reach the AS with index i.
+    """
+    return np.load(spill_file, mmap_mode='r')
+
+
+def reachable_from(matrix: np.ndarray, target: int) -> np.ndarray:
+    """Indices of the ASes that can reach the AS with index target, from a spilled reachability matrix."""
+    bits = np.unpackbits(np.asarray(matrix[target], dtype='<u8').view(np.uint8), bitorder='little')
+    return np.flatnonzero(bits[:len(matrix)])
+
+
+def reach_count_to(csr: CSRGraph, target: int) -> int:
+    """Number of ASes that can reach the AS with index target over a valley-free path, itself included."""
+    asys = np.repeat(np.arange(len(csr), dtype=np.int64), csr.degrees())
+    neighbor = csr.neighbor_indices
+    relation = csr.neighbor_relations
+
+    # Down nodes leading to the target: the target and all its providers, transitively
+    down = _closure(len(csr), target, asys, neighbor, relation, PROVIDER)
+    # Up nodes leading to those: the ASes themselves and their peers, and all their customers, transitively
+    up = down.copy()
+    up[neighbor[(relation == PEER) & down[asys]]] = True
+    up = _closure_from(up, asys, neighbor, relation, CUSTOMER)
+    return int(up.sum())
+
+
+def _closure(n: int, start: int, asys: np.ndarray, neighbor: np.ndarray, relation: np.ndarray,
+             follow: int) -> np.ndarray:
+    seen = np.zeros(n, dtype=bool)
+    seen[start] = True
+    return _closure_from(seen, asys, neighbor, relation, follow)
+
+
+def _closure_from(seen: np.ndarray, asys: np.ndarray, neighbor: np.ndarray, relation: np.ndarray,
+                  follow: int) -> np.ndarray:
+    # Breadth-first search along the edges with the given relation, expanding the whole frontier at once
+    edges = relation == follow
+    asys, neighbor = asys[edges], neighbor[edges]
+    frontier = seen.copy()
+    while frontier.any():
+        reached = np.zeros(len(seen), dtype=bool)
+        reached[neighbor[frontier[asys]]] = True
+        frontier = reached & ~seen
+        seen |= frontier
+    return seen
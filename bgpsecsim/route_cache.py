@@ -0,0 +1,241 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import bgpsecsim.propagation as propagation
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.asys import AS, AS_ID, Route
+from bgpsecsim.routing_policy import OnlyToCustomerPolicy, OTCASPAPolicy
+
+# Destinations propagated together by RouteCache.prefetch, the array engine needs a few MiB per destination
+PREFETCH_BATCH_SIZE = 16
+# Policies for which the array engine gives the same routes as ASGraph.find_routes_to. It does not produce the OTC
+# attribute strings of Route.local_data_part_do, and has no BGPsec signatures.
+ARRAY_ENGINE_POLICIES = frozenset(propagation.POLICY_KINDS) - {OnlyToCustomerPolicy, OTCASPAPolicy}
+
+
+def state_fingerprint(graph: ASGraph) -> bytes:
+    """Digest of everything in the graph state that route propagation depends on, the topology included.
+
+    It is recomputed only when AS.state_version has changed since the last call for this graph.
+    """
+    if graph.fingerprint is not None and graph.fingerprint[0] == AS.state_version:
+        return graph.fingerprint[1]
+    version = AS.state_version
+    h = hashlib.blake2b(graph.csr().digest())
+    h.update(repr(tuple(
+        (type(asys.policy), asys.bgp_sec_enabled, _rpki_object_key(asys.aspa), _rpki_object_key(asys.ascones))
+        for asys in graph.asyss.values()
+    )).encode())
+    graph.fingerprint = (version, h.digest())
+    return graph.fingerprint[1]
+
+
+def _rpki_object_key(rpki_object) -> Hashable:
+    if rpki_object is None:
+        return None
+    as_id, as_ids = rpki_object
+    return as_id, tuple(as_ids)
+
+
+class RouteSnapshot(object):
+    """Routes of all ASes towards one destination, stored as arrays.
+
+    Every Route object reachable from the routing tables is one record, including the stale routes that are only
+    parents of stored routes, so that restoring rebuilds exactly the same paths and shared route tree.
+    """
+    __slots__ = ['dest', 'asys', 'parent', 'authenticated', 'do', 'do_values', 'route_of']
+
+    dest: AS_ID
+    # Index (in graph.asyss order) of the AS each record adds to the path
+    asys: np.ndarray
+    # Parent record, -1 for a route that starts a path. Parents always come before their children.
+    parent: np.ndarray
+    authenticated: np.ndarray
+    # Index into do_values, -1 for an empty OTC attribute
+    do: np.ndarray
+    do_values: List[str]
+    # Record stored in the routing table of every AS, -1 if the AS has no route
+    route_of: np.ndarray
+
+    @classmethod
+    def capture(cls, graph: ASGraph, dest: AS_ID) -> 'RouteSnapshot':
+        records: Dict[int, int] = {}
+        routes: List[Route] = []
+        route_of = np.full(len(graph.asyss), -1, dtype=np.int32)
+
+        for i, asys in enumerate(graph.asyss.values()):
+            route = asys.get_route(dest)
+            if route is None:
+                continue
+            # Number the ancestors that are not known yet, parents first
+            chain = []
+            current = route
+            while current is not None and id(current) not in records:
+                chain.append(current)
+                current = current.parent
+            for current in reversed(chain):
+                records[id(current)] = len(routes)
+                routes.append(current)
+            route_of[i] = records[id(route)]
+
+        do_values: List[str] = []
+        do_index: Dict[str, int] = {}
+        snapshot = cls.__new__(cls)
+        snapshot.dest = dest
+        snapshot.asys = np.array([route.final.index for route in routes], dtype=np.int32)
+        snapshot.parent = np.array([-1 if route.parent is None else records[id(route.parent)] for route in routes],
+                                   dtype=np.int32)
+        snapshot.authenticated = np.array([route.authenticated for route in routes], dtype=bool)
+        do = []
+        for route in routes:
+            if route.local_data_part_do == "":
+                do.append(-1)
+                continue
+            if route.local_data_part_do not in do_index:
+                do_index[route.local_data_part_do] = len(do_values)
+                do_values.append(route.local_data_part_do)
+            do.append(do_index[route.local_data_part_do])
+        snapshot.do = np.array(do, dtype=np.int32)
+        snapshot.do_values = do_values
+        snapshot.route_of = route_of
+        return snapshot
+
+    @classmethod
+    def from_state(cls, state: propagation.RoutingState) -> 'RouteSnapshot':
+        """Takes the routes computed by the array engine, which carry no BGPsec or OTC attributes."""
+        tree = state.tree
+        # Only the routes held by an AS and their ancestors, as in capture
+        keep = np.zeros(tree.size, dtype=bool)
+        records = state.route_of[state.route_of >= 0]
+        while len(records):
+            records = records[~keep[records]]
+            keep[records] = True
+            records = tree.parent[records]
+            records = records[records >= 0]
+        # Records are added to the tree after their parents, so the kept ones stay in that order
+        kept = np.nonzero(keep)[0]
+        number = np.full(tree.size, -1, dtype=np.int32)
+        number[kept] = np.arange(len(kept), dtype=np.int32)
+        parent = tree.parent[kept]
+
+        snapshot = cls.__new__(cls)
+        snapshot.dest = state.csr.as_ids[state.origin]
+        snapshot.asys = tree.asys[kept].astype(np.int32)
+        snapshot.parent = np.where(parent >= 0, number[np.maximum(parent, 0)], -1).astype(np.int32)
+        snapshot.authenticated = np.zeros(len(kept), dtype=bool)
+        snapshot.do = np.full(len(kept), -1, dtype=np.int32)
+        snapshot.do_values = []
+        snapshot.route_of = np.where(state.route_of >= 0, number[np.maximum(state.route_of, 0)], -1).astype(np.int32)
+        # The origin keeps the route to itself from AS.reset_routing_table, which is a separate Route from the one
+        # its neighbours extend, and marked as authenticated
+        snapshot.asys = np.append(snapshot.asys, np.int32(state.origin))
+        snapshot.parent = np.append(snapshot.parent, np.int32(-1))
+        snapshot.authenticated = np.append(snapshot.authenticated, True)
+        snapshot.do = np.append(snapshot.do, np.int32(-1))
+        snapshot.route_of[state.origin] = len(kept)
+        return snapshot
+
+    def restore(self, graph: ASGraph) -> None:
+        """Sets the route to dest of every AS in the graph to the captured one."""
+        asyss = list(graph.asyss.values())
+        do_values = [""] + self.do_values
+        routes: List[Route] = []
+        for asys, parent, authenticated, do in zip(self.asys.tolist(), self.parent.tolist(),
+                                                   self.authenticated.tolist(), self.do.tolist()):
+            if parent < 0:
+                route = Route(self.dest, [asyss[asys]], False, False, authenticated, do_values[do + 1])
+            else:
+                route = routes[parent].extend(asyss[asys], authenticated, do_values[do + 1])
+            routes.append(route)
+
+        for asys, record in zip(asyss, self.route_of.tolist()):
+            if record < 0:
+                asys.routing_table.pop(self.dest, None)
+            else:
+                asys.routing_table[self.dest] = routes[record]
+
+    @property
+    def nbytes(self) -> int:
+        return (self.asys.nbytes + self.parent.nbytes + self.authenticated.nbytes + self.do.nbytes +
+                self.route_of.nbytes + sum(len(value) for value in self.do_values))
+
+
+class RouteCache(object):
+    """LRU cache of legitimate route propagations, keyed by destination and graph state, bounded in bytes."""
+    __slots__ = ['max_bytes', 'nbytes', 'snapshots', 'hits', 'misses']
+
+    max_bytes: int
+    nbytes: int
+    snapshots: 'OrderedDict[Tuple[AS_ID, bytes], RouteSnapshot]'
+    hits: int
+    misses: int
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.snapshots = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def find_routes_to(self, graph: ASGraph, target: AS, fingerprint: Optional[bytes] = None) -> None:
+        """Same as graph.find_routes_to(target), but restores a cached result if the graph state is unchanged."""
+        if fingerprint is None:
+            fingerprint = state_fingerprint(graph)
+        key = (target.as_id, fingerprint)
+        snapshot = self.snapshots.get(key)
+        if snapshot is not None:
+            self.hits += 1
+            self.snapshots.move_to_end(key)
+            snapshot.restore(graph)
+            return
+
+        self.misses += 1
+        graph.find_routes_to(target)
+        self.add(key, RouteSnapshot.capture(graph, target.as_id))
+
+    def prefetch(self, graph: ASGraph, targets: Sequence[AS], fingerprint: Optional[bytes] = None) -> None:
+        """Propagates the targets that are not cached yet together with the array engine, if it supports the graph.
+
+        At most half of the cache is filled, so that the prefetched results do not evict each other.
+        """
+        if fingerprint is None:
+            fingerprint = state_fingerprint(graph)
+        missing = list({target.as_id: target for target in targets
+                        if (target.as_id, fingerprint) not in self.snapshots}.values())
+        if not missing or not array_engine_supports(graph):
+            return
+
+        nbytes = 0
+        for state in propagation.iter_routes_to(graph, missing, PREFETCH_BATCH_SIZE):
+            snapshot = RouteSnapshot.from_state(state)
+            nbytes += snapshot.nbytes
+            if nbytes > self.max_bytes // 2:
+                break
+            self.add((snapshot.dest, fingerprint), snapshot)
+
+    def add(self, key: Tuple[AS_ID, bytes], snapshot: RouteSnapshot) -> None:
+        if snapshot.nbytes > self.max_bytes:
+            return
+        self.snapshots[key] = snapshot
+        self.nbytes += snapshot.nbytes
+        self.evict()
+
+    def resize(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def evict(self) -> None:
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.snapshots.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        self.snapshots.clear()
+        self.nbytes = 0
+
+
+def array_engine_supports(graph: ASGraph) -> bool:
+    return all(type(asys.policy) in ARRAY_ENGINE_POLICIES and not asys.bgp_sec_enabled for asys in graph.asyss.values())
@@ -1,8 +1,34 @@
-from typing import Callable, Generator
-
 import random
+from typing import Optional
+
 # from bgpsecsim.asys import Relation, Route, RoutingPolicy
-from bgpsecsim.asys import Relation, Route, RoutingPolicy
+from bgpsecsim.asys import AS, Relation, Route, RoutingPolicy
+
+
+# Preference rules turn a route into a key that compares as a tuple, the route with the lower key is preferred.
+def local_pref(route: Route) -> int:
+    relation = route.final.get_relation(route.first_hop)
+    return relation.value if relation else -1
+
+
+def default_preference(route: Route) -> tuple:
+    # 1. Local preferences, 2. AS-path length, 3. Next hop AS number
+    return local_pref(route), route.length, route.first_hop.as_id
+
+
+def bgpsec_high_sec_preference(route: Route) -> tuple:
+    # Prefer authenticated routes before local preferences
+    return not route.authenticated, local_pref(route), route.length, route.first_hop.as_id
+
+
+def bgpsec_med_sec_preference(route: Route) -> tuple:
+    # Prefer authenticated routes after local preferences
+    return local_pref(route), not route.authenticated, route.length, route.first_hop.as_id
+
+
+def bgpsec_low_sec_preference(route: Route) -> tuple:
+    # Prefer authenticated routes after the AS-path length
+    return local_pref(route), route.length, not route.authenticated, route.first_hop.as_id
 
 
 class DefaultPolicy(RoutingPolicy):
@@ -22,18 +48,8 @@ class DefaultPolicy(RoutingPolicy):
         # assert triggers error as soon as condition is false, in this case, if both final AS aren't the same
         assert current.final == new.final, "routes must have same final AS"
 
-        for rule in self.preference_rules():
-            current_val = rule(current)
-            new_val = rule(new)
-
-            if current_val is not None:
-                if new_val is not None:
-                    if current_val < new_val:
-                        return False
-                    if new_val < current_val:
-                        return True
-
-        return False
+        # Lower keys are preferred, equal keys keep the current route
+        return self.preference_key(new, self.preference_rule) < self.preference_key(current, self.preference_rule)
 
     def forward_to(self, route: Route, relation: Relation) -> bool:
         # print("Route: ", route)
@@ -46,19 +62,7 @@ class DefaultPolicy(RoutingPolicy):
         # Route is forwarded either if was received by a customer or if it is going to be sent to a customer.
         return first_hop_rel == Relation.CUSTOMER or relation == Relation.CUSTOMER
 
-    # Generators are iterators, a kind of iterable you can only iterate over once.
-    # Generators do not store all the values in memory, they generate the values on the fly:
-    def preference_rules(self) -> Generator[Callable[[Route], int], None, None]:
-        # 1. Local preferences
-        def local_pref(route):
-            relation = route.final.get_relation(route.first_hop)
-            return relation.value if relation else -1
-
-        yield local_pref
-        # 2. AS-path length
-        yield lambda route: route.length
-        # 3. Next hop AS number
-        yield lambda route: route.first_hop.as_id
+    preference_rule = staticmethod(default_preference)
 
 
 class RPKIPolicy(DefaultPolicy):
@@ -95,21 +99,7 @@ class BGPsecHighSecPolicy(DefaultPolicy):
         # bgp_sec_enabled, but that is less convenient in our simulation.
         return super().accept_route(route) and not route.origin_invalid
 
-    # Lambda takes several arguments, but only has one expression
-    def preference_rules(self) -> Generator[Callable[[Route], int], None, None]:
-        # Prefer authenticated routes
-        yield lambda route: not route.authenticated
-
-        # 1. Local preferences
-        def local_pref(route):
-            relation = route.final.get_relation(route.first_hop)
-            return relation.value if relation else -1
-
-        yield local_pref
-        # 2. AS-path length
-        yield lambda route: route.length
-        # 3. Next hop AS number
-        yield lambda route: route.first_hop.as_id
+    preference_rule = staticmethod(bgpsec_high_sec_preference)
 
 
 class BGPsecMedSecPolicy(DefaultPolicy):
@@ -124,19 +114,7 @@ class BGPsecMedSecPolicy(DefaultPolicy):
         # bgp_sec_enabled, but that is less convenient in our simulation.
         return super().accept_route(route) and not route.origin_invalid
 
-    def preference_rules(self) -> Generator[Callable[[Route], int], None, None]:
-        # 1. Local preferences
-        def local_pref(route):
-            relation = route.final.get_relation(route.first_hop)
-            return relation.value if relation else -1
-
-        yield local_pref
-        # Prefer authenticated routes
-        yield lambda route: not route.authenticated
-        # 2. AS-path length
-        yield lambda route: route.length
-        # 3. Next hop AS number
-        yield lambda route: route.first_hop.as_id
+    preference_rule = staticmethod(bgpsec_med_sec_preference)
 
 
 class BGPsecLowSecPolicy(DefaultPolicy):
@@ -151,19 +129,7 @@ class BGPsecLowSecPolicy(DefaultPolicy):
         # bgp_sec_enabled, but that is less convenient in our simulation.
         return super().accept_route(route) and not route.origin_invalid
 
-    def preference_rules(self) -> Generator[Callable[[Route], int], None, None]:
-        # 1. Local preferences
-        def local_pref(route):
-            relation = route.final.get_relation(route.first_hop)
-            return relation.value if relation else -1
-
-        yield local_pref
-        # 2. AS-path length
-        yield lambda route: route.length
-        # Prefer authenticated routes
-        yield lambda route: not route.authenticated
-        # 3. Next hop AS number
-        yield lambda route: route.first_hop.as_id
+    preference_rule = staticmethod(bgpsec_low_sec_preference)
 
 
 # Rules are all the same for RouteLeakPolicy and DefaultPolicy, except that RouteLeakPolicy forwards routes to any peer.
@@ -184,18 +150,8 @@ class RouteLeakPolicy(RoutingPolicy):
         # assert triggers error as soon as condition is false, in this case, if both final AS aren't the same
         assert current.final == new.final, "routes must have same final AS"
 
-        for rule in self.preference_rules():
-            current_val = rule(current)
-            new_val = rule(new)
-
-            if current_val is not None:
-                if new_val is not None:
-                    if current_val < new_val:
-                        return False
-                    if new_val < current_val:
-                        return True
-
-        return False
+        # Lower keys are preferred, equal keys keep the current route
+        return self.preference_key(new, self.preference_rule) < self.preference_key(current, self.preference_rule)
 
     def forward_to(self, route: Route, relation: Relation) -> bool:
         #        asys = route.final
@@ -203,22 +159,148 @@ class RouteLeakPolicy(RoutingPolicy):
         #        assert first_hop_rel is not None
         return True  # Forward route to any peer regardless of relationship (not respecting Gao-Rexford model, hence constituting a RouteLeak).
 
-    # Generators are iterators, a kind of iterable you can only iterate over once.
-    # Generators do not store all the values in memory, they generate the values on the fly:
-    def preference_rules(self) -> Generator[Callable[[Route], int], None, None]:
-        # 1. Local preferences
-        def local_pref(route):
-            relation = route.final.get_relation(route.first_hop)
-            return relation.value if relation else -1
+    preference_rule = staticmethod(default_preference)
+
+
+# Results of hop(AS(i), AS(j)) in the ASPA verification
+PROVIDER_PLUS = 'Provider+'
+NOT_PROVIDER_PLUS = 'Not Provider+'
+NO_ATTESTATION = 'No Attestation'
+
+
+def aspa_hop(asys, next_asys) -> str:
+    # Whether the ASPA object of asys attests next_asys as a provider
+    if asys.aspa_providers is None:
+        return NO_ATTESTATION
+    if next_asys.as_id in asys.aspa_providers:
+        return PROVIDER_PLUS
+    return NOT_PROVIDER_PLUS
+
+
+def ascones_hop(asys, customer) -> str:
+    # Whether the ASCONES object of asys attests customer as a customer
+    if asys.ascones_customers is None:
+        return NO_ATTESTATION
+    if customer.as_id in asys.ascones_customers:
+        return PROVIDER_PLUS
+    return NOT_PROVIDER_PLUS
+
+
+class HopSummary(object):
+    """What the ASPA and ASCONES verification need to know about the hops of a path, in constant size.
+
+    Hops are numbered from the origin on. up is hop(AS(i), AS(i+1)) towards the end of the path, down is
+    hop(AS(i+1), AS(i)) back towards the origin.
+    """
+    __slots__ = ['version', 'hops', 'up_first_not', 'up_prov_prefix', 'up_first_bad', 'up_last_bad', 'down_last_not',
+                 'down_prov_suffix']
+
+    # AS.attestation_version the summary was computed for
+    version: int
+    hops: int
+    # First up hop that is Not Provider+, -1 if there is none
+    up_first_not: int
+    # Number of Provider+ up hops the path starts with (the up-ramp)
+    up_prov_prefix: int
+    # Result of the first and of the last up hop that is not Provider+, None if there is none
+    up_first_bad: Optional[str]
+    up_last_bad: Optional[str]
+    # Last down hop that is Not Provider+, -1 if there is none
+    down_last_not: int
+    # Number of Provider+ down hops the path ends with (the down-ramp)
+    down_prov_suffix: int
+
+    def __init__(self, version: int):
+        # Summary of a path with a single AS
+        self.version = version
+        self.hops = 0
+        self.up_first_not = -1
+        self.up_prov_prefix = 0
+        self.up_first_bad = None
+        self.up_last_bad = None
+        self.down_last_not = -1
+        self.down_prov_suffix = 0
+
+    def extended(self, version: int, up: str, down: str) -> 'HopSummary':
+        """Summary of the path with one more hop, whose results are up and down."""
+        hop = self.hops
+        summary = HopSummary.__new__(HopSummary)
+        summary.version = version
+        summary.hops = hop + 1
+        summary.up_first_not = hop if self.up_first_not < 0 and up == NOT_PROVIDER_PLUS else self.up_first_not
+        summary.up_prov_prefix = hop + 1 if self.up_prov_prefix == hop and up == PROVIDER_PLUS else self.up_prov_prefix
+        summary.up_first_bad = up if self.up_first_bad is None and up != PROVIDER_PLUS else self.up_first_bad
+        summary.up_last_bad = up if up != PROVIDER_PLUS else self.up_last_bad
+        summary.down_last_not = hop if down == NOT_PROVIDER_PLUS else self.down_last_not
+        summary.down_prov_suffix = self.down_prov_suffix + 1 if down == PROVIDER_PLUS else 0
+        return summary
+
+
+def verification_summary(route: Route, ascones: bool = False) -> HopSummary:
+    """Returns the summary of the ASPA (or ASCONES) hops along the whole path of route.
+
+    Summaries are cached on the routes, and the summary of a route is its parent's summary extended by one hop, so
+    verifying all routes of a propagation takes constant time per route. Cached summaries are recomputed when an
+    ASPA or ASCONES object of any AS changed since.
+    """
+    version = AS.attestation_version
+    chain = []
+    current = route
+    while current is not None:
+        summary = current.ascones_summary if ascones else current.aspa_summary
+        if summary is not None and summary.version == version:
+            break
+        chain.append(current)
+        current = current.parent
+    else:
+        summary = None
+
+    for current in reversed(chain):
+        if summary is None:
+            summary = HopSummary(version)
+        else:
+            asys, next_asys = current.parent.final, current.final
+            if ascones:
+                summary = summary.extended(version, ascones_hop(next_asys, asys), ascones_hop(asys, next_asys))
+            else:
+                summary = summary.extended(version, aspa_hop(asys, next_asys), aspa_hop(next_asys, asys))
+        if ascones:
+            current.ascones_summary = summary
+        else:
+            current.aspa_summary = summary
+    return summary
+
 
-        yield local_pref
-        # 2. AS-path length
-        yield lambda route: route.length
-        # 3. Next hop AS number
-        yield lambda route: route.first_hop.as_id
+def verify_hop_summary(summary: HopSummary, relation: Relation, length: int, ascones: bool = False) -> str:
+    """Outcome of the ASPA (or ASCONES) verification of a route of the given length, whose parent has summary.
+
+    Same as the algorithms below for routes without loops: the hop towards the verifying AS is never checked, so only
+    the path up to the neighbour that sent the route matters.
+    """
+    if relation == Relation.CUSTOMER or relation == Relation.PEER:
+        # ASPA checks the hops from the origin on, ASCONES from the neighbour back to the origin
+        bad = summary.up_last_bad if ascones else summary.up_first_bad
+        if bad is None:
+            return 'Valid'
+        return 'Invalid' if bad == NOT_PROVIDER_PLUS else 'Unknown'
+
+    # Positions count from 1 as in the draft, N + 1 is the length of the route
+    u_min = summary.up_first_not + 2 if summary.up_first_not >= 0 else length
+    v_max = summary.down_last_not + 1 if summary.down_last_not >= 0 else 0
+    if u_min <= v_max:
+        return 'Invalid'
+    k = summary.up_prov_prefix + 1
+    l = length - 1 - summary.down_prov_suffix
+    return 'Valid' if l - k <= 1 else 'Unknown'
 
 
 def perform_ASPA_algorithm(route):
+    if route.length >= 2 and not route.has_cycle:
+        relation = route.final.get_relation(route.first_hop)
+        if relation == Relation.CUSTOMER or relation == Relation.PEER or relation == Relation.PROVIDER:
+            return verify_hop_summary(verification_summary(route.parent), relation, route.length)
+
+    path = route.path
     result = False
     # We do not implement the mandatory check in Section 6 of the draft for intentionally leaked ASes that removed their ASN from the path as we do not resemble this use case here.
     # Algorithm for upstream paths (routes received by customer), Section 6.1 of draft
@@ -226,57 +308,49 @@ def perform_ASPA_algorithm(route):
 
     relation = route.final.get_relation(route.first_hop)
     if relation == Relation.CUSTOMER or relation == Relation.PEER:
-        # print('')
-        # print('-------')
-        # print('Relation: ', relation)
-        # print('Route: ', route)
         # Step1 - If the AS_PATH has an AS_SET, then the procedure halts with the outcome "Invalid".
         # Step2 - Collapse prepends in the AS_SEQUENCE(s) in the AS_PATH (i.e., keep only the unique AS numbers). Let the resulting ordered sequence be represented by {AS(N), AS(N-1), ..., AS(2), AS(1)}, where AS(1) is the first-added (i.e., origin) AS and AS(N) is the last-added AS and neighbor to the receiving/validating AS.
         # Step3 - If N = 1, then the procedure halts with the outcome "Valid". Else, continue.
-        if len(route.path) < 2:  # case never happens
+        if len(path) < 2:  # case never happens
             raise Exception('Route length below verifyable!')
-        elif len(route.path) == 2:  # the route object also contains the AS that currently validates as destination
+        elif len(path) == 2:  # the route object also contains the AS that currently validates as destination
             result = 'Valid'
         # Step4 - At this step, N ≥ 2. If there is an i such that 2 ≤ i ≤ N and hop(AS(i-1), AS(i)) = "Not Provider+", then the procedure halts with the outcome "Invalid". Else, continue.
         # Step5 - If there is an i such that 2 ≤ i ≤ N and hop(AS(i-1), AS(i)) = "No Attestation", then the procedure halts with the outcome "Unknown". Else, the procedure halts with the outcome "Valid".
         else:
             result = 'Valid'
-            for i, curr_asys in enumerate(route.path):
-                if i + 2 < len(
-                        route.path):  # Verifying AS contained in route AND hop towards verifying AS is known and not checked in ASPA algorithm
-                    next_asys = route.path[i + 1]
-                    # print('Curr AS: ', curr_asys.as_id)
-                    # print('Curr AS ASPA', curr_asys.aspa)
-                    # print('Next AS: ', next_asys.as_id)
-                    if curr_asys.aspa != None and not next_asys.as_id in curr_asys.aspa[
-                        1]:  # ASPA present but upstream not contained in provider list
-                        # Invalid
-                        result = 'Invalid'
-                        break
-                    elif curr_asys.aspa == None:  # ASPA not present
-                        # No attestation
-                        result = 'Unknown'
-                        break
-                    else:
-                        # ASPA object present and current AS authorized its upstream
-                        pass
+            # The verifying AS is the last AS of the path, the hop towards it is not checked
+            for i in range(len(path) - 2):
+                hop = aspa_hop(path[i], path[i + 1])
+                if hop == NOT_PROVIDER_PLUS:
+                    result = 'Invalid'
+                    break
+                elif hop == NO_ATTESTATION:
+                    result = 'Unknown'
+                    break
 
     elif relation == Relation.PROVIDER:
-        # print('')
-        # print('-------')
-        # print('Relation: ', relation)
-        # print('Route: ', route)
         # Step1 - If the AS_PATH has an AS_SET, then the procedure halts with the outcome "Invalid".
         # Step2 - Collapse prepends in the AS_SEQUENCE(s) in the AS_PATH (i.e., keep only the unique AS numbers). Let the resulting ordered sequence be represented by {AS(N), AS(N-1), ..., AS(2), AS(1)}, where AS(1) is the first-added (i.e., origin) AS and AS(N) is the last-added AS and neighbor to the receiving/validating AS.
         # Step3 - If 1 ≤ N ≤ 2, then the procedure halts with the outcome "Valid". Else, continue.
-        if len(route.path) < 2:  # case never happens
+        if len(path) < 2:  # case never happens
             raise Exception('Route length below verifyable!')
-        elif len(route.path) == 2 or len(
-                route.path) == 3:  # the route object also contains the AS that currently validates as destination
+        elif len(path) == 2 or len(
+                path) == 3:  # the route object also contains the AS that currently validates as destination
             # Length 2: This case covers an upstream sending a route directly.
             # Length 3: This case covers essentially three scenarios. The upstream of the verifying AS receives the route either from a customer, a peer, or it's upstream. All trivially valid cases.
             result = 'Valid'
         else:  # For paths > 3
+            # Every hop is computed once, in both directions. up[i] is hop(path[i], path[i + 1]) and down[i] is
+            # hop(path[i + 1], path[i]), for all hops that do not end or start at the verifying AS.
+            n_hops = len(path) - 2
+            up = [aspa_hop(path[i], path[i + 1]) for i in range(n_hops)]
+            down = [aspa_hop(path[i + 1], path[i]) for i in range(n_hops)]
+            # Positions in the algorithm count from 1 and refer to the first occurrence of an AS in the path
+            position = {}
+            for i in range(len(path) - 1, -1, -1):
+                position[path[i]] = i + 1
+
             # Step4 - At this step, N ≥ 3.  Given the above-mentioned ordered sequence,
             #        find the lowest value of u (2 ≤ u ≤ N) for which hop(AS(u-1),
             #        AS(u)) = "Not Provider+".  Call it u_min.  If no such u_min
@@ -286,34 +360,18 @@ def perform_ASPA_algorithm(route):
             #        v_max, then the procedure halts with the outcome "Invalid".
             #        Else, continue.
             # Find u_min
-            u_min = len(route.path)  # Set u_min to N+1, but verifying AS is included which is why we skip +1
-            for i, curr_asys in enumerate(route.path):
-                if i + 2 < len(
-                        route.path):  # Verifying AS contained in route AND make sure we are not at the end already and produce an array out-of-bounds exception
-                    next_asys = route.path[i + 1]
-                    # print('Curr AS: ', curr_asys.as_id)
-                    # print('Curr AS ASPA', curr_asys.aspa)
-                    # print('Next AS: ', next_asys.as_id)
-                    if curr_asys.aspa != None and not next_asys.as_id in curr_asys.aspa[
-                        1]:  # ASPA present but next_asys not contained in provider list
-                        u_min = route.path.index(next_asys) + 1  # since index returns position in array starting with 0
-                        break
+            u_min = len(path)  # Set u_min to N+1, but verifying AS is included which is why we skip +1
+            for i in range(n_hops):
+                if up[i] == NOT_PROVIDER_PLUS:
+                    u_min = position[path[i + 1]]
+                    break
 
             # Find v_max
             v_max = 0
-            for i, curr_asys in enumerate(reversed(route.path)):
-                if i == 0:  # skip first AS as it is the verifying AS
-                    continue
-                if i + 1 < len(
-                        route.path):  # Make sure we are not at the end already and produce an array out-of-bounds exception
-                    next_asys = list(reversed(route.path))[i + 1]
-                    # print('Curr AS: ', curr_asys.as_id)
-                    # print('Curr AS ASPA', curr_asys.aspa)
-                    # print('Next AS: ', next_asys.as_id)
-                    if curr_asys.aspa != None and not next_asys.as_id in curr_asys.aspa[
-                        1]:  # ASPA present but next_asys not contained in provider list
-                        v_max = route.path.index(next_asys) + 1
-                        break
+            for i in range(n_hops - 1, -1, -1):
+                if down[i] == NOT_PROVIDER_PLUS:
+                    v_max = position[path[i]]
+                    break
 
             if u_min <= v_max:
                 result = 'Invalid'
@@ -327,39 +385,21 @@ def perform_ASPA_algorithm(route):
 
                 # Find largest k
                 k = 1
-                for i, curr_asys in enumerate(route.path):
-                    if i + 2 < len(
-                            route.path):  # Verifying AS contained in route AND make sure we are not at the end already and produce an array out-of-bounds exception
-                        next_asys = route.path[i + 1]
-                        # print('Curr AS: ', curr_asys.as_id)
-                        # print('Curr AS ASPA', curr_asys.aspa)
-                        # print('Next AS: ', next_asys.as_id)
-                        if curr_asys.aspa != None and next_asys.as_id in curr_asys.aspa[
-                            1]:  # ASPA present but next_asys not contained in provider list
-                            k = route.path.index(next_asys) + 1  # since index returns position in array starting with 0
-                        else:
-                            break
+                for i in range(n_hops):
+                    if up[i] != PROVIDER_PLUS:
+                        break
+                    k = position[path[i + 1]]
 
                 # Step6 - Down-ramp: For N-1 ≥ j ≥ 1, determine the smallest L such that
                 #        hop(AS(j+1), AS(j)) = "Provider+" for each j in the range N-1 ≥ j
                 #        ≥ L.  If such smallest L does not exist, then set L = N.
 
                 # Find smallest L
-                l = len(route.path) - 1
-                for i, curr_asys in enumerate(reversed(route.path)):
-                    if i == 0:  # skip first AS as it is the verifying AS
-                        continue
-                    if i + 1 < len(
-                            route.path):  # Make sure we are not at the end already and produce an array out-of-bounds exception
-                        next_asys = list(reversed(route.path))[i + 1]
-                        # print('Curr AS: ', curr_asys.as_id)
-                        # print('Curr AS ASPA', curr_asys.aspa)
-                        # print('Next AS: ', next_asys.as_id)
-                        if curr_asys.aspa != None and next_asys.as_id in curr_asys.aspa[
-                            1]:  # ASPA present but next_asys not contained in provider list
-                            l = route.path.index(next_asys) + 1
-                        else:
-                            break
+                l = len(path) - 1
+                for i in range(n_hops - 1, -1, -1):
+                    if down[i] != PROVIDER_PLUS:
+                        break
+                    l = position[path[i]]
 
                 if l - k <= 1:
                     result = 'Valid'
@@ -369,20 +409,16 @@ def perform_ASPA_algorithm(route):
     else:
         raise Exception("Unknown relationship type", relation)
 
-    # print("Final ASPA validation result is: ", result)
-    if False:
-        print("Final ASPA validation result is: ", result)
-        print("Direction: ", relation)
-        print(route)
-        for asys in route.path:
-            print(asys.aspa)
-        print('-----')
-        print('')
-
     return result
 
 
 def perform_ASCONES_algorithm(route):
+    if route.length >= 2 and not route.has_cycle:
+        relation = route.final.get_relation(route.first_hop)
+        if relation == Relation.CUSTOMER or relation == Relation.PEER or relation == Relation.PROVIDER:
+            return verify_hop_summary(verification_summary(route.parent, True), relation, route.length, True)
+
+    path = route.path
     result = False
     # https://datatracker.ietf.org/doc/html/draft-ietf-grow-rpki-as-cones-02
     # We use the ASPA algorithm for validation of ASCones paths! It is much more mature and works very well.
@@ -399,26 +435,26 @@ def perform_ASCONES_algorithm(route):
         # Step1 - If the AS_PATH has an AS_SET, then the procedure halts with the outcome "Invalid".
         # Step2 - Collapse prepends in the AS_SEQUENCE(s) in the AS_PATH (i.e., keep only the unique AS numbers). Let the resulting ordered sequence be represented by {AS(N), AS(N-1), ..., AS(2), AS(1)}, where AS(1) is the first-added (i.e., origin) AS and AS(N) is the last-added AS and neighbor to the receiving/validating AS.
         # Step3 - If N = 1, then the procedure halts with the outcome "Valid". Else, continue.
-        if len(route.path) < 2:  # case never happens
+        if len(path) < 2:  # case never happens
             raise Exception('Route length below verifyable!')
         elif len(
-                route.path) == 2:  # the route object also contains the AS that currently validates as destination. We know this must be a customer and don´t need AS-Cones for it.
+                path) == 2:  # the route object also contains the AS that currently validates as destination. We know this must be a customer and don´t need AS-Cones for it.
             result = 'Valid'
         # Step4 - At this step, N ≥ 2. If there is an i such that 2 ≤ i ≤ N and hop(AS(i-1), AS(i)) = "Not Provider+", then the procedure halts with the outcome "Invalid". Else, continue.
         # Step5 - If there is an i such that 2 ≤ i ≤ N and hop(AS(i-1), AS(i)) = "No Attestation", then the procedure halts with the outcome "Unknown". Else, the procedure halts with the outcome "Valid".
         else:
             result = 'Valid'
-            for i, curr_asys in enumerate(list(reversed(route.path))):
+            for i, curr_asys in enumerate(list(reversed(path))):
                 if i == 0:  # skip first AS as it is the verifying AS
                     continue
 
-                elif i + 1 < len(route.path):
-                    next_asys = list(reversed(route.path))[i + 1]
-                    if curr_asys.ascones != None and not next_asys.as_id in curr_asys.ascones[1]:
+                elif i + 1 < len(path):
+                    next_asys = list(reversed(path))[i + 1]
+                    if curr_asys.ascones_customers is not None and next_asys.as_id not in curr_asys.ascones_customers:
                         # Invalid
                         result = 'Invalid'
                         break
-                    elif curr_asys.ascones == None:  # ASCONES not present
+                    elif curr_asys.ascones_customers is None:  # ASCONES not present
                         # No attestation
                         result = 'Unknown'
                         break
@@ -434,10 +470,10 @@ def perform_ASCONES_algorithm(route):
         # Step1 - If the AS_PATH has an AS_SET, then the procedure halts with the outcome "Invalid".
         # Step2 - Collapse prepends in the AS_SEQUENCE(s) in the AS_PATH (i.e., keep only the unique AS numbers). Let the resulting ordered sequence be represented by {AS(N), AS(N-1), ..., AS(2), AS(1)}, where AS(1) is the first-added (i.e., origin) AS and AS(N) is the last-added AS and neighbor to the receiving/validating AS.
         # Step3 - If 1 ≤ N ≤ 2, then the procedure halts with the outcome "Valid". Else, continue.
-        if len(route.path) < 2:  # case never happens
+        if len(path) < 2:  # case never happens
             raise Exception('Route length below verifyable!')
-        elif len(route.path) == 2 or len(
-                route.path) == 3:  # the route object also contains the AS that currently validates as destination
+        elif len(path) == 2 or len(
+                path) == 3:  # the route object also contains the AS that currently validates as destination
             # Length 2: This case covers an upstream sending a route directly.
             # Length 3: This case covers essentially three scenarios. The upstream of the verifying AS receives the route either from a customer, a peer, or it's upstream. All trivially valid cases.
             result = 'Valid'
@@ -451,33 +487,31 @@ def perform_ASCONES_algorithm(route):
             #        v_max, then the procedure halts with the outcome "Invalid".
             #        Else, continue.
             # Find u_min
-            u_min = len(route.path)  # Set u_min to N+1, but verifying AS is included which is why we skip +1
-            for i, curr_asys in enumerate(route.path):
+            u_min = len(path)  # Set u_min to N+1, but verifying AS is included which is why we skip +1
+            for i, curr_asys in enumerate(path):
                 if i + 2 < len(
-                        route.path):  # Verifying AS contained in route AND make sure we are not at the end already and produce an array out-of-bounds exception
-                    next_asys = route.path[i + 1]
+                        path):  # Verifying AS contained in route AND make sure we are not at the end already and produce an array out-of-bounds exception
+                    next_asys = path[i + 1]
                     # print('Curr AS: ', curr_asys.as_id)
                     # print('Next AS: ', next_asys.as_id)
                     # print('Next AS ASCONES', next_asys.ascones)
-                    if next_asys.ascones != None and not curr_asys.as_id in next_asys.ascones[
-                        1]:  # ASCONES present but curr_asys not contained in customer list
-                        u_min = route.path.index(next_asys) + 1  # since index returns position in array starting with 0
+                    if next_asys.ascones_customers is not None and curr_asys.as_id not in next_asys.ascones_customers:  # ASCONES present but curr_asys not contained in customer list
+                        u_min = path.index(next_asys) + 1  # since index returns position in array starting with 0
                         break
 
             # Find v_max
             v_max = 0
-            for i, curr_asys in enumerate(reversed(route.path)):
+            for i, curr_asys in enumerate(reversed(path)):
                 if i == 0:  # skip first AS as it is the verifying AS
                     continue
                 if i + 1 < len(
-                        route.path):  # Make sure we are not at the end already and produce an array out-of-bounds exception
-                    next_asys = list(reversed(route.path))[i + 1]
+                        path):  # Make sure we are not at the end already and produce an array out-of-bounds exception
+                    next_asys = list(reversed(path))[i + 1]
                     # print('Curr AS: ', curr_asys.as_id)
                     # print('Next AS: ', next_asys.as_id)
                     # print('Next AS ASCONES', next_asys.ascones)
-                    if next_asys.ascones != None and not curr_asys.as_id in next_asys.ascones[
-                        1]:  # ASCONES present but curr_asys not contained in customer list
-                        v_max = route.path.index(next_asys) + 1
+                    if next_asys.ascones_customers is not None and curr_asys.as_id not in next_asys.ascones_customers:  # ASCONES present but curr_asys not contained in customer list
+                        v_max = path.index(next_asys) + 1
                         break
 
             if u_min <= v_max:
@@ -491,16 +525,15 @@ def perform_ASCONES_algorithm(route):
 
                 # Find largest k
                 k = 1
-                for i, curr_asys in enumerate(route.path):
+                for i, curr_asys in enumerate(path):
                     if i + 2 < len(
-                            route.path):  # Verifying AS contained in route AND make sure we are not at the end already and produce an array out-of-bounds exception
-                        next_asys = route.path[i + 1]
+                            path):  # Verifying AS contained in route AND make sure we are not at the end already and produce an array out-of-bounds exception
+                        next_asys = path[i + 1]
                         # print('Curr AS: ', curr_asys.as_id)
                         # print('Next AS: ', next_asys.as_id)
                         # print('Next AS ASCONES', next_asys.ascones)
-                        if next_asys.ascones != None and curr_asys.as_id in next_asys.ascones[
-                            1]:  # ASCONES present but curr_asys not contained in customer list
-                            k = route.path.index(next_asys) + 1  # since index returns position in array starting with 0
+                        if next_asys.ascones_customers is not None and curr_asys.as_id in next_asys.ascones_customers:  # ASCONES present but curr_asys not contained in customer list
+                            k = path.index(next_asys) + 1  # since index returns position in array starting with 0
                         else:
                             break
 
@@ -509,19 +542,18 @@ def perform_ASCONES_algorithm(route):
                 #        ≥ L.  If such smallest L does not exist, then set L = N.
 
                 # Find smallest L
-                l = len(route.path) - 1
-                for i, curr_asys in enumerate(reversed(route.path)):
+                l = len(path) - 1
+                for i, curr_asys in enumerate(reversed(path)):
                     if i == 0:  # skip first AS as it is the verifying AS
                         continue
                     if i + 1 < len(
-                            route.path):  # Make sure we are not at the end already and produce an array out-of-bounds exception
-                        next_asys = list(reversed(route.path))[i + 1]
+                            path):  # Make sure we are not at the end already and produce an array out-of-bounds exception
+                        next_asys = list(reversed(path))[i + 1]
                         # print('Curr AS: ', curr_asys.as_id)
                         # print('Next AS: ', next_asys.as_id)
                         # print('Next AS ASCONES', next_asys.ascones)
-                        if next_asys.ascones != None and curr_asys.as_id in next_asys.ascones[
-                            1]:  # ASCONES present but curr_asys not contained in customer list
-                            l = route.path.index(next_asys) + 1
+                        if next_asys.ascones_customers is not None and curr_asys.as_id in next_asys.ascones_customers:  # ASCONES present but curr_asys not contained in customer list
+                            l = path.index(next_asys) + 1
                         else:
                             break
 
@@ -569,7 +601,7 @@ class ASCONESPolicy(DefaultPolicy):
 # RFC 9234
 def perform_only_to_customer(route) -> bool:
     do_set = route.local_data_part_do != ""
-    remote_as = route.path[len(route.path) - 2]
+    remote_as = route.first_hop
     relation_to_sender = route.final.get_relation(remote_as)
 
     # print("Route: ", route)
@@ -590,7 +622,7 @@ def perform_only_to_customer(route) -> bool:
     # route leak and be considered ineligible
     if do_set and relation_to_sender == Relation.PEER:
         for i in route.local_data_part_do.split():
-            if i != remote_as.as_id:
+            if i != str(remote_as.as_id):
                 return False
 
     # Ingress policy 3:
@@ -604,6 +636,8 @@ def perform_only_to_customer(route) -> bool:
 
 
 class OnlyToCustomerPolicy(DefaultPolicy):
+    otc_egress = True
+
     def __init__(self):
         self.name = 'OnlyToCustomerPolicy'
 
@@ -612,7 +646,7 @@ class OnlyToCustomerPolicy(DefaultPolicy):
 
     def accept_route(self, route: Route) -> bool:
         #print("Accepting Route? ", route, "DO: ", route.local_data_part_do)
-        super_result = DefaultPolicy().accept_route(route)
+        super_result = DefaultPolicy.accept_route(self, route)
         result = perform_only_to_customer(route)
         #if result and super_result:
         #print("Accepting Route!! ", route, "DO: ", route.local_data_part_do)
@@ -621,10 +655,11 @@ class OnlyToCustomerPolicy(DefaultPolicy):
     def forward_to(self, route: Route, relation: Relation, originating=False) -> bool:
         # print("Policy Forwarding:")
         do_set = route.local_data_part_do != ""
-        super_forward = DefaultPolicy().forward_to(route, relation)
+        # Called for OTCASPAPolicy as well, hence no super()
+        super_forward = DefaultPolicy.forward_to(self, route, relation)
         # print("Route: ", route, "; Super Forward: ", super_forward)
         if originating:
-            asn = route.path[-2]
+            asn = route.first_hop
             # print("ASN: ", asn.as_id)
         else:
             asn = route.final
@@ -639,7 +674,7 @@ class OnlyToCustomerPolicy(DefaultPolicy):
             if not do_set and (relation == Relation.CUSTOMER or relation == Relation.PEER or
                                relation == Relation.RS_CLIENT):
                 # print("Adding")
-                route.local_data_part_do += asn.as_id
+                route.local_data_part_do += str(asn.as_id)
                 # print("Local Data part is now: ", route.local_data_part_do)
                 #print("Returning True ; First")
                 return super_forward
@@ -657,6 +692,8 @@ class OnlyToCustomerPolicy(DefaultPolicy):
 
 
 class OTCASPAPolicy(DefaultPolicy):
+    otc_egress = True
+
     def __init__(self):
         self.name = 'OTCASPAPolicy'
 
@@ -672,5 +709,5 @@ class OTCASPAPolicy(DefaultPolicy):
             return result_otc
 
     def forward_to(self, route: Route, relation: Relation, originating=False) -> bool:
-        otc_forward = OnlyToCustomerPolicy().forward_to(route, relation, originating)
+        otc_forward = OnlyToCustomerPolicy.forward_to(self, route, relation, originating)
         return otc_forward
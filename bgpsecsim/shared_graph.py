@@ -0,0 +1,161 @@
+from collections import Counter
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.asys import AS_ID
+from bgpsecsim.csr_graph import CSRGraph
+
+# Tier labels as stored in the shared block
+TIER_ONE = 1
+TIER_TWO = 2
+TIER_THREE = 3
+
+# Boolean AS attributes that are part of a GraphState
+AS_FLAGS = [
+    'publishes_rpki', 'publishes_path_end', 'bgp_sec_enabled', 'aspa_enabled', 'ascones_enabled', 'rlm_enabled',
+]
+
+
+class SharedGraph(object):
+    """Read-only copy of an AS topology in a multiprocessing.shared_memory block.
+
+    The block holds the CSR topology and the tier labels. Pickling a SharedGraph only sends the name and layout of
+    the block, so experiment workers can attach to it instead of receiving a pickled copy of the graph. Workers still
+    build a private ASGraph from it (to_as_graph), because the experiments run on the object engine: policies,
+    hijacks and their rollback and the route cache all work on AS and Route objects. This saves sending the graph to
+    every worker, not the memory of the AS objects in each worker.
+    """
+    __slots__ = ['name', 'layout', 'memory']
+
+    name: str
+    # (array name, dtype, shape, byte offset) for every array in the block
+    layout: List[Tuple[str, str, Tuple[int, ...], int]]
+    memory: Optional[shared_memory.SharedMemory]
+
+    @classmethod
+    def export(cls, graph: ASGraph) -> 'SharedGraph':
+        csr = graph.csr()
+
+        tiers = np.zeros(len(csr), dtype=np.int8)
+        for tier, as_ids in ((TIER_ONE, graph.get_tierOne()), (TIER_TWO, graph.get_tierTwo()),
+                             (TIER_THREE, graph.get_tierThree())):
+            tiers[[csr.index[as_id] for as_id in as_ids]] = tier
+        return cls.from_csr(csr, tiers)
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph, tiers: np.ndarray) -> 'SharedGraph':
+        """Exports a CSR topology with the tier (TIER_ONE..TIER_THREE) of every AS, in the order of csr.as_ids."""
+        arrays = {
+            'as_ids': np.asarray(csr.as_ids),
+            'neighbor_offsets': csr.neighbor_offsets,
+            'neighbor_indices': csr.neighbor_indices,
+            'neighbor_relations': csr.neighbor_relations,
+            'tiers': tiers,
+        }
+
+        layout = []
+        size = 0
+        for name, array in arrays.items():
+            layout.append((name, array.dtype.str, array.shape, size))
+            # Keep every array 8-byte aligned
+            size += (array.nbytes + 7) // 8 * 8
+
+        shared = cls.__new__(cls)
+        shared.memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        shared.name = shared.memory.name
+        shared.layout = layout
+        for name, array in shared.arrays().items():
+            array[...] = arrays[name]
+        return shared
+
+    def __getstate__(self):
+        return self.name, self.layout
+
+    def __setstate__(self, state):
+        self.name, self.layout = state
+        self.memory = None
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        if self.memory is None:
+            self.memory = shared_memory.SharedMemory(name=self.name)
+        return {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.memory.buf, offset=offset)
+            for name, dtype, shape, offset in self.layout
+        }
+
+    def to_as_graph(self) -> ASGraph:
+        """Builds a private ASGraph with default policies for a worker. The CSR arrays stay in the block.
+
+        The AS objects, their neighbour dicts and policies are private to the calling process, about 14 MiB of RSS
+        for a forked worker on a 20k AS graph.
+        """
+        arrays = self.arrays()
+        for array in arrays.values():
+            array.flags.writeable = False
+
+        csr = CSRGraph(
+            arrays['as_ids'].tolist(),
+            arrays['neighbor_offsets'],
+            arrays['neighbor_indices'],
+            arrays['neighbor_relations'],
+        )
+        return ASGraph.from_csr(csr, arrays['tiers'])
+
+    def close(self) -> None:
+        if self.memory is not None:
+            self.memory.close()
+            self.memory = None
+
+    def unlink(self) -> None:
+        """Frees the block. Only the process that exported the graph should call this."""
+        if self.memory is None:
+            self.memory = shared_memory.SharedMemory(name=self.name)
+        self.memory.close()
+        self.memory.unlink()
+        self.memory = None
+
+
+class GraphState(object):
+    """Policies, flags and RPKI objects of all ASes in a graph, stored as the differences to a default AS."""
+    __slots__ = ['default_policy', 'policies', 'flags', 'aspa', 'ascones']
+
+    # Policy class used by most ASes
+    default_policy: type
+    policies: Dict[AS_ID, type]
+    # ASes that have the flag set, for every flag in AS_FLAGS
+    flags: Dict[str, List[AS_ID]]
+    aspa: Dict[AS_ID, tuple]
+    ascones: Dict[AS_ID, tuple]
+
+    @classmethod
+    def capture(cls, graph: ASGraph) -> 'GraphState':
+        state = cls.__new__(cls)
+        policy_types = Counter(type(asys.policy) for asys in graph.asyss.values())
+        state.default_policy = policy_types.most_common(1)[0][0]
+        state.policies = {as_id: type(asys.policy) for as_id, asys in graph.asyss.items()
+                          if type(asys.policy) is not state.default_policy}
+        state.flags = {flag: [as_id for as_id, asys in graph.asyss.items() if getattr(asys, flag)]
+                       for flag in AS_FLAGS}
+        state.aspa = {as_id: asys.aspa for as_id, asys in graph.asyss.items() if asys.aspa is not None}
+        state.ascones = {as_id: asys.ascones for as_id, asys in graph.asyss.items() if asys.ascones is not None}
+        return state
+
+    def apply(self, graph: ASGraph) -> None:
+        """Resets every AS in the graph to this state and clears all routing tables."""
+        # As in ASGraph, ASes with the same policy share one policy object
+        policies = {policy_type: policy_type() for policy_type in set(self.policies.values())}
+        default_policy = self.default_policy()
+        for as_id, asys in graph.asyss.items():
+            policy_type = self.policies.get(as_id)
+            asys.policy = default_policy if policy_type is None else policies[policy_type]
+            for flag in AS_FLAGS:
+                setattr(asys, flag, False)
+            asys.aspa = self.aspa.get(as_id)
+            asys.ascones = self.ascones.get(as_id)
+            asys.reset_routing_table()
+        for flag, as_ids in self.flags.items():
+            for as_id in as_ids:
+                setattr(graph.asyss[as_id], flag, True)
@@ -0,0 +1,20 @@
+from typing import Tuple
+
+import networkx as nx
+
+
+def routing_state(graph, dest):
+    """Path, flags and OTC attribute of the route to dest of every AS, for comparing routing tables."""
+    return {as_id: (repr(asys.get_route(dest)), asys.get_route(dest) and asys.get_route(dest).local_data_part_do)
+            for as_id, asys in graph.asyss.items()}
+
+
+def customer_and_peer_graphs() -> Tuple[nx.Graph, nx.Graph]:
+    """Two graphs with the same ASes and links, AS 3 is a customer of AS 2 in the first and a peer in the second."""
+    customer_graph = nx.Graph()
+    customer_graph.add_edge(1, 2, customer=2)
+    customer_graph.add_edge(2, 3, customer=3)
+    peer_graph = nx.Graph()
+    peer_graph.add_edge(1, 2, customer=2)
+    peer_graph.add_edge(2, 3, customer=None)
+    return customer_graph, peer_graph
@@ -1,10 +1,15 @@
+import bz2
+import gzip
 import random
 import unittest
 import sys
 import os
+import tempfile
 from typing import List
 
 import bgpsecsim.as_graph as as_graph
+import bgpsecsim.bench as bench
+import bgpsecsim.error as error
 import bgpsecsim.experiments as experiments
 from bgpsecsim.asys import AS, AS_ID, Relation, Route, RoutingPolicy
 from bgpsecsim.as_graph import ASGraph
@@ -187,8 +192,8 @@ def iterate_through_all():
 
 def specific_pair(victim_id: int, attacker_id: int, graph: ASGraph):
     print("Specific pair")
-    attacker_as = graph.get_asys(str(attacker_id))
-    victim_as = graph.get_asys(str(victim_id))
+    attacker_as = graph.get_asys(attacker_id)
+    victim_as = graph.get_asys(victim_id)
     tier_one = graph.get_tierOne()
     tier_two = graph.get_tierTwo()
     tier_three = graph.get_tierThree()
@@ -206,9 +211,9 @@ def specific_pair(victim_id: int, attacker_id: int, graph: ASGraph):
         for tier_two_as in range(0, len(tier_two) + 1):
             for tier_one_as in range(0, len(tier_one) + 1):
                 deployment = [tier_one_as, tier_two_as, tier_three_as]
-                current_result = deploy_policy(str(victim_id), str(attacker_id), deployment, graph)
+                current_result = deploy_policy(victim_id, attacker_id, deployment, graph)
                 print("Deployment: ", deployment, " ||  Result: ", current_result)
-                colourful_graph(str(victim_id), str(attacker_id), graph)
+                colourful_graph(victim_id, attacker_id, graph)
                 print("\n#--------------------------------------------------------#")
                 result_array.append(current_result)
 
@@ -245,7 +250,7 @@ class TestASGraph(unittest.TestCase):
         print("[i] Parsing AS Relations File: ", AS_REL_FILEPATH)
         nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
         graph = ASGraph(nx_graph)
-        print("[i] Demo AS: ", graph.get_asys("1"))
+        print("[i] Demo AS: ", graph.get_asys(1))
         print("[i] AS Graph created with ",len(graph.asyss)," ASes.")
         
 
@@ -256,18 +261,18 @@ class TestASGraph(unittest.TestCase):
         for elem in all_tiers:
             graph.get_asys(elem).policy = OnlyToCustomerPolicy()
 
-        graph.get_asys("14").policy = RouteLeakPolicy()
-        victim_as = graph.get_asys("16")
-        originated_route = victim_as.originate_route(graph.get_asys("18"))
+        graph.get_asys(14).policy = RouteLeakPolicy()
+        victim_as = graph.get_asys(16)
+        originated_route = victim_as.originate_route(graph.get_asys(18))
         # print("Originated Route: ", originated_route, "Local Data Part: ", originated_route.local_data_part_do)
 
     def test_originating_route(self):
         nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
         graph = ASGraph(nx_graph)
-        graph.get_asys("14").policy = RouteLeakPolicy()
-        victim_as = graph.get_asys("16")
+        graph.get_asys(14).policy = RouteLeakPolicy()
+        victim_as = graph.get_asys(16)
         victim_as.policy = OnlyToCustomerPolicy()
-        originated_route = victim_as.originate_route(graph.get_asys("18"))
+        originated_route = victim_as.originate_route(graph.get_asys(18))
         assert originated_route.local_data_part_do == "16"
 
     def test_forwarding_route(self):
@@ -277,22 +282,160 @@ class TestASGraph(unittest.TestCase):
         for elem in all_tiers:
             graph.get_asys(elem).policy = OnlyToCustomerPolicy()
 
-        graph.get_asys("14").policy = RouteLeakPolicy()
+        graph.get_asys(14).policy = RouteLeakPolicy()
 
-        originated_route = graph.get_asys("18").originate_route(graph.get_asys("16"))
+        originated_route = graph.get_asys(18).originate_route(graph.get_asys(16))
         assert originated_route.local_data_part_do == ""
 
-        forwarded_route_1 = graph.get_asys("16").forward_route(originated_route, graph.get_asys("8"))
+        forwarded_route_1 = graph.get_asys(16).forward_route(originated_route, graph.get_asys(8))
         # print("forwarded_route_1: ", forwarded_route_1, "DO: ", forwarded_route_1.local_data_part_do)
 
-        forwarded_route_2 = graph.get_asys("8").forward_route(forwarded_route_1, graph.get_asys("14"))
+        forwarded_route_2 = graph.get_asys(8).forward_route(forwarded_route_1, graph.get_asys(14))
         # print("forwarded_route_2: ", forwarded_route_2, "DO: ", forwarded_route_2.local_data_part_do)
         # print("#---------------------------------------------------------#")
-        forwarded_route_3 = graph.get_asys("14").forward_route(forwarded_route_2, graph.get_asys("7"))
+        forwarded_route_3 = graph.get_asys(14).forward_route(forwarded_route_2, graph.get_asys(7))
         # print("forwarded_route_3: ", forwarded_route_3, "DO: ", forwarded_route_3.local_data_part_do)
 
-        #print("Accepting?: ", graph.get_asys("7").policy.accept_route(forwarded_route_3))
-        assert False == graph.get_asys("7").policy.accept_route(forwarded_route_3)
+        #print("Accepting?: ", graph.get_asys(7).policy.accept_route(forwarded_route_3))
+        assert False == graph.get_asys(7).policy.accept_route(forwarded_route_3)
+
+    def test_bgpsec_preference(self):
+        nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
+        graph = ASGraph(nx_graph)
+        # Both routes are received from a provider of 6, the longer one is authenticated
+        short_route = Route(17, [graph.get_asys(x) for x in [17, 9, 5, 2, 6]],
+                            origin_invalid=False, path_end_invalid=False, authenticated=False)
+        long_route = Route(17, [graph.get_asys(x) for x in [17, 9, 5, 2, 3, 6]],
+                           origin_invalid=False, path_end_invalid=False, authenticated=True)
+
+        for policy, prefer_authenticated in [(DefaultPolicy(), False), (BGPsecHighSecPolicy(), True),
+                                             (BGPsecMedSecPolicy(), True), (BGPsecLowSecPolicy(), False)]:
+            # The keys cached on the routes by the previous policy must not be reused
+            self.assertEqual(policy.prefer_route(short_route, long_route), prefer_authenticated)
+            self.assertEqual(policy.prefer_route(long_route, short_route), not prefer_authenticated)
+        self.assertFalse(DefaultPolicy().prefer_route(short_route, short_route))
+
+    def test_read_compressed_as_rel_file(self):
+        with open(AS_REL_FILEPATH, 'rb') as f:
+            data = f.read()
+        expected = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
+        self.assertTrue(all(isinstance(as_id, int) for as_id in expected.nodes))
+
+        with tempfile.TemporaryDirectory() as directory:
+            for suffix, compress in [('.bz2', bz2.compress), ('.gz', gzip.compress)]:
+                filename = os.path.join(directory, 'as-rel.txt' + suffix)
+                with open(filename, 'wb') as f:
+                    f.write(compress(data))
+                graph = as_graph.parse_as_rel_file(filename)
+                self.assertEqual(list(graph.nodes), list(expected.nodes))
+                self.assertEqual(list(graph.edges(data='customer')), list(expected.edges(data='customer')))
+
+            filename = os.path.join(directory, 'bad-as-rel.txt')
+            with open(filename, 'wb') as f:
+                f.write(data + b'1|2\n')
+            with self.assertRaises(error.InvalidASRelFile):
+                as_graph.read_as_rel_file(filename)
+
+    def test_neighbors_by_relation(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        self.assertEqual([asys.index for asys in graph.asyss.values()], list(range(len(graph.asyss))))
+        for asys in graph.asyss.values():
+            for relation, neighbors in [(Relation.CUSTOMER, asys.customers), (Relation.PEER, asys.peers),
+                                        (Relation.PROVIDER, asys.providers)]:
+                self.assertEqual(neighbors, [n for n, rel in asys.neighbors.items() if rel == relation])
+
+        # Changing the relation of a link moves the neighbour to the other list
+        asys_2, asys_6 = graph.get_asys(2), graph.get_asys(6)
+        asys_2.add_peer(asys_6)
+        self.assertNotIn(asys_6, asys_2.customers)
+        self.assertIn(asys_6, asys_2.peers)
+        self.assertEqual(asys_2.get_relation(asys_6), Relation.PEER)
+
+    def test_customer_degree_ranking(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        by_degree = lambda asyss: sorted(asyss, key=lambda asys: -len(asys.get_customers()))
+        tier_one = [graph.get_asys(as_id) for as_id in graph.get_tierOne()]
+        tier_two = [graph.get_asys(as_id) for as_id in graph.get_tierTwo()]
+
+        self.assertEqual(graph.identify_top_isps(5), by_degree(graph.asyss.values())[:5])
+        self.assertEqual(graph.identify_top_isp_from_tier_one(2), by_degree(tier_one)[:2])
+        self.assertEqual(graph.identify_top_isp_from_tier_two(3), by_degree(tier_two)[:3])
+        self.assertEqual(graph.identify_top_isps_from_tierone_and_tiertwo(len(graph.asyss)),
+                         by_degree(tier_one + tier_two))
+        # Rankings are sorted once and sliced afterwards
+        self.assertIs(graph.customer_degree_ranking('all'), graph.customer_degree_ranking('all'))
+
+    def test_tiers_per_graph(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        tiers = (graph.get_tierOne(), graph.get_tierTwo(), graph.get_tierThree())
+        # Building another graph in the same process leaves the tiers of the first one alone
+        other = ASGraph(bench.synthetic_as_graph(50))
+        self.assertEqual((graph.get_tierOne(), graph.get_tierTwo(), graph.get_tierThree()), tiers)
+        self.assertNotEqual(other.get_tierThree(), graph.get_tierThree())
+
+        for tier, as_ids in enumerate(tiers, start=1):
+            for as_id in as_ids:
+                self.assertEqual(graph.get_tier(as_id), tier)
+        self.assertIsNone(graph.get_tier(666))
+
+    def test_create_aspa_objects(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        expected = {}
+        for asys in graph.asyss.values():
+            asys.create_new_aspa(graph)
+            expected[asys.as_id] = asys.aspa
+            asys.reset_rpki_objects()
+
+        graph.create_aspa_objects(graph.asyss.values())
+        self.assertEqual({as_id: asys.aspa for as_id, asys in graph.asyss.items()}, expected)
+        self.assertEqual(graph.get_asys(1).aspa, (1, ['AS0']))
+
+        for asys in graph.asyss.values():
+            asys.reset_rpki_objects()
+        experiments.create_ASPA_objects_randomly(graph, 50)
+        self.assertEqual(sum(asys.aspa is not None for asys in graph.asyss.values()), round(len(graph.asyss) / 2))
+
+    def test_attestation_sets(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        asys_7 = graph.get_asys(7)
+        self.assertIsNone(asys_7.aspa_providers)
+        self.assertIsNone(asys_7.ascones_customers)
+
+        asys_7.create_new_aspa(graph)
+        graph.get_asys(3).create_new_ascones()
+        self.assertEqual(asys_7.aspa_providers, frozenset([3, 4]))
+        self.assertEqual(graph.get_asys(3).ascones_customers, frozenset(graph.get_asys(3).get_customers()))
+
+        # Objects replaced or removed directly keep the sets in sync
+        asys_7.aspa = None
+        self.assertIsNone(asys_7.aspa_providers)
+        graph.clear_rpki_objects()
+        self.assertIsNone(graph.get_asys(3).ascones_customers)
+
+    def test_aspa_hop(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        asys_3, asys_4, asys_7 = graph.get_asys(3), graph.get_asys(4), graph.get_asys(7)
+        self.assertEqual(routing_policy.aspa_hop(asys_7, asys_3), routing_policy.NO_ATTESTATION)
+        asys_7.create_new_aspa(graph)
+        self.assertEqual(routing_policy.aspa_hop(asys_7, asys_3), routing_policy.PROVIDER_PLUS)
+        self.assertEqual(routing_policy.aspa_hop(asys_7, asys_4), routing_policy.PROVIDER_PLUS)
+        self.assertEqual(routing_policy.aspa_hop(asys_7, graph.get_asys(1)), routing_policy.NOT_PROVIDER_PLUS)
+
+    def test_verification_summary(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        graph.create_aspa_objects(graph.asyss.values())
+        route = Route(17, [graph.get_asys(x) for x in [17, 9, 5, 2, 6]],
+                      origin_invalid=False, path_end_invalid=False, authenticated=False)
+
+        summary = routing_policy.verification_summary(route.parent)
+        self.assertEqual(summary.hops, 3)
+        self.assertIs(routing_policy.verification_summary(route.parent), summary)
+        self.assertEqual(routing_policy.perform_ASPA_algorithm(route), 'Valid')
+
+        # Changing an ASPA object on the path invalidates the cached summaries
+        graph.get_asys(9).aspa = (9, [])
+        self.assertIsNot(routing_policy.verification_summary(route.parent), summary)
+        self.assertEqual(routing_policy.perform_ASPA_algorithm(route), 'Invalid')
 
     #def test_specific_pair(self):
     #    print("#---- Specific Test ----#.")
@@ -327,21 +470,21 @@ class TestASGraph(unittest.TestCase):
     def test_parse_as_rel_file(self):
         graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
         for i in range(1, 18):
-            assert str(i) in graph.nodes
-        assert graph.edges[('1', '4')]['customer'] == '4'
-        assert graph.edges[('2', '6')]['customer'] == '6'
-        assert graph.edges[('5', '6')]['customer'] is None
+            assert i in graph.nodes
+        assert graph.edges[(1, 4)]['customer'] == 4
+        assert graph.edges[(2, 6)]['customer'] == 6
+        assert graph.edges[(5, 6)]['customer'] is None
 
     def test_ASGraph_constructor(self):
         graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
         for i in range(1, 18):
-            assert str(i) in graph.asyss
-        assert graph.get_asys('1').get_relation(graph.get_asys('4')) == Relation.CUSTOMER
-        assert graph.get_asys('4').get_relation(graph.get_asys('1')) == Relation.PROVIDER
-        assert graph.get_asys('2').get_relation(graph.get_asys('6')) == Relation.CUSTOMER
-        assert graph.get_asys('6').get_relation(graph.get_asys('2')) == Relation.PROVIDER
-        assert graph.get_asys('5').get_relation(graph.get_asys('6')) == Relation.PEER
-        assert graph.get_asys('6').get_relation(graph.get_asys('5')) == Relation.PEER
+            assert i in graph.asyss
+        assert graph.get_asys(1).get_relation(graph.get_asys(4)) == Relation.CUSTOMER
+        assert graph.get_asys(4).get_relation(graph.get_asys(1)) == Relation.PROVIDER
+        assert graph.get_asys(2).get_relation(graph.get_asys(6)) == Relation.CUSTOMER
+        assert graph.get_asys(6).get_relation(graph.get_asys(2)) == Relation.PROVIDER
+        assert graph.get_asys(5).get_relation(graph.get_asys(6)) == Relation.PEER
+        assert graph.get_asys(6).get_relation(graph.get_asys(5)) == Relation.PEER
 
     def test_check_for_customer_provider_cycles(self):
         nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
@@ -349,55 +492,55 @@ class TestASGraph(unittest.TestCase):
         self.assertFalse(graph.any_customer_provider_cycles())
 
         # Create a customer-provider cycle
-        nx_graph.add_edge('1', '16', customer='1')
+        nx_graph.add_edge(1, 16, customer=1)
         graph = ASGraph(nx_graph)
         self.assertTrue(graph.any_customer_provider_cycles())
 
     def test_learn_routes(self):
         graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
-        asys_8 = graph.get_asys('8')
+        asys_8 = graph.get_asys(8)
         for asys in graph.asyss.values():
             graph.find_routes_to(asys_8)
 
         for asys in graph.asyss.values():
-            assert '8' in asys.routing_table
-            route = asys.routing_table['8']
+            assert 8 in asys.routing_table
+            route = asys.routing_table[8]
             assert route.final == asys
 
     def test_ascones_object_creation(self):
         graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
-        asys_8 = graph.get_asys('8')
-        asys_7 = graph.get_asys('7')
+        asys_8 = graph.get_asys(8)
+        asys_7 = graph.get_asys(7)
         asys_8.create_new_ascones()
         asys_7.create_new_ascones()
-        assert ('8', ['14', '15', '16']) == asys_8.get_ascones()
+        assert (8, [14, 15, 16]) == asys_8.get_ascones()
         assert asys_8.get_customers() == asys_8.get_ascones_customer()
-        assert ('7', ['13', '14']) == asys_7.get_ascones()
+        assert (7, [13, 14]) == asys_7.get_ascones()
         assert asys_7.get_customers() == asys_7.get_ascones_customer()
 
     def test_aspa_object_creation(self):
         graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
-        asys_8 = graph.get_asys('8')
-        asys_7 = graph.get_asys('7')
+        asys_8 = graph.get_asys(8)
+        asys_7 = graph.get_asys(7)
         asys_8.create_new_aspa(graph)
         asys_7.create_new_aspa(graph)
-        assert ('8', ['4']) == asys_8.get_aspa()
+        assert (8, [4]) == asys_8.get_aspa()
         assert asys_8.get_providers() == asys_8.get_aspa_providers()
-        assert ('7', ['3', '4']) == asys_7.get_aspa()
+        assert (7, [3, 4]) == asys_7.get_aspa()
         assert asys_7.get_providers() == asys_7.get_aspa_providers()
 
     def test_ascones_policy_assginment(self):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
         for as_id in graph.get_tierOne() + graph.get_tierTwo():
             graph.get_asys(as_id).policy = ASCONESPolicy()
-        assert graph.get_asys('8').policy.name == 'ASCONESPolicy'
-        assert graph.get_asys('17').policy.name == 'DefaultPolicy'
+        assert graph.get_asys(8).policy.name == 'ASCONESPolicy'
+        assert graph.get_asys(17).policy.name == 'DefaultPolicy'
 
     def test_aspa_policy_assginment(self):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
         for as_id in graph.asyss.keys():
             graph.get_asys(as_id).policy = ASPAPolicy()
-        assert graph.get_asys('8').policy.name == 'ASPAPolicy'
+        assert graph.get_asys(8).policy.name == 'ASPAPolicy'
 
     ############################
     # ASPA UPSTREAM TEST CASES #
@@ -407,8 +550,8 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Upstream Path Verification - Only Customers, only a single hop
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('9')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(9)
 
         path = [victim.as_id, verifying_as.as_id]
 
@@ -429,10 +572,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Only Customers
         # Slide15 Trajectory 1
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('1')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(1)
 
-        path = [victim.as_id, '9', '5', '2', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -451,10 +594,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - RouteLeak by AS6
         # Slide15 Trajectory 1
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('3')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(3)
 
-        path = [victim.as_id, '9', '5', '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, verifying_as.as_id]
         route = Route(
             victim.as_id,
             [graph.get_asys(x) for x in path],
@@ -471,10 +614,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Upstream Path Verification - RouteLeak by AS6, but AS2 has no ASPA
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('1')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(1)
 
-        path = [victim.as_id, '9', '5', '2', '6', '3', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, 3, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -485,7 +628,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('2').aspa = None
+        graph.get_asys(2).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -493,10 +636,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Upstream Path Verification - Only Customers, but AS9 has no ASPA
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('1')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(1)
 
-        path = [victim.as_id, '9', '5', '2', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -507,7 +650,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('9').aspa = None
+        graph.get_asys(9).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -516,10 +659,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Two customers, then lateral peer
         # Slide15 Trajectory 2
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('6')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(6)
 
-        path = [victim.as_id, '9', '5', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -537,10 +680,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Upstream Path Verification - Two customers, then lateral peer, but AS9 has no ASPA
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('6')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(6)
 
-        path = [victim.as_id, '9', '5', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -551,7 +694,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('9').aspa = None
+        graph.get_asys(9).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -560,10 +703,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Customer to Provider, to Peer, to Peer
         # Slide14 Trajectory 3
-        victim = graph.get_asys('9')
-        verifying_as = graph.get_asys('7')
+        victim = graph.get_asys(9)
+        verifying_as = graph.get_asys(7)
 
-        path = [victim.as_id, '5', '6', verifying_as.as_id]
+        path = [victim.as_id, 5, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -582,10 +725,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Customer to Provider, to Customer, to Peer
         # Slide14 Trajectory 2
-        victim = graph.get_asys('5')
-        verifying_as = graph.get_asys('7')
+        victim = graph.get_asys(5)
+        verifying_as = graph.get_asys(7)
 
-        path = [victim.as_id, '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 2, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -604,10 +747,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Customer to Provider, to Peer, to Provider
         # Slide14 Trajectory 4
-        victim = graph.get_asys('9')
-        verifying_as = graph.get_asys('3')
+        victim = graph.get_asys(9)
+        verifying_as = graph.get_asys(3)
 
-        path = [victim.as_id, '5', '6', verifying_as.as_id]
+        path = [victim.as_id, 5, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -629,8 +772,8 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Upstream sending route directly
-        victim = graph.get_asys('9')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(9)
+        verifying_as = graph.get_asys(17)
 
         path = [victim.as_id, verifying_as.as_id]
 
@@ -650,10 +793,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Customer of Upstream sending route
-        victim = graph.get_asys('9')
-        verifying_as = graph.get_asys('10')
+        victim = graph.get_asys(9)
+        verifying_as = graph.get_asys(10)
 
-        path = [victim.as_id, '5', verifying_as.as_id]
+        path = [victim.as_id, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -671,10 +814,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Peer of Upstream sending route
-        victim = graph.get_asys('6')
-        verifying_as = graph.get_asys('10')
+        victim = graph.get_asys(6)
+        verifying_as = graph.get_asys(10)
 
-        path = [victim.as_id, '5', verifying_as.as_id]
+        path = [victim.as_id, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -693,10 +836,10 @@ class TestASGraph(unittest.TestCase):
 
         #Downstream Path Verification - Upstream of Upstream sending route
         # Slide15 Trajectory 5
-        victim = graph.get_asys('2')
-        verifying_as = graph.get_asys('10')
+        victim = graph.get_asys(2)
+        verifying_as = graph.get_asys(10)
 
-        path = [victim.as_id, '5', verifying_as.as_id]
+        path = [victim.as_id, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -715,10 +858,10 @@ class TestASGraph(unittest.TestCase):
 
         #Downstream Path Verification - Peer of Upstream of Upstream sending route
         # Slide15 Trajectory 6
-        victim = graph.get_asys('6')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(6)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -737,10 +880,10 @@ class TestASGraph(unittest.TestCase):
 
         #Downstream Path Verification - Inverted V Shape
         # Slide15 Trajectory 3
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('12')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(12)
 
-        path = [victim.as_id, '9', '5', '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -758,10 +901,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape - Opposite direction
-        victim = graph.get_asys('12')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(12)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '6', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 6, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -780,10 +923,10 @@ class TestASGraph(unittest.TestCase):
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex
         # Slide15 Trajectory 4
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -801,10 +944,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex - Opposite direction
-        victim = graph.get_asys('14')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(14)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '7', '3', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 7, 3, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -822,10 +965,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape, but AS5 has no ASPA
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('12')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(12)
 
-        path = [victim.as_id, '9', '5', '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -836,7 +979,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('5').aspa = None
+        graph.get_asys(5).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Valid' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -844,10 +987,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape - Opposite direction, but AS5 has no ASPA
-        victim = graph.get_asys('12')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(12)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '6', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 6, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -858,7 +1001,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('5').aspa = None
+        graph.get_asys(5).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Valid' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -866,10 +1009,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex, but AS5 has no ASPA
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -880,7 +1023,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('5').aspa = None
+        graph.get_asys(5).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -888,10 +1031,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex - Opposite direction, but AS5 has no ASPA
-        victim = graph.get_asys('14')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(14)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '7', '3', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 7, 3, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -902,7 +1045,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('5').aspa = None
+        graph.get_asys(5).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -910,10 +1053,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape, but AS5 and AS6 have no ASPA
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('12')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(12)
 
-        path = [victim.as_id, '9', '5', '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -924,8 +1067,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('5').aspa = None
-        graph.get_asys('6').aspa = None
+        graph.get_asys(5).aspa = None
+        graph.get_asys(6).aspa = None
         verifying_as.policy = ASPAPolicy()
         #print(routing_policy.perform_ASPA_algorithm(route))
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
@@ -934,10 +1077,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape - Opposite direction, but AS5 and AS6 have no ASPA
-        victim = graph.get_asys('12')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(12)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '6', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 6, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -948,8 +1091,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('5').aspa = None
-        graph.get_asys('6').aspa = None
+        graph.get_asys(5).aspa = None
+        graph.get_asys(6).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -957,10 +1100,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex, but AS5 and AS6 have no ASPA
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -971,8 +1114,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('5').aspa = None
-        graph.get_asys('6').aspa = None
+        graph.get_asys(5).aspa = None
+        graph.get_asys(6).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -980,10 +1123,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex - Opposite direction, but AS5 and AS6 have no ASPA
-        victim = graph.get_asys('14')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(14)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '7', '3', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 7, 3, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -994,8 +1137,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('5').aspa = None
-        graph.get_asys('6').aspa = None
+        graph.get_asys(5).aspa = None
+        graph.get_asys(6).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -1003,10 +1146,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         # Downstream Path Verification - Route Leak by AS6 to Upstream
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '6', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1024,10 +1167,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         # Downstream Path Verification - Route Leak by AS6 to Lateral peer
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '6', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1045,10 +1188,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         # Downstream Path Verification - Route Leak by AS6 and again by AS7
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('18')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(18)
 
-        path = [victim.as_id, '9', '5', '2', '6', '3', '7', '4', '8', '16', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, 3, 7, 4, 8, 16, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1066,10 +1209,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         # Downstream Path Verification - Route Leak by AS6 and again by AS7, opposite direction
-        victim = graph.get_asys('18')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(18)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '16', '8', '4', '7', '3', '6', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 16, 8, 4, 7, 3, 6, 2, 5, 9, verifying_as.as_id]
         route = Route(
             victim.as_id,
             [graph.get_asys(x) for x in path],
@@ -1092,8 +1235,8 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Upstream Path Verification - Only Customers, only a single hop
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('9')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(9)
 
         path = [victim.as_id, verifying_as.as_id]
 
@@ -1114,10 +1257,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Only Customers
         # Slide15 Trajectory 1
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('1')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(1)
 
-        path = [victim.as_id, '9', '5', '2', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1136,10 +1279,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - RouteLeak by AS6
         # Slide15 Trajectory 1
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('3')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(3)
 
-        path = [victim.as_id, '9', '5', '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, verifying_as.as_id]
         route = Route(
             victim.as_id,
             [graph.get_asys(x) for x in path],
@@ -1156,10 +1299,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Upstream Path Verification - RouteLeak by AS6, but AS6 has no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('1')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(1)
 
-        path = [victim.as_id, '9', '5', '2', '6', '3', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, 3, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1170,7 +1313,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('6').ascones = None
+        graph.get_asys(6).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1178,10 +1321,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Upstream Path Verification - Only Customers, but AS9 has no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('1')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(1)
 
-        path = [victim.as_id, '9', '5', '2', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1192,7 +1335,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('9').ascones = None
+        graph.get_asys(9).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1201,10 +1344,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Two customers, then lateral peer
         # Slide15 Trajectory 2
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('6')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(6)
 
-        path = [victim.as_id, '9', '5', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1222,10 +1365,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Upstream Path Verification - Two customers, then lateral peer, but AS9 has no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('6')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(6)
 
-        path = [victim.as_id, '9', '5', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1236,7 +1379,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('9').ascones = None
+        graph.get_asys(9).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1245,10 +1388,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Customer to Provider, to Peer, to Peer
         # Slide14 Trajectory 3
-        victim = graph.get_asys('9')
-        verifying_as = graph.get_asys('7')
+        victim = graph.get_asys(9)
+        verifying_as = graph.get_asys(7)
 
-        path = [victim.as_id, '5', '6', verifying_as.as_id]
+        path = [victim.as_id, 5, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1267,10 +1410,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Customer to Provider, to Customer, to Peer
         # Slide14 Trajectory 2
-        victim = graph.get_asys('5')
-        verifying_as = graph.get_asys('7')
+        victim = graph.get_asys(5)
+        verifying_as = graph.get_asys(7)
 
-        path = [victim.as_id, '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 2, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1289,10 +1432,10 @@ class TestASGraph(unittest.TestCase):
 
         #Upstream Path Verification - Customer to Provider, to Peer, to Provider
         # Slide14 Trajectory 4
-        victim = graph.get_asys('9')
-        verifying_as = graph.get_asys('3')
+        victim = graph.get_asys(9)
+        verifying_as = graph.get_asys(3)
 
-        path = [victim.as_id, '5', '6', verifying_as.as_id]
+        path = [victim.as_id, 5, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1314,8 +1457,8 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Upstream sending route directly
-        victim = graph.get_asys('9')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(9)
+        verifying_as = graph.get_asys(17)
 
         path = [victim.as_id, verifying_as.as_id]
 
@@ -1335,10 +1478,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Customer of Upstream sending route
-        victim = graph.get_asys('9')
-        verifying_as = graph.get_asys('10')
+        victim = graph.get_asys(9)
+        verifying_as = graph.get_asys(10)
 
-        path = [victim.as_id, '5', verifying_as.as_id]
+        path = [victim.as_id, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1356,10 +1499,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Peer of Upstream sending route
-        victim = graph.get_asys('6')
-        verifying_as = graph.get_asys('10')
+        victim = graph.get_asys(6)
+        verifying_as = graph.get_asys(10)
 
-        path = [victim.as_id, '5', verifying_as.as_id]
+        path = [victim.as_id, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1378,10 +1521,10 @@ class TestASGraph(unittest.TestCase):
 
         #Downstream Path Verification - Upstream of Upstream sending route
         # Slide15 Trajectory 5
-        victim = graph.get_asys('2')
-        verifying_as = graph.get_asys('10')
+        victim = graph.get_asys(2)
+        verifying_as = graph.get_asys(10)
 
-        path = [victim.as_id, '5', verifying_as.as_id]
+        path = [victim.as_id, 5, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1400,10 +1543,10 @@ class TestASGraph(unittest.TestCase):
 
         #Downstream Path Verification - Peer of Upstream of Upstream sending route
         # Slide15 Trajectory 6
-        victim = graph.get_asys('6')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(6)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1422,10 +1565,10 @@ class TestASGraph(unittest.TestCase):
 
         #Downstream Path Verification - Inverted V Shape
         # Slide15 Trajectory 3
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('12')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(12)
 
-        path = [victim.as_id, '9', '5', '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1443,10 +1586,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape - Opposite direction
-        victim = graph.get_asys('12')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(12)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '6', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 6, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1465,10 +1608,10 @@ class TestASGraph(unittest.TestCase):
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex
         # Slide15 Trajectory 4
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1486,10 +1629,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex - Opposite direction
-        victim = graph.get_asys('14')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(14)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '7', '3', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 7, 3, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1507,10 +1650,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape, but AS5 has no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('12')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(12)
 
-        path = [victim.as_id, '9', '5', '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1521,7 +1664,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('5').ascones = None
+        graph.get_asys(5).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1529,10 +1672,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape - Opposite direction, but AS5 has no ASCONES
-        victim = graph.get_asys('12')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(12)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '6', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 6, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1543,7 +1686,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('5').ascones = None
+        graph.get_asys(5).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1551,10 +1694,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex, but AS5 has no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1565,7 +1708,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('5').ascones = None
+        graph.get_asys(5).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1573,10 +1716,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex - Opposite direction, but AS5 has no ASCONES
-        victim = graph.get_asys('14')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(14)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '7', '3', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 7, 3, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1587,7 +1730,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('5').ascones = None
+        graph.get_asys(5).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1595,10 +1738,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape, but AS5 and AS6 have no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('12')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(12)
 
-        path = [victim.as_id, '9', '5', '2', '6', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1609,8 +1752,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('5').ascones = None
-        graph.get_asys('6').ascones = None
+        graph.get_asys(5).ascones = None
+        graph.get_asys(6).ascones = None
         verifying_as.policy = ASCONESPolicy()
         #print(routing_policy.perform_ASCONES_algorithm(route))
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
@@ -1619,10 +1762,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape - Opposite direction, but AS5 and AS6 have no ASCONES
-        victim = graph.get_asys('12')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(12)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '6', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 6, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1633,8 +1776,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('5').ascones = None
-        graph.get_asys('6').ascones = None
+        graph.get_asys(5).ascones = None
+        graph.get_asys(6).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1642,10 +1785,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex, but AS5 and AS6 have no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1656,8 +1799,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('5').ascones = None
-        graph.get_asys('6').ascones = None
+        graph.get_asys(5).ascones = None
+        graph.get_asys(6).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1665,10 +1808,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex - Opposite direction, but AS5 and AS6 have no ASCONES
-        victim = graph.get_asys('14')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(14)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '7', '3', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 7, 3, 2, 5, 9, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1679,8 +1822,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('5').ascones = None
-        graph.get_asys('6').ascones = None
+        graph.get_asys(5).ascones = None
+        graph.get_asys(6).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1688,10 +1831,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         # Downstream Path Verification - Route Leak by AS6 to Upstream
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '6', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1709,10 +1852,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         # Downstream Path Verification - Route Leak by AS6 to Lateral peer
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '6', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1730,10 +1873,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         # Downstream Path Verification - Route Leak by AS6 and again by AS7
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('18')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(18)
 
-        path = [victim.as_id, '9', '5', '2', '6', '3', '7', '4', '8', '16', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 6, 3, 7, 4, 8, 16, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1751,10 +1894,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         # Downstream Path Verification - Route Leak by AS6 and again by AS7, opposite direction
-        victim = graph.get_asys('18')
-        verifying_as = graph.get_asys('17')
+        victim = graph.get_asys(18)
+        verifying_as = graph.get_asys(17)
 
-        path = [victim.as_id, '16', '8', '4', '7', '3', '6', '2', '5', '9', verifying_as.as_id]
+        path = [victim.as_id, 16, 8, 4, 7, 3, 6, 2, 5, 9, verifying_as.as_id]
         route = Route(
             victim.as_id,
             [graph.get_asys(x) for x in path],
@@ -1771,10 +1914,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex, but AS2 at the top has no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1785,7 +1928,7 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('2').ascones = None
+        graph.get_asys(2).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1793,10 +1936,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex, but AS2 and AS3 at the top have no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1807,8 +1950,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('2').ascones = None
-        graph.get_asys('3').ascones = None
+        graph.get_asys(2).ascones = None
+        graph.get_asys(3).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 
@@ -1818,10 +1961,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex, but AS2 and AS3 at the top have no ASPA
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1832,8 +1975,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASPA_objects_randomly(graph, 100)
-        graph.get_asys('3').aspa = None
-        graph.get_asys('5').aspa = None
+        graph.get_asys(3).aspa = None
+        graph.get_asys(5).aspa = None
         verifying_as.policy = ASPAPolicy()
         assert 'Unknown' == routing_policy.perform_ASPA_algorithm(route)
 
@@ -1841,10 +1984,10 @@ class TestASGraph(unittest.TestCase):
         graph = ASGraph(as_graph.parse_as_rel_file_CAIDA(AS_REL_FILEPATH))
 
         #Downstream Path Verification - Inverted V Shape with p2p at apex, but AS2 and AS3 at the top have no ASCONES
-        victim = graph.get_asys('17')
-        verifying_as = graph.get_asys('14')
+        victim = graph.get_asys(17)
+        verifying_as = graph.get_asys(14)
 
-        path = [victim.as_id, '9', '5', '2', '3', '7', verifying_as.as_id]
+        path = [victim.as_id, 9, 5, 2, 3, 7, verifying_as.as_id]
 
         route = Route(
             victim.as_id,
@@ -1855,8 +1998,8 @@ class TestASGraph(unittest.TestCase):
         )
 
         experiments.create_ASCONES_objects_randomly(graph, 100)
-        graph.get_asys('2').ascones = None
-        #graph.get_asys('3').ascones = None
+        graph.get_asys(2).ascones = None
+        #graph.get_asys(3).ascones = None
         verifying_as.policy = ASCONESPolicy()
         assert 'Unknown' == routing_policy.perform_ASCONES_algorithm(route)
 '''
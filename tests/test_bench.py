@@ -0,0 +1,30 @@
+import unittest
+import os
+
+import networkx as nx
+
+import bgpsecsim.bench as bench
+from bgpsecsim.as_graph import ASGraph
+
+AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel-extended.txt')
+
+
+class TestBench(unittest.TestCase):
+    def test_synthetic_graph(self):
+        nx_graph = bench.synthetic_as_graph(500, seed=1)
+        self.assertEqual(nx_graph.number_of_nodes(), 500)
+        self.assertEqual(bench.synthetic_as_graph(500, seed=1).edges, nx_graph.edges)
+
+        graph = ASGraph(nx_graph)
+        self.assertFalse(graph.any_customer_provider_cycles())
+        self.assertTrue(nx.is_connected(nx_graph))
+
+    def test_run_benchmarks(self):
+        report = bench.run_benchmarks([AS_REL_FILEPATH], [200], trials=2)
+        self.assertEqual([graph['name'] for graph in report['graphs']], ['as-rel-extended.txt', 'synthetic-200'])
+        for graph in report['graphs']:
+            self.assertEqual(list(graph['phases'].keys()), bench.PHASES)
+            for result in graph['phases'].values():
+                self.assertEqual(result['trials'], 2)
+                self.assertGreater(result['routes'], 0)
+                self.assertIsNotNone(result['allocated_peak_bytes'])
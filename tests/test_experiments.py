@@ -0,0 +1,160 @@
+import unittest
+import os
+
+import networkx as nx
+
+import bgpsecsim.as_graph as as_graph
+import bgpsecsim.experiments as experiments
+import bgpsecsim.graph_cache as graph_cache
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.experiments import leaked_route, route_leak_counts, route_leaker
+from bgpsecsim.routing_policy import RPKIPolicy, PathEndValidationPolicy, RouteLeakPolicy
+from tests.helpers import customer_and_peer_graphs, routing_state
+
+AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel-extended.txt')
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_reuse_across_deployments(self):
+        nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
+        trials = [(1, 16), (9, 14), (17, 18), (13, 5), (2, 11)]
+
+        with experiments.WorkerPool(ASGraph(nx_graph), processes=2, chunk_size=2) as pool:
+            for deployment in [0, 3, 8]:
+                graph = ASGraph(nx_graph, policy=RPKIPolicy())
+                for asys in graph.identify_top_isps(deployment):
+                    asys.policy = PathEndValidationPolicy()
+                self.assertTrue(pool.serves(graph))
+
+                expected = []
+                for victim_id, attacker_id in trials:
+                    graph.clear_routing_tables()
+                    expected.append(experiments.run_trial(graph, victim_id, attacker_id, 1))
+
+                self.assertEqual(experiments.figure2a_experiment(graph, trials, n_hops=1), expected)
+
+    def test_selective_deployment(self):
+        nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
+        trials = [(1, 16), (9, 14), (17, 18), (13, 5), (2, 11), (16, 6), (5, 6)]
+
+        with experiments.WorkerPool(ASGraph(nx_graph), processes=2, chunk_size=2):
+            # The deployment has to reach the graphs of the workers: without ASPA some routes are leaked, with
+            # ASPA policies and objects at every AS none are
+            self.assertTrue(any(experiments.figure12_selective_aspa_deployment(nx_graph, 0, 0, trials)))
+            self.assertEqual(experiments.figure12_selective_aspa_deployment(nx_graph, 100, 100, trials),
+                             [0] * len(trials))
+
+
+    def test_from_csr(self):
+        edge_list = graph_cache.EdgeList.from_as_rel_file(AS_REL_FILEPATH)
+        nx_graph = edge_list.to_nx_graph()
+        trials = [(1, 16), (9, 14), (17, 18), (13, 5)]
+        graph = ASGraph(nx_graph, policy=RPKIPolicy())
+        expected = []
+        for victim_id, attacker_id in trials:
+            graph.clear_routing_tables()
+            expected.append(experiments.run_trial(graph, victim_id, attacker_id, 1))
+
+        csr, tiers = edge_list.to_csr()
+        with experiments.WorkerPool.from_csr(csr, tiers, processes=2, chunk_size=2) as pool:
+            self.assertTrue(pool.serves(graph))
+            self.assertEqual(experiments.figure2a_experiment(graph, trials, n_hops=1), expected)
+
+    def test_serves(self):
+        customer_graph, peer_graph = customer_and_peer_graphs()
+
+        with experiments.WorkerPool(ASGraph(customer_graph), processes=1) as pool:
+            self.assertTrue(pool.serves(ASGraph(customer_graph)))
+            self.assertFalse(pool.serves(ASGraph(peer_graph)))
+
+            graph = ASGraph(customer_graph)
+            with self.assertRaises(TypeError):
+                pool.run(graph, [(1, 3)], experiments.FigureRouteLeakExperiment, [graph.get_asys(2)], [], 'ASPA')
+
+
+    def test_chunk_size(self):
+        self.assertEqual(experiments.average_seconds_per_trial(None, 2.0, 4), 0.5)
+        self.assertAlmostEqual(experiments.average_seconds_per_trial(0.5, 1.0, 1), 0.6)
+
+        with experiments.WorkerPool(ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH)), processes=4) as pool:
+            # One trial until a time per trial has been measured
+            self.assertEqual(pool.next_chunk_size(None, 1000), 1)
+            # Chunks of CHUNK_SECONDS, at least one trial
+            self.assertEqual(pool.next_chunk_size(experiments.CHUNK_SECONDS / 50, 1000), 50)
+            self.assertEqual(pool.next_chunk_size(10 * experiments.CHUNK_SECONDS, 1000), 1)
+            # Towards the end the remaining trials are split evenly over the workers
+            self.assertEqual(pool.next_chunk_size(experiments.CHUNK_SECONDS / 50, 100), 25)
+            self.assertEqual(pool.next_chunk_size(experiments.CHUNK_SECONDS / 50, 3), 1)
+
+        with experiments.WorkerPool(ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH)), processes=1,
+                                    chunk_size=10) as pool:
+            self.assertEqual(pool.next_chunk_size(None, 1000), 10)
+            self.assertEqual(pool.next_chunk_size(1.0, 4), 4)
+
+
+class TestIncrementalHijack(unittest.TestCase):
+    def test_undo(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH), policy=RPKIPolicy())
+        victim = graph.get_asys(16)
+        graph.find_routes_to(victim)
+        baseline = routing_state(graph, victim.as_id)
+
+        delta = graph.hijack_n_hops(victim, graph.get_asys(9), 1)
+        self.assertTrue(delta.changed)
+        self.assertTrue(set(delta.changed) <= delta.visited)
+        self.assertLess(len(delta.visited), len(graph.asyss))
+        for as_id, route in routing_state(graph, victim.as_id).items():
+            self.assertEqual(route != baseline[as_id], graph.get_asys(as_id) in delta.changed)
+
+        delta.undo()
+        self.assertEqual(routing_state(graph, victim.as_id), baseline)
+
+    def test_same_victim_trials(self):
+        nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
+        graph = ASGraph(nx_graph, policy=RPKIPolicy())
+        experiment = experiments.Figure2aExperiment(graph, 1)
+        trials = [(16, 9), (16, 13), (16, 1), (17, 18), (17, 5)]
+
+        for victim_id, attacker_id in trials:
+            expected_graph = ASGraph(nx_graph, policy=RPKIPolicy())
+            expected = experiments.run_trial(expected_graph, victim_id, attacker_id, 1)
+            bad, total = experiment.run_trial((victim_id, attacker_id))
+            self.assertEqual(experiments.Figure2aExperiment.to_result(bad, total), expected)
+
+
+class TestRouteLeaker(unittest.TestCase):
+    def test_route_leaker(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        graph.get_asys(6).policy = RouteLeakPolicy()
+        for victim in graph.asyss.values():
+            graph.clear_routing_tables()
+            graph.find_routes_to(victim)
+            for asys in graph.asyss.values():
+                route = asys.get_route(victim.as_id)
+                if route is not None:
+                    self.assertIs(route_leaker(route), leaked_route(route))
+            _, n_total = route_leak_counts(graph, graph.get_asys(6), victim)
+            self.assertEqual(n_total, sum(1 for asys in graph.asyss.values() if asys.get_route(victim.as_id)))
+
+    def test_route_leaker_cycle(self):
+        # AS 2 has providers 1 and 3 and customer 4
+        nx_graph = nx.Graph()
+        nx_graph.add_edge(1, 2, customer=2)
+        nx_graph.add_edge(3, 2, customer=2)
+        nx_graph.add_edge(2, 4, customer=4)
+        graph = ASGraph(nx_graph)
+        as1, as2, as3, as4 = (graph.get_asys(as_id) for as_id in (1, 2, 3, 4))
+
+        route = as1.originate_route(as2)
+        self.assertIsNone(route.leaker)
+        route = as2.forward_route(route, as3)
+        self.assertIs(route.leaker, as2)
+        # Back at AS 2 the marked AS holds the route itself, and does not count as its leaker
+        route = as3.forward_route(route, as2)
+        self.assertIs(route.leaker, as2)
+        self.assertIs(route_leaker(route), False)
+        self.assertIs(leaked_route(route), False)
+        route = as2.forward_route(route, as4)
+        self.assertIs(route_leaker(route), as2)
+        self.assertIs(leaked_route(route), as2)
+
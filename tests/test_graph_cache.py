@@ -0,0 +1,78 @@
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+
+import networkx as nx
+
+import bgpsecsim.as_graph as as_graph
+import bgpsecsim.graph_cache as graph_cache
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.csr_graph import CSRGraph
+
+AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel-extended.txt')
+
+
+class TestGraphCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'as-rel.txt')
+        shutil.copy(AS_REL_FILEPATH, self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_same_graph(self):
+        nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
+        expected = ASGraph(nx_graph)
+        expected_tiers = (expected.get_tierOne(), expected.get_tierTwo(), expected.get_tierThree())
+        expected_csr = CSRGraph.from_as_graph(expected)
+
+        edge_list = graph_cache.load_as_rel_file(self.filename)
+        self.assertEqual(list(edge_list.to_nx_graph().edges(data='customer')), list(nx_graph.edges(data='customer')))
+
+        graph = edge_list.to_as_graph()
+        csr = CSRGraph.from_as_graph(graph)
+        self.assertEqual(csr.as_ids, expected_csr.as_ids)
+        self.assertEqual(csr.neighbor_indices.tolist(), expected_csr.neighbor_indices.tolist())
+        self.assertEqual(csr.neighbor_relations.tolist(), expected_csr.neighbor_relations.tolist())
+        self.assertEqual((graph.get_tierOne(), graph.get_tierTwo(), graph.get_tierThree()), expected_tiers)
+        self.assertTrue(csr.is_connected())
+
+    def test_cache_file(self):
+        prefix = graph_cache.cache_prefix(self.filename)
+        graph_cache.load_as_rel_file(self.filename)
+        self.assertTrue(os.path.exists(prefix + '.edges.npy'))
+
+        # The cached arrays are memory-mapped instead of parsing the file again
+        edge_list = graph_cache.load_as_rel_file(self.filename)
+        self.assertIsNotNone(getattr(edge_list.edges, 'filename', None))
+
+        # A changed file gets a new cache, which replaces the old one
+        with open(self.filename, 'a') as f:
+            f.write('18|19|-1\n')
+        self.assertEqual(len(graph_cache.load_as_rel_file(self.filename).asns), len(edge_list.asns) + 1)
+        self.assertFalse(os.path.exists(prefix + '.edges.npy'))
+        self.assertTrue(os.path.exists(graph_cache.cache_prefix(self.filename) + '.edges.npy'))
+
+    def test_pickle(self):
+        # Edges point from customers to providers, peers have edges in both directions
+        pickle_graph = nx.DiGraph()
+        pickle_graph.add_edges_from([(2, 1), (3, 1), (4, 2), (2, 3), (3, 2), (5, 2), (5, 3), (4, 5), (5, 4)])
+        filename = os.path.join(self.directory, 'graph.pickle')
+        with open(filename, 'wb') as f:
+            pickle.dump(pickle_graph, f)
+
+        nx_graph = as_graph.parse_as_rel_file(filename)
+        customers = {frozenset(edge): customer for *edge, customer in nx_graph.edges(data='customer')}
+        self.assertEqual(customers, {
+            frozenset((1, 2)): 2, frozenset((1, 3)): 3, frozenset((2, 3)): None, frozenset((2, 4)): 4,
+            frozenset((2, 5)): 5, frozenset((3, 5)): 5, frozenset((4, 5)): None,
+        })
+
+        edge_list = graph_cache.load_as_rel_file(filename)
+        expected = graph_cache.EdgeList.from_nx_graph(nx_graph)
+        self.assertEqual(edge_list.asns.tolist(), expected.asns.tolist())
+        self.assertEqual(edge_list.edges.tolist(), expected.edges.tolist())
+        self.assertTrue(os.path.exists(graph_cache.cache_prefix(filename) + '.edges.npy'))
@@ -22,51 +22,51 @@ AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as_aspa_o
 def test_relationships():
     nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
     graph = ASGraph(nx_graph)
-    as1 = graph.get_asys("1")
-    as2 = graph.get_asys("2")
-    as3 = graph.get_asys("3")
-    as4 = graph.get_asys("4")
-    as5 = graph.get_asys("5")
-    as666 = graph.get_asys("666")
+    as1 = graph.get_asys(1)
+    as2 = graph.get_asys(2)
+    as3 = graph.get_asys(3)
+    as4 = graph.get_asys(4)
+    as5 = graph.get_asys(5)
+    as666 = graph.get_asys(666)
 
     # Test relationships for AS 1
-    assert as1.get_providers()[0] == "2"
+    assert as1.get_providers()[0] == 2
     assert as1.neighbor_counts_by_relation()[Relation.PROVIDER] == 1
     assert as1.neighbor_counts_by_relation()[Relation.PEER] == 0
     assert as1.neighbor_counts_by_relation()[Relation.CUSTOMER] == 0
 
     # Test relationship for AS2
-    assert as2.get_providers()[0] == "4"
-    assert as2.get_customers()[0] == "1"
+    assert as2.get_providers()[0] == 4
+    assert as2.get_customers()[0] == 1
     assert as2.neighbor_counts_by_relation()[Relation.PROVIDER] == 1
     assert as2.neighbor_counts_by_relation()[Relation.PEER] == 0
     assert as2.neighbor_counts_by_relation()[Relation.CUSTOMER] == 1
 
     # Test relationship for AS3
-    assert as3.get_providers()[0] == "4"
-    assert as3.get_customers()[0] == "666"
-    assert as3.get_customers()[1] == "5"
+    assert as3.get_providers()[0] == 4
+    assert as3.get_customers()[0] == 666
+    assert as3.get_customers()[1] == 5
     assert as3.neighbor_counts_by_relation()[Relation.PROVIDER] == 1
     assert as3.neighbor_counts_by_relation()[Relation.PEER] == 0
     assert as3.neighbor_counts_by_relation()[Relation.CUSTOMER] == 2
 
     # Test relationship for AS4
-    assert as4.get_customers()[0] == "2"
-    assert as4.get_customers()[1] == "3"
-    assert as4.get_customers()[2] == "666"
+    assert as4.get_customers()[0] == 2
+    assert as4.get_customers()[1] == 3
+    assert as4.get_customers()[2] == 666
     assert as4.neighbor_counts_by_relation()[Relation.PROVIDER] == 0
     assert as4.neighbor_counts_by_relation()[Relation.PEER] == 0
     assert as4.neighbor_counts_by_relation()[Relation.CUSTOMER] == 3
 
     # Test relationship for AS5
-    assert as5.get_providers()[0] == "3"
+    assert as5.get_providers()[0] == 3
     assert as5.neighbor_counts_by_relation()[Relation.PROVIDER] == 1
     assert as5.neighbor_counts_by_relation()[Relation.PEER] == 0
     assert as5.neighbor_counts_by_relation()[Relation.CUSTOMER] == 0
 
     # Test relationship for AS666
-    assert as666.get_providers()[0] == "4"
-    assert as666.get_providers()[1] == "3"
+    assert as666.get_providers()[0] == 4
+    assert as666.get_providers()[1] == 3
     assert as666.neighbor_counts_by_relation()[Relation.PROVIDER] == 2
     assert as666.neighbor_counts_by_relation()[Relation.PEER] == 0
     assert as666.neighbor_counts_by_relation()[Relation.CUSTOMER] == 0
@@ -114,12 +114,12 @@ def leaked_route(route: ['Route']) -> AS:
 def prepare_policies():
     nx_graph = as_graph.parse_as_rel_file(AS_REL_FILEPATH)
     graph = ASGraph(nx_graph)
-    as1 = graph.get_asys("1")
-    as2 = graph.get_asys("2")
-    as3 = graph.get_asys("3")
-    as4 = graph.get_asys("4")
-    as5 = graph.get_asys("5")
-    as666 = graph.get_asys("666")
+    as1 = graph.get_asys(1)
+    as2 = graph.get_asys(2)
+    as3 = graph.get_asys(3)
+    as4 = graph.get_asys(4)
+    as5 = graph.get_asys(5)
+    as666 = graph.get_asys(666)
 
     all_as = graph.get_tierOne() + graph.get_tierTwo() + graph.get_tierThree()
     for elem in all_as:
@@ -127,7 +127,7 @@ def prepare_policies():
     as666.policy = RouteLeakPolicy()
 
     route_from_4 = Route(
-        "4",
+        4,
         [as1, as2],
         origin_invalid=False,
         path_end_invalid=False,
@@ -136,7 +136,7 @@ def prepare_policies():
     )
 
     route_from_666 = Route(
-        "666",
+        666,
         [as1, as2],
         origin_invalid=False,
         path_end_invalid=False,
@@ -145,7 +145,7 @@ def prepare_policies():
     )
 
     route_from_666_with_otc = Route(
-        "666",
+        666,
         [as1, as2],
         origin_invalid=False,
         path_end_invalid=False,
@@ -5,7 +5,7 @@ import bgpsecsim.as_graph as as_graph
 from bgpsecsim.asys import Relation, Route
 from bgpsecsim.as_graph import ASGraph
 from bgpsecsim.routing_policy import (
-    OnlyToCustomerPolicy
+    DefaultPolicy, OnlyToCustomerPolicy, OTCASPAPolicy
 )
 
 AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel-extended.txt')
@@ -27,8 +27,8 @@ AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel-ex
 class TestRouteLeakGraph(unittest.TestCase):
     def test_route_leak_provider_case(self):
         graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
-        provider = graph.get_asys('2')
-        local_as = graph.get_asys('6')
+        provider = graph.get_asys(2)
+        local_as = graph.get_asys(6)
         local_as.policy = OnlyToCustomerPolicy()
 
         path = [provider.as_id, local_as.as_id]
@@ -49,8 +49,8 @@ class TestRouteLeakGraph(unittest.TestCase):
 
     def test_route_customer_case(self):
         graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
-        customer = graph.get_asys('11')
-        local_as = graph.get_asys('6')
+        customer = graph.get_asys(11)
+        local_as = graph.get_asys(6)
         local_as.policy = OnlyToCustomerPolicy()
 
         path = [customer.as_id, local_as.as_id]
@@ -72,9 +72,9 @@ class TestRouteLeakGraph(unittest.TestCase):
     # Test case to check peer validation for one and two peers
     def test_route_peer_case(self):
         graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
-        peer_one = graph.get_asys('5')
-        peer_two = graph.get_asys('6')
-        local_as = graph.get_asys('7')
+        peer_one = graph.get_asys(5)
+        peer_two = graph.get_asys(6)
+        local_as = graph.get_asys(7)
         local_as.policy = OnlyToCustomerPolicy()
 
         path_one = [peer_one.as_id, peer_two.as_id, local_as.as_id]
@@ -101,6 +101,27 @@ class TestRouteLeakGraph(unittest.TestCase):
         new_route.local_data_part_do = ""
         assert local_as.policy.accept_route(new_route)
 
+    def test_egress_otc(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        local_as = graph.get_asys(6)
+        customer = graph.get_asys(11)
+        peer = graph.get_asys(7)
+
+        # Routes originated or forwarded to a customer or peer get the OTC attribute of the sending AS
+        for policy in [OnlyToCustomerPolicy(), OTCASPAPolicy()]:
+            local_as.policy = policy
+            self.assertTrue(policy.otc_egress)
+            self.assertEqual(local_as.originate_route(customer).local_data_part_do, "6")
+            route = local_as.originate_route(graph.get_asys(2))
+            self.assertEqual(route.local_data_part_do, "")
+            from_customer = Route(11, [customer, local_as], origin_invalid=False, path_end_invalid=False,
+                                  authenticated=False, local_data_part_do="")
+            self.assertEqual(local_as.forward_route(from_customer, peer).local_data_part_do, "6")
+
+        local_as.policy = DefaultPolicy()
+        self.assertFalse(local_as.policy.otc_egress)
+        self.assertEqual(local_as.originate_route(customer).local_data_part_do, "")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import random
+
+import bgpsecsim.as_graph as as_graph
+import bgpsecsim.propagation as propagation
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.routing_policy import (
+    DefaultPolicy, RPKIPolicy, RouteLeakPolicy, ASPAPolicy, ASCONESPolicy, OnlyToCustomerPolicy, OTCASPAPolicy,
+    BGPsecHighSecPolicy,
+)
+
+AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel-extended.txt')
+AS_DO_OTC_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as_do_otc.txt')
+
+
+class TestPropagation(unittest.TestCase):
+    def assert_same_routes(self, graph):
+        for target in graph.asyss.values():
+            for asys in graph.asyss.values():
+                asys.reset_routing_table()
+            graph.find_routes_to(target)
+            state = propagation.find_routes_to(graph, target)
+
+            for asys in graph.asyss.values():
+                route = asys.get_route(target.as_id)
+                expected = None if route is None else [hop.as_id for hop in route.path]
+                if asys is target:
+                    expected = [target.as_id]
+                self.assertEqual(state.path(asys.as_id), expected)
+
+                i = state.csr.index[asys.as_id]
+                if expected is None:
+                    self.assertEqual(state.next_hop[i], -1)
+                    self.assertEqual(state.length[i], -1)
+                else:
+                    self.assertEqual(state.csr.as_ids[state.next_hop[i]], expected[-2] if len(expected) > 1
+                                     else target.as_id)
+                    self.assertEqual(state.length[i], len(expected))
+
+    def test_default_policy(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        self.assert_same_routes(graph)
+
+    def test_route_leak(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        graph.get_asys(6).policy = RouteLeakPolicy()
+        graph.get_asys(16).policy = RouteLeakPolicy()
+        self.assert_same_routes(graph)
+
+    def test_path_validation(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        policies = [DefaultPolicy, RPKIPolicy, RouteLeakPolicy, ASPAPolicy, ASCONESPolicy]
+        rand = random.Random(1)
+        for asys in graph.asyss.values():
+            asys.policy = rand.choice(policies)()
+            asys.create_new_aspa(graph)
+            asys.create_new_ascones()
+        self.assert_same_routes(graph)
+
+    def test_only_to_customer(self):
+        for filepath in [AS_REL_FILEPATH, AS_DO_OTC_FILEPATH]:
+            graph = ASGraph(as_graph.parse_as_rel_file(filepath))
+            policies = [DefaultPolicy, RouteLeakPolicy, OnlyToCustomerPolicy, OTCASPAPolicy]
+            rand = random.Random(2)
+            for asys in graph.asyss.values():
+                asys.policy = rand.choice(policies)()
+                asys.create_new_aspa(graph)
+            self.assert_same_routes(graph)
+
+    def test_many_targets(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_DO_OTC_FILEPATH))
+        policies = [DefaultPolicy, RouteLeakPolicy, ASPAPolicy, OnlyToCustomerPolicy, OTCASPAPolicy]
+        rand = random.Random(3)
+        for asys in graph.asyss.values():
+            asys.policy = rand.choice(policies)()
+            asys.create_new_aspa(graph)
+        # Repeated targets are propagated independently as well
+        targets = list(graph.asyss.values()) + [graph.get_asys(1)]
+
+        states = list(propagation.iter_routes_to(graph, targets, batch_size=4))
+        self.assertEqual(len(states), len(targets))
+        for target, state in zip(targets, states):
+            expected = propagation.find_routes_to(graph, target)
+            self.assertEqual(state.origin, expected.origin)
+            for as_id in graph.asyss:
+                self.assertEqual(state.path(as_id), expected.path(as_id))
+            self.assertEqual(state.next_hop.tolist(), expected.next_hop.tolist())
+            self.assertEqual(state.length.tolist(), expected.length.tolist())
+
+    def test_unsupported_policy(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        graph.get_asys(6).policy = BGPsecHighSecPolicy()
+        with self.assertRaises(ValueError):
+            propagation.find_routes_to(graph, graph.get_asys(1))
@@ -0,0 +1,71 @@
+import unittest
+import os
+import tempfile
+
+import networkx as nx
+
+import bgpsecsim.as_graph as as_graph
+import bgpsecsim.bench as bench
+import bgpsecsim.reachability as reachability
+from bgpsecsim.as_graph import ASGraph
+
+AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel.txt')
+
+
+class TestReachability(unittest.TestCase):
+    def test_reachability_matches_routes(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        # Blocks smaller than a word, not a multiple of a word and larger than the graph
+        for block_size in [3, 100, reachability.BLOCK_SIZE]:
+            reach = graph.determine_reachability_all(block_size)
+            for target in graph.asyss.values():
+                graph.clear_routing_tables()
+                graph.find_routes_to(target)
+                n_routes = sum(1 for asys in graph.asyss.values() if asys.get_route(target.as_id) is not None)
+                self.assertEqual(reach[target.as_id], n_routes)
+                self.assertEqual(graph.determine_reachability_one(target.as_id), n_routes)
+
+    def test_valley(self):
+        # 1 and 2 are providers of 3, 4 is a customer of 2 and 5 a peer of 1
+        nx_graph = nx.Graph()
+        nx_graph.add_edge(1, 3, customer=3)
+        nx_graph.add_edge(2, 3, customer=3)
+        nx_graph.add_edge(2, 4, customer=4)
+        nx_graph.add_edge(1, 5, customer=None)
+        graph = ASGraph(nx_graph)
+        # Paths may not go down to AS 3 and up again, so only AS 3 is reached by everybody
+        self.assertEqual(graph.determine_reachability_all(), {1: 3, 2: 3, 3: 5, 4: 3, 5: 3})
+
+    def test_blocks_and_spill_file(self):
+        graph = ASGraph(bench.synthetic_as_graph(300, seed=2))
+        csr = graph.csr()
+        expected = reachability.reach_counts(csr, len(csr))
+        with tempfile.TemporaryDirectory() as directory:
+            spill_file = os.path.join(directory, 'reach.npy')
+            block_size = reachability.block_size_for_budget(len(csr), 2 * reachability.ROWS_PER_AS * 8 * len(csr))
+            self.assertEqual(block_size, 128)
+            self.assertEqual(reachability.reach_counts(csr, block_size, spill_file).tolist(), expected.tolist())
+
+            matrix = reachability.open_spill_file(spill_file)
+            for target in [0, 1, 150, len(csr) - 1]:
+                sources = reachability.reachable_from(matrix, target)
+                self.assertEqual(len(sources), expected[target])
+                self.assertEqual(len(sources), reachability.reach_count_to(csr, target))
+                self.assertIn(target, sources)
+            del matrix
+
+        with self.assertRaises(ValueError):
+            reachability.block_size_for_budget(len(csr), 100)
+
+    def test_customer_provider_cycle(self):
+        nx_graph = nx.Graph()
+        nx_graph.add_edge(1, 2, customer=2)
+        nx_graph.add_edge(2, 3, customer=3)
+        nx_graph.add_edge(3, 1, customer=1)
+        graph = ASGraph(nx_graph)
+        with self.assertRaises(ValueError):
+            graph.determine_reachability_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import os
+import random
+
+import bgpsecsim.as_graph as as_graph
+import bgpsecsim.experiments as experiments
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.route_cache import RouteCache, RouteSnapshot, state_fingerprint
+from bgpsecsim.routing_policy import (
+    DefaultPolicy, OnlyToCustomerPolicy, RouteLeakPolicy, RPKIPolicy, PathEndValidationPolicy, ASPAPolicy
+)
+from tests.helpers import customer_and_peer_graphs, routing_state
+
+AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel-extended.txt')
+
+
+class TestRouteCache(unittest.TestCase):
+    def test_restore(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH), policy=OnlyToCustomerPolicy())
+        graph.get_asys(6).policy = RouteLeakPolicy()
+        victim = graph.get_asys(16)
+        graph.find_routes_to(victim)
+        expected = routing_state(graph, victim.as_id)
+
+        snapshot = RouteSnapshot.capture(graph, victim.as_id)
+        graph.clear_routing_tables()
+        snapshot.restore(graph)
+        self.assertEqual(routing_state(graph, victim.as_id), expected)
+
+        # Routes to the same destination share their parents, as after propagation
+        route = graph.get_asys(1).get_route(victim.as_id)
+        self.assertIs(graph.get_asys(route.first_hop.as_id).get_route(victim.as_id), route.parent)
+
+    def test_cache_key(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        cache = RouteCache(2 ** 20)
+        victim = graph.get_asys(16)
+
+        cache.find_routes_to(graph, victim)
+        graph.clear_routing_tables()
+        cache.find_routes_to(graph, victim)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Changing a policy changes the propagation, so the cached result must not be used
+        graph.get_asys(8).policy = RouteLeakPolicy()
+        graph.clear_routing_tables()
+        cache.find_routes_to(graph, victim)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        cached = routing_state(graph, victim.as_id)
+        graph.clear_routing_tables()
+        graph.find_routes_to(victim)
+        self.assertEqual(cached, routing_state(graph, victim.as_id))
+
+    def test_topology_in_cache_key(self):
+        customer_graph, peer_graph = customer_and_peer_graphs()
+
+        for nx_graph in [customer_graph, peer_graph]:
+            graph = ASGraph(nx_graph)
+            experiments.Figure2aExperiment(graph, 1).find_routes_to(graph.get_asys(1))
+            cached = routing_state(graph, 1)
+            graph.clear_routing_tables()
+            graph.find_routes_to(graph.get_asys(1))
+            self.assertEqual(cached, routing_state(graph, 1))
+        self.assertIsNone(graph.get_asys(3).get_route(1))
+
+    def test_prefetch(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        policies = [DefaultPolicy, RPKIPolicy, PathEndValidationPolicy, RouteLeakPolicy, ASPAPolicy]
+        rand = random.Random(3)
+        for asys in graph.asyss.values():
+            asys.policy = rand.choice(policies)()
+            asys.create_new_aspa(graph)
+        victims = list(graph.asyss.values())
+
+        cache = RouteCache(2 ** 24)
+        cache.prefetch(graph, victims)
+        self.assertEqual(len(cache.snapshots), len(victims))
+        for victim in victims:
+            graph.clear_routing_tables()
+            cache.find_routes_to(graph, victim)
+            restored = routing_state(graph, victim.as_id)
+            graph.clear_routing_tables()
+            graph.find_routes_to(victim)
+            self.assertEqual(restored, routing_state(graph, victim.as_id))
+        self.assertEqual((cache.hits, cache.misses), (len(victims), 0))
+
+        # OTC attributes are not produced by the array engine
+        graph.get_asys(8).policy = OnlyToCustomerPolicy()
+        cache.prefetch(graph, victims)
+        self.assertEqual(len(cache.snapshots), len(victims))
+
+    def test_state_fingerprint(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        fingerprints = [state_fingerprint(graph)]
+        # Computed once per state
+        self.assertIs(state_fingerprint(graph), fingerprints[0])
+
+        graph.get_asys(8).policy = RouteLeakPolicy()
+        fingerprints.append(state_fingerprint(graph))
+        graph.get_asys(8).bgp_sec_enabled = True
+        fingerprints.append(state_fingerprint(graph))
+        graph.get_asys(8).create_new_aspa(graph)
+        fingerprints.append(state_fingerprint(graph))
+        graph.get_asys(8).create_new_ascones()
+        fingerprints.append(state_fingerprint(graph))
+        self.assertEqual(len(set(fingerprints)), len(fingerprints))
+
+        # Back to the first state
+        graph.get_asys(8).policy = DefaultPolicy()
+        graph.get_asys(8).bgp_sec_enabled = False
+        graph.get_asys(8).reset_rpki_objects()
+        self.assertEqual(state_fingerprint(graph), fingerprints[0])
+
+    def test_eviction(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH), policy=DefaultPolicy())
+        graph.find_routes_to(graph.get_asys(1))
+        size = RouteSnapshot.capture(graph, 1).nbytes
+        graph.clear_routing_tables()
+
+        cache = RouteCache(2 * size)
+        for as_id in [1, 1, 2, 3, 1]:
+            graph.clear_routing_tables()
+            cache.find_routes_to(graph, graph.get_asys(as_id))
+        self.assertLessEqual(cache.nbytes, 2 * size)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 4)
+
+        cache.resize(size)
+        self.assertEqual(len(cache.snapshots), 1)
+        self.assertLessEqual(cache.nbytes, size)
@@ -35,14 +35,14 @@ class TestROVGraph(unittest.TestCase):
 
         # Asign RPKI policies based on ROVista scores
         for as_id, score in rovista_scores.items():
-            asys = graph.get_asys(str(as_id))
+            asys = graph.get_asys(as_id)
             if asys is not None and score == 1.0:
                 asys.policy = RPKIPolicy()
                 
 
         # Now check: All ASes with ROVista score == 1.0 should have RPKIPolicy, others DefaultPolicy
         for as_id, score in rovista_scores.items():
-            asys = graph.get_asys(str(as_id))
+            asys = graph.get_asys(as_id)
             if asys is not None:
                 if score == 1.0:
                     self.assertIsInstance(asys.policy, RPKIPolicy, f"AS{as_id} should have RPKIPolicy")
@@ -50,13 +50,13 @@ class TestROVGraph(unittest.TestCase):
                     self.assertIsInstance(asys.policy, DefaultPolicy, f"AS{as_id} should have DefaultPolicy")
 
         # Randomly selected target AS to check the find_routes_to method
-        target_as_id = '7' 
+        target_as_id = 7 
         target_asys = graph.get_asys(target_as_id)
         if target_asys is not None:
             graph.find_routes_to(target_asys)
             
         # Check a random host AS (e.g., AS9) to see if it has a route to the target AS
-        host_as_id = '9'
+        host_as_id = 9
         host_asys = graph.get_asys(host_as_id)
         if host_asys is not None:
             print(f"Routing Table for AS{host_as_id}: {host_asys.routing_table}")
@@ -0,0 +1,48 @@
+import unittest
+import os
+
+import bgpsecsim.as_graph as as_graph
+from bgpsecsim.as_graph import ASGraph
+from bgpsecsim.routing_policy import ASPAPolicy, RPKIPolicy
+from bgpsecsim.shared_graph import GraphState, SharedGraph
+
+AS_REL_FILEPATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'as-rel-extended.txt')
+
+
+class TestSharedGraph(unittest.TestCase):
+    def test_round_trip(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        tiers = (graph.get_tierOne(), graph.get_tierTwo(), graph.get_tierThree())
+
+        shared = SharedGraph.export(graph)
+        try:
+            copy = shared.to_as_graph()
+
+            self.assertEqual(list(copy.asyss.keys()), list(graph.asyss.keys()))
+            for as_id, asys in graph.asyss.items():
+                other = copy.get_asys(as_id)
+                self.assertEqual([(n.as_id, r) for n, r in other.neighbors.items()],
+                                 [(n.as_id, r) for n, r in asys.neighbors.items()])
+            self.assertEqual((copy.get_tierOne(), copy.get_tierTwo(), copy.get_tierThree()), tiers)
+        finally:
+            shared.unlink()
+
+    def test_graph_state(self):
+        graph = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH), policy=RPKIPolicy())
+        graph.get_asys(6).policy = ASPAPolicy()
+        graph.get_asys(6).bgp_sec_enabled = True
+        graph.get_asys(7).create_new_aspa(graph)
+        state = GraphState.capture(graph)
+
+        copy = ASGraph(as_graph.parse_as_rel_file(AS_REL_FILEPATH))
+        copy.get_asys(5).policy = ASPAPolicy()
+        copy.get_asys(5).bgp_sec_enabled = True
+        copy.get_asys(5).create_new_aspa(copy)
+        state.apply(copy)
+
+        self.assertIsInstance(copy.get_asys(6).policy, ASPAPolicy)
+        self.assertIsInstance(copy.get_asys(5).policy, RPKIPolicy)
+        self.assertTrue(copy.get_asys(6).bgp_sec_enabled)
+        self.assertFalse(copy.get_asys(5).bgp_sec_enabled)
+        self.assertEqual(copy.get_asys(7).aspa, (7, [3, 4]))
+        self.assertIsNone(copy.get_asys(5).aspa)